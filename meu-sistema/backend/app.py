@@ -1,7 +1,9 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response, Response, stream_with_context, g
 from flask_cors import CORS
 from datetime import date
-from database import db, Projeto, Andamento
+from database import db, Projeto, Andamento, bucket_status, STATUS_BUCKETS, BUCKET_OUTRO
+from database import bump_versoes, versoes_atuais
+from database import id_dominio, nome_dominio, chave_dominio, Pessoa, ProjetoMembro
 
 
 app = Flask(__name__)   # <- só isso
@@ -14,47 +16,547 @@ from database import SustentacaoChamado
 
 
 # ====== CONFIG ======
-app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://postgres:postgres@db:5432/projetos_db'
+import os
+from datetime import date, datetime, timedelta
+from utils import _parse_date, _parse_datetime, _parse_bool
+import config
+
+app.config['SQLALCHEMY_DATABASE_URI'] = config.database_uri()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = config.engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ECHO'] = True  # loga INSERT/UPDATE/SELECT
 db.init_app(app)
+
+# Migrações do schema (Alembic): flask --app app db upgrade | db migrate -m "..."
+from flask_migrate import Migrate, upgrade
+Migrate(app, db)
+
+# SQL por requisição: Server-Timing, slow-query log e aviso de N+1 (no lugar do SQLALCHEMY_ECHO)
+import instrumentacao
+instrumentacao.init_app(app)
+import metricas
+metricas.init_app(app)   # /metrics (Prometheus)
+
+import cache
+cache.init_app(app)      # cache de respostas GET (CACHE_BACKEND)
+import serializacao
+serializacao.init_app(app)   # JSON das respostas: orjson, datas em ISO (JSON_PROVIDER)
+from flask_compress import Compress
+app.config.update(config.compressao())
+Compress(app)            # gzip/brotli pelo Accept-Encoding (COMPRESS_*)
+
 with app.app_context():
     print("Campos do modelo Projeto:", [c.name for c in Projeto.__table__.columns])
 
-from datetime import date, datetime
 
-def _parse_date(s: str | None):
+# ====== PAGINAÇÃO (keyset / cursor) ======
+# As listagens devolvem {"itens": [...], "proximo_cursor": "..."}.
+# O cursor é opaco para o front: base64 de um JSON com os valores da chave
+# de ordenação da última linha da página. ?all=1 devolve a lista inteira
+# no formato antigo (array), só para compatibilidade.
+import base64
+import json
+
+PAGINA_PADRAO = 50
+PAGINA_MAX = 500
+
+
+def _encode_cursor(*valores):
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in valores])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(s):
+    """Devolve a lista de valores do cursor ou levanta ValueError."""
     try:
-        return date.fromisoformat((s or '').split('T')[0]) if s else None
+        raw = base64.urlsafe_b64decode(s + '=' * (-len(s) % 4))
+        valores = json.loads(raw)
     except Exception:
-        return None
+        raise ValueError('cursor inválido')
+    if not isinstance(valores, list):
+        raise ValueError('cursor inválido')
+    return valores
 
-def _parse_datetime(s: str | None):
-    """Aceita '2025-09-23', '2025-09-23T14:30', ou '...Z'"""
+
+def _ler_paginacao(n_chaves, args=None):
+    """Lê ?limit= e ?cursor= da query string. Levanta ValueError se inválidos.
+
+    args: a query string (padrão request.args); o asgi.py passa a sua."""
+    args = request.args if args is None else args
     try:
-        if not s:
-            return None
-        s = s.replace('Z', '+00:00')   # ISO com Z
-        dt = datetime.fromisoformat(s)
-        return dt.replace(tzinfo=None) # salva naive (sem tz)
-    except Exception:
-        return None
+        limit = int(args.get('limit', PAGINA_PADRAO))
+    except (TypeError, ValueError):
+        raise ValueError('limit inválido')
+    limit = max(1, min(limit, PAGINA_MAX))
+
+    cursor = args.get('cursor')
+    valores = _decode_cursor(cursor) if cursor else None
+    if valores is not None and (len(valores) != n_chaves or not isinstance(valores[-1], int)):
+        raise ValueError('cursor inválido')
+    return limit, valores
+
+
+def _cursor_data_id(valores):
+    """Cursor [data_iso|null, id] -> (datetime|None, id)."""
+    dt = _parse_datetime(valores[0]) if valores[0] is not None else None
+    if valores[0] is not None and dt is None:
+        raise ValueError('cursor inválido')
+    return dt, valores[1]
+
+
+def _quer_lista_completa(args=None):
+    return _parse_bool((request.args if args is None else args).get('all'))
+
+
+def _apos_cursor(col, id_col, valor, id_valor, desc=True):
+    """Filtro keyset para ORDER BY col [DESC] NULLS LAST, id [DESC]."""
+    if valor is None:
+        return db.and_(col.is_(None), id_col < id_valor if desc else id_col > id_valor)
+    return db.or_(
+        col < valor if desc else col > valor,
+        db.and_(col == valor, id_col < id_valor if desc else id_col > id_valor),
+        col.is_(None),
+    )
+
+
+def _pagina(query, limit, chave, serializar):
+    """Executa a query (já ordenada/filtrada) buscando limit+1 linhas para
+    saber se há próxima página."""
+    return jsonify(_corpo_pagina(query.limit(limit + 1).all(), limit, chave, serializar))
+
+
+def _corpo_pagina(linhas, limit, chave, serializar):
+    """{"itens", "proximo_cursor", "limit"} a partir das limit+1 linhas lidas."""
+    tem_mais = len(linhas) > limit
+    linhas = linhas[:limit]
+    return {
+        'itens': [serializar(r) for r in linhas],
+        'proximo_cursor': _encode_cursor(*chave(linhas[-1])) if tem_mais else None,
+        'limit': limit,
+    }
+
+
+# ====== FILTROS E ORDENAÇÃO (listagens) ======
+# Cada listagem declara os filtros aceitos ({parâmetro: coluna}) e as
+# ordenações ({nome: coluna}). ?campo=valor filtra por igualdade (repita o
+# parâmetro para IN: ?status=A&status=B); ?ordem=campo ou ?ordem=-campo
+# (decrescente). Parâmetros fora da lista dão 400 em vez de serem
+# ignorados em silêncio. Os índices compostos que cobrem essas combinações
+# estão em database.py.
+PARAMS_LISTAGEM = {'limit', 'cursor', 'all', 'ordem'}
+
+
+def _anti_cache(nome):
+    """?_=timestamp e o ?t= de frontends antigos: ignorados pelas rotas e
+    fora da ETag / chave do cache de respostas."""
+    return nome == 't' or nome.startswith('_')
+
+
+def _converter(col, bruto):
+    """Converte o texto da query string para o tipo da coluna (ValueError se inválido)."""
+    tipo = col.type
+    if isinstance(tipo, db.Boolean):
+        s = bruto.strip().lower()
+        if s not in ('1', 'true', 't', 'sim', '0', 'false', 'f', 'nao', 'não'):
+            raise ValueError
+        return _parse_bool(s)
+    if isinstance(tipo, db.Integer):
+        return int(bruto)
+    if isinstance(tipo, db.DateTime):
+        v = _parse_datetime(bruto)
+    elif isinstance(tipo, db.Date):
+        v = _parse_date(bruto)
+    else:
+        return bruto
+    if v is None:
+        raise ValueError
+    return v
+
+
+def _aplicar_filtros(q, filtros, intervalos=None, args=None, incluir=None):
+    """filtros = {param: coluna | (coluna, conversor)} (igualdade/IN);
+    intervalos = {param: (coluna, '>=' | '<=')}. q: Query ou select().
+    incluir: o dict ?incluir= da rota (só aceita o parâmetro se houver)."""
+    intervalos = intervalos or {}
+    args = request.args if args is None else args
+    for nome in args:
+        if nome in PARAMS_LISTAGEM or _anti_cache(nome):
+            continue
+        if nome == 'incluir' and incluir:
+            continue   # validado por _ler_incluir
+        if nome in filtros:
+            col, conv = filtros[nome] if isinstance(filtros[nome], tuple) else (filtros[nome], None)
+            try:
+                valores = [conv(v) if conv else _converter(col, v) for v in args.getlist(nome)]
+            except ValueError:
+                raise ValueError(f'valor inválido para {nome}')
+            q = q.filter(col == valores[0] if len(valores) == 1 else col.in_(valores))
+        elif nome in intervalos:
+            col, op = intervalos[nome]
+            try:
+                v = _converter(col, args[nome])
+            except ValueError:
+                raise ValueError(f'valor inválido para {nome}')
+            if op == '<=' and isinstance(col.type, db.DateTime) and len(args[nome]) == 10:
+                q = q.filter(col < v + timedelta(days=1))   # só a data: inclui o dia inteiro
+            else:
+                q = q.filter(col >= v if op == '>=' else col <= v)
+        else:
+            raise ValueError(f'parâmetro desconhecido: {nome} '
+                             f'(aceitos: {", ".join(sorted([*filtros, *intervalos, *PARAMS_LISTAGEM]))})')
+    return q
+
+
+def _ler_ordem(ordens, padrao, args=None):
+    """?ordem= -> (texto, coluna, desc)."""
+    bruto = (request.args if args is None else args).get('ordem') or padrao
+    nome = bruto.lstrip('-')
+    if nome not in ordens:
+        raise ValueError(f'ordem inválida: {bruto} (aceitas: {", ".join(sorted(ordens))}, com - para decrescente)')
+    return bruto, ordens[nome], bruto.startswith('-')
+
+
+def _valores_incluir(args):
+    return {v.strip() for bruto in args.getlist('incluir') for v in bruto.split(',') if v.strip()}
+
+
+def _ler_incluir(incluir, args=None):
+    """?incluir=a,b (ou repetido) -> set do que foi pedido, entre as chaves de
+    incluir ({valor: tabelas extras lidas}). ValueError se pedir outra coisa."""
+    valores = _valores_incluir(request.args if args is None else args)
+    invalidos = valores - incluir.keys()
+    if invalidos:
+        raise ValueError(f'incluir inválido: {", ".join(sorted(invalidos))} '
+                         f'(aceitos: {", ".join(sorted(incluir))})')
+    return valores
+
+
+def _listagem(q, id_col, ordens, padrao, serializar):
+    """Ordena (?ordem=) e pagina por cursor — ou devolve tudo com ?all=1 — uma
+    query já filtrada. O cursor é [ordem, valor, id]: não vale para outra ordem."""
+    q, limit, chave = _plano_listagem(q, id_col, ordens, padrao)
+    if limit is None:
+        return jsonify([serializar(r) for r in q.all()])
+    return _pagina(q, limit, chave, serializar)
+
+
+def _plano_listagem(q, id_col, ordens, padrao, args=None):
+    """A parte de _listagem que não toca no banco: (q ordenada e depois do
+    cursor, limit ou None se ?all=1, chave(linha) para o próximo cursor)."""
+    ordem, col, desc = _ler_ordem(ordens, padrao, args)
+    sentido = (lambda c: c.desc()) if desc else (lambda c: c.asc())
+    if col is id_col:
+        criterio = [sentido(id_col)]
+    else:
+        criterio = [sentido(col).nulls_last(), sentido(id_col)]
+
+    if _quer_lista_completa(args):
+        return q.order_by(*criterio), None, None
+
+    limit, cursor = _ler_paginacao(3, args)
+    if cursor:
+        if cursor[0] != ordem:
+            raise ValueError('cursor de outra ordenação')
+        id_valor = cursor[2]
+        if col is id_col:
+            q = q.filter(id_col < id_valor if desc else id_col > id_valor)
+        else:
+            valor = cursor[1]
+            if isinstance(valor, str):   # datas vêm em ISO
+                try:
+                    valor = _converter(col, valor)
+                except ValueError:
+                    raise ValueError('cursor inválido')
+            q = q.filter(_apos_cursor(col, id_col, valor, id_valor, desc))
+    return (q.order_by(*criterio), limit,
+            lambda r: (ordem, getattr(r, col.key), getattr(r, id_col.key)))
+
+
+# ====== ETag / 304 (GET condicional) e cache de respostas ======
+# A ETag combina a rota + query string (parâmetros em ordem fixa) com a versão
+# das tabelas que a resposta lê (ver TabelaVersao em database.py). Se o
+# cliente manda If-None-Match igual, devolvemos 304 sem consultar linhas nem
+# gerar JSON. A mesma ETag é a chave do cache de respostas (cache.py): outro
+# cliente pedindo a mesma URL recebe os bytes prontos.
+# Com compressão o Flask-Compress devolve a ETag como "<etag>:gzip" / ":br",
+# e é essa que volta no If-None-Match; comparamos só a parte antes do ":".
+# Anti-cache na URL (_anti_cache) fica fora da chave: senão cada GET teria
+# ETag nova (nunca 304) e ocuparia uma entrada no cache.
+import hashlib
+from functools import partial, wraps
+from urllib.parse import urlencode
+
+
+def _etag_para(tabelas):
+    return _etag(request.path, request.args.items(multi=True), tabelas, versoes_atuais(tabelas))
+
+
+def _etag(caminho, pares, tabelas, versoes):
+    """pares: (nome, valor) da query string, em qualquer ordem."""
+    pares = [(n, v) for n, v in pares if not _anti_cache(n)]
+    base = caminho + '?' + urlencode(sorted(pares)) + '|' + ','.join(f'{t}:{versoes[t]}' for t in tabelas)
+    return hashlib.sha1(base.encode()).hexdigest()
+
+
+def _tabelas_lidas(tabelas, incluir, args):
+    """As tabelas fixas da rota + as de cada ?incluir= pedido (ver _ler_incluir)."""
+    if not incluir:
+        return tabelas
+    extras = [t for v in sorted(_valores_incluir(args)) for t in incluir.get(v, ())]
+    return tabelas + tuple(dict.fromkeys(t for t in extras if t not in tabelas))
+
+
+def _com_etag(*tabelas, incluir=None):
+    """incluir = {valor de ?incluir=: tabelas que ele faz a resposta ler}."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return fn(*args, **kwargs)
+
+            lidas = _tabelas_lidas(tabelas, incluir, request.args)
+            etag = _etag_para(lidas)
+            g.etag_resposta, g.tabelas_resposta = etag, lidas
+            inm = request.if_none_match
+            recebida = etag if inm.contains(etag) else next(
+                (t for t in inm.as_set() if t.partition(':')[0] == etag), None)
+            if recebida:
+                resp = make_response('', 304)
+                etag = recebida
+            else:
+                item = cache.ler(request.url_rule.rule, etag)
+                if item is not None:
+                    resp = Response(item[1], mimetype=item[0])
+                else:
+                    resp = make_response(fn(*args, **kwargs))
+                    if resp.status_code != 200:
+                        return resp
+                    cache.gravar(etag, lidas, resp)
+            resp.set_etag(etag)
+            # o navegador guarda, mas sempre revalida (barato: só a versão)
+            resp.headers['Cache-Control'] = 'no-cache'
+            return resp
+        return wrapper
+    return deco
+
+
+# Listagens: só as colunas, direto para dict, sem instâncias do ORM (leitura.py)
+import leitura
 
 
 # ====== ROTAS ======
+FILTROS_SUSTENTACAO = {
+    'status': SustentacaoChamado.status,
+    'status_bucket': SustentacaoChamado.status_bucket,
+    'projeto': SustentacaoChamado.projeto,
+    'desenvolvedor': (SustentacaoChamado.desenvolvedor_id, partial(id_dominio, 'pessoa')),
+    'solicitante': SustentacaoChamado.solicitante,
+}
+INTERVALOS_SUSTENTACAO = {
+    'data_de': (SustentacaoChamado.data_chamado, '>='),
+    'data_ate': (SustentacaoChamado.data_chamado, '<='),
+}
+ORDENS_SUSTENTACAO = {
+    'data_chamado': SustentacaoChamado.data_chamado,
+    'atualizado_em': SustentacaoChamado.atualizado_em,
+    'numero_chamado': SustentacaoChamado.numero_chamado,
+}
+# ?incluir=observacoes: observacoes_total e ultima_observacao em cada chamado
+INCLUIR_SUSTENTACAO = {'observacoes': ('sustentacao_observacoes',)}
+
+
 @app.route('/api/sustentacao', methods=['GET'])
+@_com_etag('sustentacao_chamados', incluir=INCLUIR_SUSTENTACAO)
 def listar_sustentacao():
-    chamados = SustentacaoChamado.query.order_by(SustentacaoChamado.data_chamado.desc()).all()
-    return jsonify([{
-        "numero_chamado": c.numero_chamado,
-        "projeto": c.projeto,
-        "desenvolvedor": c.desenvolvedor,
-        "data_chamado": c.data_chamado.isoformat() if c.data_chamado else None,
-        "descricao": c.descricao,
-        "solicitante": c.solicitante,
-        "status": c.status,
-        "observacao": c.observacao
-    } for c in chamados])
+    try:
+        q = _aplicar_filtros(SustentacaoChamado.query, FILTROS_SUSTENTACAO, INTERVALOS_SUSTENTACAO,
+                             incluir=INCLUIR_SUSTENTACAO)
+        q, montar = _consulta_chamados(q, _ler_incluir(INCLUIR_SUSTENTACAO))
+        return _listagem(q, SustentacaoChamado.id, ORDENS_SUSTENTACAO, '-data_chamado', montar)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+
+def _consulta_chamados(q, incluir):
+    """(colunas da listagem de chamados, montar) conforme o ?incluir=."""
+    if 'observacoes' in incluir:
+        return leitura.com_observacoes(leitura.CHAMADOS.consulta(q)), leitura.montar_com_observacoes
+    return leitura.CHAMADOS.consulta(q), leitura.CHAMADOS.montar
+
+# Contagem por bucket de status (cards "sust-*"): um GROUP BY sobre o índice
+# de status_bucket, sem baixar a lista nem rodar regex no navegador.
+CARD_POR_BUCKET = {
+    'a_desenvolver': 'sust-a-desenvolver',
+    'pendente':      'sust-pendente',
+    'em_dev':        'sust-em-dev',
+    'homologacao':   'sust-homologacao',
+    'suspenso':      'sust-suspenso',
+    'em_testes':     'sust-em-testes',
+    'concluido':     'sust-concluido',
+}
+
+CONSULTA_STATS_SUSTENTACAO = db.select(SustentacaoChamado.status_bucket, db.func.count())\
+    .group_by(SustentacaoChamado.status_bucket)
+
+
+@app.route('/api/sustentacao/stats', methods=['GET'])
+@_com_etag('sustentacao_chamados')
+def stats_sustentacao():
+    return jsonify(_corpo_stats_sustentacao(db.session.execute(CONSULTA_STATS_SUSTENTACAO).all())), 200
+
+
+def _corpo_stats_sustentacao(linhas):
+    por_bucket = dict.fromkeys([b for b, _ in STATUS_BUCKETS] + [BUCKET_OUTRO], 0)
+    for bucket, n in linhas:
+        # linhas ainda sem backfill (NULL) entram em "outro"
+        por_bucket[bucket or BUCKET_OUTRO] += n
+
+    return {
+        'total': sum(por_bucket.values()),
+        'por_bucket': por_bucket,
+        'cards': {card: por_bucket[b] for b, card in CARD_POR_BUCKET.items()},
+    }
+
+
+@app.cli.command('backfill-status-bucket')
+def backfill_status_bucket():
+    """Preenche sustentacao_chamados.status_bucket (um UPDATE por status distinto)."""
+    statuses = [s for (s,) in db.session.query(SustentacaoChamado.status).distinct()]
+    total = 0
+    for st in statuses:
+        total += SustentacaoChamado.query\
+            .filter(SustentacaoChamado.status.is_(None) if st is None else SustentacaoChamado.status == st)\
+            .update({SustentacaoChamado.status_bucket: bucket_status(st),
+                     # backfill não conta como edição do chamado
+                     SustentacaoChamado.atualizado_em: SustentacaoChamado.atualizado_em},
+                    synchronize_session=False)
+    bump_versoes(db.session, ['sustentacao_chamados'])
+    db.session.commit()
+    print(f"status_bucket atualizado em {total} chamados ({len(statuses)} status distintos)")
+
+
+# ========= IMPORTAÇÃO EM LOTE (CSV / NDJSON via COPY) =========
+import codecs
+import io
+import click
+from importacao import importar, ler_registros, ErroImportacao
+
+
+def _formato_importacao(nome_arquivo=None):
+    fmt = (request.args.get('formato') or '').lower()
+    if fmt:
+        return fmt
+    if nome_arquivo and nome_arquivo.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if 'ndjson' in (request.mimetype or '') or 'jsonl' in (request.mimetype or ''):
+        return 'ndjson'
+    return 'csv'
+
+
+def _rota_importacao(entidade):
+    # aceita upload multipart (campo "arquivo") ou o arquivo cru no corpo
+    arquivo = request.files.get('arquivo')
+    stream = arquivo.stream if arquivo else request.stream
+    fmt = _formato_importacao(arquivo.filename if arquivo else None)
+    # ?encoding=cp1252 para export do Excel/service desk que não vem em UTF-8
+    encoding = request.args.get('encoding') or 'utf-8-sig'
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        return jsonify({'erro': f'codificação desconhecida: {encoding}'}), 400
+    texto = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    app.logger.info("POST /api/%s/import formato=%s encoding=%s", entidade, fmt, encoding)
+    try:
+        rel = importar(entidade, ler_registros(texto, fmt))
+    except ErroImportacao as e:
+        app.logger.exception("Erro na importação de %s", entidade)
+        return jsonify({'erro': str(e)}), 400
+    return jsonify(rel), 200
+
+
+@app.route('/api/sustentacao/import', methods=['POST'])
+def importar_sustentacao():
+    return _rota_importacao('sustentacao')
+
+
+@app.route('/api/projetos/import', methods=['POST'])
+def importar_projetos():
+    return _rota_importacao('projetos')
+
+
+@app.cli.command('importar')
+@click.argument('entidade', type=click.Choice(['sustentacao', 'projetos']))
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--formato', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Padrão: pela extensão do arquivo (.ndjson/.jsonl) ou csv.')
+@click.option('--encoding', default='utf-8-sig', show_default=True,
+              help='Codificação do arquivo, ex.: cp1252 para export do Excel.')
+def importar_cli(entidade, arquivo, formato, encoding):
+    """Importa chamados/projetos de um CSV ou NDJSON (upsert via COPY)."""
+    formato = formato or ('ndjson' if arquivo.lower().endswith(('.ndjson', '.jsonl')) else 'csv')
+    with open(arquivo, encoding=encoding, newline='') as f:
+        try:
+            rel = importar(entidade, ler_registros(f, formato))
+        except ErroImportacao as e:
+            raise click.ClickException(str(e))
+    click.echo(json.dumps(rel, ensure_ascii=False, indent=2))
+
+
+# ========= EXPORTAÇÃO (streaming) =========
+import exportacao
+
+
+@app.route('/api/export/<string:entidade>', methods=['GET'])
+def exportar(entidade):
+    """?formato=ndjson (padrão) | csv; ?filhos=1 embute andamentos/observações no NDJSON."""
+    if entidade not in exportacao.ENTIDADES:
+        return jsonify({'erro': f'entidade desconhecida: {entidade}',
+                        'entidades': sorted(exportacao.ENTIDADES)}), 404
+
+    formato = (request.args.get('formato') or 'ndjson').lower()
+    if formato == 'csv':
+        corpo, mimetype = exportacao.gerar_csv(entidade), 'text/csv; charset=utf-8'
+    elif formato == 'ndjson':
+        filhos = _parse_bool(request.args.get('filhos')) and exportacao.ENTIDADES[entidade][1] is not None
+        corpo, mimetype = exportacao.gerar_ndjson(entidade, filhos), 'application/x-ndjson'
+    else:
+        return jsonify({'erro': 'formato deve ser ndjson ou csv'}), 400
+
+    resp = Response(stream_with_context(corpo), mimetype=mimetype)
+    resp.headers['Content-Disposition'] = f'attachment; filename="{entidade}.{formato}"'
+    resp.headers['X-Accel-Buffering'] = 'no'   # proxy não deve segurar o stream
+    return resp
+
+
+# ========= BUSCA TEXTUAL =========
+import busca
+
+
+@app.route('/api/search', methods=['GET'])
+@_com_etag('projetos', 'sustentacao_chamados', 'sustentacao_observacoes')
+def buscar():
+    """?q= (sintaxe de busca web: "frase", -excluir, or); ?tipos=projeto,chamado,observacao;
+    paginado por ?limit/?cursor. Os trechos vêm com HTML escapado e <mark> nos termos."""
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return jsonify({'erro': 'Parâmetro q é obrigatório'}), 400
+    tipos = [t.strip() for t in (request.args.get('tipos') or ','.join(busca.TIPOS)).split(',') if t.strip()]
+    invalidos = [t for t in tipos if t not in busca.TIPOS]
+    if invalidos or not tipos:
+        return jsonify({'erro': f'tipos inválidos: {", ".join(invalidos)}', 'tipos': list(busca.TIPOS)}), 400
+    try:
+        limit, apos = _ler_paginacao(3)
+        if apos is not None and not all(isinstance(v, (int, float)) for v in apos):
+            raise ValueError('cursor inválido')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+    itens, ultima = busca.buscar(q, tipos, limit, apos)
+    return jsonify({
+        'itens': itens,
+        'proximo_cursor': _encode_cursor(*ultima) if ultima else None,
+        'limit': limit,
+    })
+
 
 # ========= SUSTENTAÇÃO: CRUD =========
 
@@ -64,22 +566,27 @@ def criar_chamado_sustentacao():
     data = request.get_json() or {}
     app.logger.info("POST /api/sustentacao payload=%s", data)
 
-    novo = SustentacaoChamado(
-        numero_chamado = data.get('numero_chamado'),
-        projeto        = data.get('projeto'),
-        desenvolvedor  = data.get('desenvolvedor'),
-        data_chamado   = _parse_datetime(data.get('data_chamado')),  # <- AQUI
-        descricao      = data.get('descricao'),
-        solicitante    = data.get('solicitante'),
-        status         = data.get('status'),
-        observacao     = data.get('observacao')
-    )
-    db.session.add(novo)
-    db.session.commit()
+    try:
+        novo = SustentacaoChamado(
+            numero_chamado = data.get('numero_chamado'),
+            projeto        = data.get('projeto'),
+            desenvolvedor  = data.get('desenvolvedor'),   # nome de pessoa: ValueError se inválido
+            data_chamado   = _parse_datetime(data.get('data_chamado')),  # <- AQUI
+            descricao      = data.get('descricao'),
+            solicitante    = data.get('solicitante'),
+            status         = data.get('status'),
+            observacao     = data.get('observacao'),
+            status_bucket  = bucket_status(data.get('status'))
+        )
+        db.session.add(novo)
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 400
     return jsonify({
         "numero_chamado": novo.numero_chamado, "projeto": novo.projeto,
         "desenvolvedor": novo.desenvolvedor,
-        "data_chamado": novo.data_chamado.isoformat() if novo.data_chamado else None,
+        "data_chamado": novo.data_chamado,
         "descricao": novo.descricao, "solicitante": novo.solicitante,
         "status": novo.status, "observacao": novo.observacao
     }), 201
@@ -98,6 +605,9 @@ def editar_chamado_sustentacao(numero):
             if fld in data:
                 setattr(ch, fld, data[fld])
 
+        if 'status' in data:
+            ch.status_bucket = bucket_status(ch.status)
+
         if 'data_chamado' in data:
             ch.data_chamado = _parse_datetime(data.get('data_chamado'))  # <- AQUI
 
@@ -105,7 +615,7 @@ def editar_chamado_sustentacao(numero):
         return jsonify({
             "numero_chamado": ch.numero_chamado, "projeto": ch.projeto,
             "desenvolvedor": ch.desenvolvedor,
-            "data_chamado": ch.data_chamado.isoformat() if ch.data_chamado else None,
+            "data_chamado": ch.data_chamado,
             "descricao": ch.descricao, "solicitante": ch.solicitante,
             "status": ch.status, "observacao": ch.observacao
         }), 200
@@ -140,17 +650,6 @@ def editar_andamento(andamento_id):
         app.logger.exception("Erro ao atualizar andamento")
         return jsonify({'erro': str(e)}), 400
 
-def _parse_bool(v):
-    if isinstance(v, bool):
-        return v
-    if v is None:
-        return False
-    if isinstance(v, (int, float)):
-        return bool(v)
-    s = str(v).strip().lower()
-    return s in ('1', 'true', 't', 'yes', 'y', 'on', 'sim')
-
-
 # Excluir andamento
 @app.route('/api/andamentos/<int:andamento_id>', methods=['DELETE'])
 def deletar_andamento(andamento_id):
@@ -169,6 +668,7 @@ from database import SustentacaoObservacao, SustentacaoChamado  # garantir impor
 # Listar e criar observações de um chamado
 # Listar e criar observações de um chamado
 @app.route('/api/sustentacao/<string:numero>/observacoes', methods=['GET', 'POST'])
+@_com_etag('sustentacao_chamados', 'sustentacao_observacoes')
 def sust_obs_list_create(numero):
     # Garante que o chamado existe
     SustentacaoChamado.query.filter_by(numero_chamado=numero).first_or_404()
@@ -187,10 +687,55 @@ def sust_obs_list_create(numero):
         db.session.commit()
         return jsonify(row.to_dict()), 201
 
-    itens = SustentacaoObservacao.query.filter_by(numero_chamado=numero)\
+    itens = leitura.OBSERVACOES.consulta(SustentacaoObservacao.query.filter_by(numero_chamado=numero))\
         .order_by(SustentacaoObservacao.criado_em.desc())\
         .all()
-    return jsonify([r.to_dict() for r in itens]), 200
+    return jsonify([leitura.OBSERVACOES.montar(r) for r in itens]), 200
+
+# Observações de vários chamados numa query só: ?numero=A&numero=B (ou
+# numero=A,B) -> {numero: [mesmo JSON de /api/sustentacao/<numero>/observacoes]}.
+# Sem a checagem de existência de cada chamado: chamado sem observações (ou
+# que não existe) vem com []. O índice (numero_chamado, criado_em DESC, id
+# DESC) entrega as linhas já na ordem.
+OBSERVACOES_LOTE_MAX = 200
+
+
+def _numeros_lote(args):
+    desconhecidos = [p for p in args if p != 'numero' and not _anti_cache(p)]
+    if desconhecidos:
+        raise ValueError(f'parâmetro desconhecido: {", ".join(desconhecidos)} (aceito: numero)')
+    numeros = list(dict.fromkeys(v.strip() for bruto in args.getlist('numero')
+                                 for v in bruto.split(',') if v.strip()))
+    if not numeros:
+        raise ValueError('informe ao menos um numero (?numero=A&numero=B)')
+    if len(numeros) > OBSERVACOES_LOTE_MAX:
+        raise ValueError(f'no máximo {OBSERVACOES_LOTE_MAX} chamados por requisição')
+    return numeros
+
+
+def _consulta_observacoes_lote(q, numeros):
+    return q.filter(SustentacaoObservacao.numero_chamado.in_(numeros)).order_by(
+        SustentacaoObservacao.numero_chamado, SustentacaoObservacao.criado_em.desc(),
+        SustentacaoObservacao.id.desc())
+
+
+def _agrupar_observacoes(numeros, linhas):
+    por_chamado = {n: [] for n in numeros}
+    for r in linhas:
+        por_chamado[r.numero_chamado].append(leitura.OBSERVACOES.montar(r))
+    return por_chamado
+
+
+@app.route('/api/sustentacao/observacoes', methods=['GET'])
+@_com_etag('sustentacao_observacoes')
+def observacoes_em_lote():
+    try:
+        numeros = _numeros_lote(request.args)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    q = _consulta_observacoes_lote(leitura.OBSERVACOES.consulta(SustentacaoObservacao.query), numeros)
+    return jsonify(_agrupar_observacoes(numeros, q.all())), 200
+
 
 # Editar/Excluir uma observação específica
 @app.route('/api/sustentacao/observacoes/<int:oid>', methods=['PUT', 'DELETE'])
@@ -217,9 +762,24 @@ def sust_obs_update_delete(oid):
 
 # Listar histórico de um projeto
 @app.route('/api/projetos/<int:id>/andamentos', methods=['GET'])
+@_com_etag('andamentos')
 def listar_andamentos(id):
-    ands = Andamento.query.filter_by(projeto_id=id).order_by(Andamento.data.desc()).all()
-    return jsonify([a.to_dict() for a in ands]), 200
+    if _quer_lista_completa():
+        ands = leitura.ANDAMENTOS.consulta(Andamento.query.filter_by(projeto_id=id))\
+            .order_by(Andamento.data.desc()).all()
+        return jsonify([leitura.ANDAMENTOS.montar(a) for a in ands]), 200
+
+    try:
+        limit, cursor = _ler_paginacao(2)
+        cursor = _cursor_data_id(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+    q = leitura.ANDAMENTOS.consulta(Andamento.query.filter_by(projeto_id=id))
+    if cursor:
+        q = q.filter(_apos_cursor(Andamento.data, Andamento.id, *cursor))
+    q = q.order_by(Andamento.data.desc().nulls_last(), Andamento.id.desc())
+    return _pagina(q, limit, lambda a: (a.data, a.id), leitura.ANDAMENTOS.montar), 200
 
 # Adicionar novo andamento
 @app.route('/api/projetos/<int:id>/andamentos', methods=['POST'])
@@ -230,10 +790,185 @@ def criar_andamento(id):
     db.session.commit()
     return jsonify(novo.to_dict()), 201
 
+# Histórico de andamentos de todos os projetos, mais recentes primeiro, com o
+# cursor das outras listagens (?projeto= repetido filtra vários projetos).
+FILTROS_ANDAMENTOS = {'projeto': Andamento.projeto_id}
+INTERVALOS_ANDAMENTOS = {
+    'data_de': (Andamento.data, '>='),
+    'data_ate': (Andamento.data, '<='),
+}
+ORDENS_ANDAMENTOS = {
+    'data': Andamento.data,
+    'id': Andamento.id,
+}
+
+
+@app.route('/api/andamentos', methods=['GET'])
+@_com_etag('andamentos')
+def listar_historico_andamentos():
+    try:
+        q = _aplicar_filtros(Andamento.query, FILTROS_ANDAMENTOS, INTERVALOS_ANDAMENTOS)
+        return _listagem(leitura.ANDAMENTOS.consulta(q), Andamento.id, ORDENS_ANDAMENTOS, '-data',
+                         leitura.ANDAMENTOS.montar), 200
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+# status/tipo/coordenação: o texto (canonizado) vira o id da tabela de domínio
+FILTROS_PROJETOS = {
+    'coordenacao': (Projeto.coordenacao_id, partial(id_dominio, 'coordenacao')),
+    'status': (Projeto.status_id, partial(id_dominio, 'status')),
+    'tipo': (Projeto.tipo_id, partial(id_dominio, 'tipo')),
+    'internalizacao': Projeto.internalizacao,
+    'prioridade': Projeto.prioridade,
+    'rag': Projeto.rag,
+    'responsavel': (Projeto.responsavel_id, partial(id_dominio, 'pessoa')),
+}
+ORDENS_PROJETOS = {
+    'id': Projeto.id,
+    'nome': Projeto.nome,
+    'inicio': Projeto.inicio,
+    'fim': Projeto.fim,
+    'progresso': Projeto.progresso,
+}
+# ?incluir=atividade: andamentos_total, ultimo_andamento e ultima_atividade em cada projeto
+INCLUIR_PROJETOS = {'atividade': ('andamentos',)}
+
+
 @app.route('/api/projetos', methods=['GET'])
+@_com_etag('projetos', incluir=INCLUIR_PROJETOS)
 def listar_projetos():
-    itens = Projeto.query.order_by(Projeto.id.desc()).all()
-    return jsonify([p.to_dict() for p in itens]), 200
+    try:
+        q = _aplicar_filtros(Projeto.query, FILTROS_PROJETOS, incluir=INCLUIR_PROJETOS)
+        q, montar = _consulta_projetos(q, _ler_incluir(INCLUIR_PROJETOS))
+        return _listagem(q, Projeto.id, ORDENS_PROJETOS, '-id', montar), 200
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+
+def _consulta_projetos(q, incluir):
+    """(colunas da listagem de projetos, montar) conforme o ?incluir=."""
+    if 'atividade' in incluir:
+        return leitura.com_atividade(leitura.PROJETOS.consulta(q)), leitura.montar_com_atividade
+    return leitura.PROJETOS.consulta(q), leitura.PROJETOS.montar
+
+
+# ====== KPIs do painel de projetos ======
+def _sem_acento_sql(col):
+    """Equivalente SQL de chave_dominio() (sem depender da extensão unaccent)."""
+    s = db.func.regexp_replace(db.func.btrim(col), db.literal_column(r"'\s+'"),
+                               db.literal_column("' '"), db.literal_column("'g'"))
+    return db.func.translate(db.func.lower(s),
+                             db.literal_column("'áàâãäéèêëíìîïóòôõöúùûüç'"),
+                             db.literal_column("'aaaaaeeeeiiiiooooouuuuc'"))
+
+
+@app.route('/api/projetos/stats', methods=['GET'])
+@_com_etag('projetos')
+def stats_projetos():
+    return jsonify(_corpo_stats_projetos()), 200
+
+
+def _corpo_stats_projetos():
+    """Contagens dos cards/KPIs do painel calculadas no banco.
+
+    Uma única query agrupada pelos ids de (coordenação, status, tipo) com
+    agregados FILTER; as poucas linhas resultantes são dobradas aqui nos cards
+    que o main.js monta hoje com list.filter(...). Os nomes vêm do cache de
+    domínios, comparados pela chave normalizada (o norm() do main.js).
+    """
+    concluido = id_dominio('status', 'Concluído')
+    hoje = db.func.current_date()
+
+    linhas = db.session.query(
+        Projeto.coordenacao_id.label('coord'),
+        Projeto.status_id.label('status'),
+        Projeto.tipo_id.label('tipo'),
+        db.func.count().label('total'),
+        db.func.count().filter(db.and_(Projeto.fim < hoje, Projeto.status_id != concluido)).label('fora_prazo'),
+        db.func.count().filter(db.and_(
+            Projeto.status_id == concluido,
+            db.func.date_trunc('month', Projeto.fim) == db.func.date_trunc('month', hoje),
+        )).label('concluidos_mes'),
+        db.func.coalesce(db.func.sum(Projeto.progresso), 0).label('soma_progresso'),
+        db.func.count(Projeto.progresso).label('n_progresso'),
+        db.func.count().filter(_sem_acento_sql(Projeto.nome).like('%catalogo%')).label('nome_catalogo'),
+    ).group_by(db.text('1, 2, 3')).all()
+
+    def _vazio():
+        return {'total': 0, 'fora_prazo': 0, 'por_status': {}, 'por_tipo': {}}
+
+    por_coord = {c: _vazio() for c in ('CODES', 'COSET', 'CGOD')}
+    por_status = {}
+    cards = {
+        'codes': dict.fromkeys(('desenvolvimento', 'sustentacao', 'ativos', 'fora-prazo',
+                                'planejado', 'concluido', 'pausado'), 0),
+        'coset': dict.fromkeys(('infraestrutura', 'integracao', 'sistemas-integrados',
+                                'modernizacao', 'compliance'), 0),
+        'cgod': dict.fromkeys(('analytics', 'datalake', 'catalogos', 'qualidade', 'governanca'), 0),
+    }
+    total = fora_prazo = concluidos_mes = soma_prog = n_prog = 0
+
+    for r in linhas:
+        coord = nome_dominio('coordenacao', r.coord)
+        st = chave_dominio(nome_dominio('status', r.status))
+        tp = chave_dominio(nome_dominio('tipo', r.tipo))
+        n = r.total
+        total += n
+        fora_prazo += r.fora_prazo
+        concluidos_mes += r.concluidos_mes
+        soma_prog += r.soma_progresso
+        n_prog += r.n_progresso
+        por_status[st] = por_status.get(st, 0) + n
+
+        c = por_coord.setdefault(coord, _vazio())
+        c['total'] += n
+        c['fora_prazo'] += r.fora_prazo
+        c['por_status'][st] = c['por_status'].get(st, 0) + n
+        c['por_tipo'][tp] = c['por_tipo'].get(tp, 0) + n
+
+        if coord == 'CODES':
+            k = cards['codes']
+            if st != 'concluido' and not st.startswith('sustentacao'):
+                k['desenvolvimento'] += n
+            if st.startswith('sustentacao'):
+                k['sustentacao'] += n
+            if st == 'em andamento':
+                k['ativos'] += n
+            k['fora-prazo'] += r.fora_prazo
+            for s in ('planejado', 'concluido', 'pausado'):
+                if st == s:
+                    k[s] += n
+        elif coord == 'COSET':
+            k = cards['coset']
+            for card, trecho in (('infraestrutura', 'infraestrutura'), ('integracao', 'integracao'),
+                                 ('sistemas-integrados', 'sistema integrado'),
+                                 ('modernizacao', 'modernizacao'), ('compliance', 'compliance')):
+                if trecho in tp:
+                    k[card] += n
+        elif coord == 'CGOD':
+            k = cards['cgod']
+            if 'dashboard' in tp or 'bi' in tp:
+                k['analytics'] += n
+            if 'dados' in tp:
+                k['datalake'] += n
+                k['catalogos'] += n
+            else:
+                k['catalogos'] += r.nome_catalogo
+            if 'qualidade' in tp:
+                k['qualidade'] += n
+            if 'governanca' in tp:
+                k['governanca'] += n
+
+    return {
+        'total': total,
+        'fora_prazo': fora_prazo,
+        'concluidos_mes': concluidos_mes,
+        'progresso_medio': int(soma_prog / n_prog + 0.5) if n_prog else 0,  # = Math.round
+        'ativos_codes': cards['codes']['ativos'],
+        'por_status': por_status,
+        'por_coordenacao': por_coord,
+        'cards': cards,
+    }
 
 @app.route('/api/projetos', methods=['POST'])
 def criar_projeto():
@@ -315,13 +1050,121 @@ def deletar_projeto(id):
         app.logger.exception("Erro ao deletar projeto")
         return jsonify({'erro': str(e)}), 400
 
+# ====== PESSOAS / CARGA DE TRABALHO ======
+# Responsável, equipe e desenvolvedor apontam para pessoas (ver Pessoa e
+# ProjetoMembro em database.py): a carga sai de GROUP BY nas chaves
+# indexadas, sem baixar projetos nem quebrar strings de equipe.
+@app.route('/api/pessoas', methods=['GET'])
+@_com_etag('pessoas')
+def listar_pessoas():
+    return jsonify(_lista_pessoas()), 200
+
+
+def _lista_pessoas():
+    linhas = db.session.execute(db.select(Pessoa.id, Pessoa.nome).order_by(Pessoa.chave))
+    return [{'id': i, 'nome': n} for i, n in linhas]
+
+
+def _carga_vazia(id_, nome):
+    return {
+        'id': id_,
+        'nome': nome,
+        'projetos_responsavel': {'total': 0, 'abertos': 0},
+        'projetos_membro': {'total': 0, 'abertos': 0},
+        'chamados': {'total': 0, 'abertos': 0,
+                     'por_bucket': dict.fromkeys([b for b, _ in STATUS_BUCKETS] + [BUCKET_OUTRO], 0)},
+    }
+
+
+def _carga(pessoa_id=None):
+    """{pessoa_id: contagens} de projetos (como responsável / membro) e chamados."""
+    concluido = id_dominio('status', 'Concluído')
+    aberto = Projeto.status_id != concluido
+    resp = db.session.query(Projeto.responsavel_id, db.func.count(), db.func.count().filter(aberto))\
+        .filter(Projeto.responsavel_id.isnot(None))
+    memb = db.session.query(ProjetoMembro.pessoa_id, db.func.count(), db.func.count().filter(aberto))\
+        .join(Projeto, Projeto.id == ProjetoMembro.projeto_id)
+    cham = db.session.query(SustentacaoChamado.desenvolvedor_id, SustentacaoChamado.status_bucket,
+                            db.func.count())\
+        .filter(SustentacaoChamado.desenvolvedor_id.isnot(None))
+    if pessoa_id is not None:
+        resp = resp.filter(Projeto.responsavel_id == pessoa_id)
+        memb = memb.filter(ProjetoMembro.pessoa_id == pessoa_id)
+        cham = cham.filter(SustentacaoChamado.desenvolvedor_id == pessoa_id)
+
+    carga = {}
+
+    def _de(id_):
+        if id_ not in carga:
+            carga[id_] = _carga_vazia(id_, nome_dominio('pessoa', id_))
+        return carga[id_]
+
+    for chave, q in (('projetos_responsavel', resp.group_by(Projeto.responsavel_id)),
+                     ('projetos_membro', memb.group_by(ProjetoMembro.pessoa_id))):
+        for id_, total, abertos in q:
+            _de(id_)[chave] = {'total': total, 'abertos': abertos}
+    for id_, bucket, n in cham.group_by(SustentacaoChamado.desenvolvedor_id, SustentacaoChamado.status_bucket):
+        c = _de(id_)['chamados']
+        c['total'] += n
+        c['por_bucket'][bucket or BUCKET_OUTRO] += n
+        if bucket != 'concluido':
+            c['abertos'] += n
+    return carga
+
+
+@app.route('/api/pessoas/carga', methods=['GET'])
+@_com_etag('pessoas', 'projetos', 'projeto_membros', 'sustentacao_chamados')
+def carga_pessoas():
+    """Carga de todas as pessoas com alguma alocação, por nome."""
+    carga = _carga()
+    return jsonify(sorted(carga.values(), key=lambda c: chave_dominio(c['nome']))), 200
+
+
+@app.route('/api/pessoas/<int:id>/carga', methods=['GET'])
+@_com_etag('pessoas', 'projetos', 'projeto_membros', 'sustentacao_chamados')
+def carga_pessoa(id):
+    """Carga de uma pessoa + os projetos em que ela está (e em que papel).
+    Os chamados em si: GET /api/sustentacao?desenvolvedor=<nome>."""
+    pessoa = db.get_or_404(Pessoa, id)
+    d = _carga(id).get(id) or _carga_vazia(pessoa.id, pessoa.nome)
+    membro_de = db.select(ProjetoMembro.projeto_id).where(ProjetoMembro.pessoa_id == id)
+    projetos = Projeto.query.filter(db.or_(Projeto.responsavel_id == id, Projeto.id.in_(membro_de)))\
+        .order_by(Projeto.id.desc())
+    d['projetos'] = [{
+        'id': p.id, 'nome': p.nome, 'coordenacao': p.coordenacao, 'status': p.status,
+        'fim': p.fim,
+        'papeis': [papel for papel, sim in (('responsavel', p.responsavel_id == id),
+                                            ('membro', any(m.pessoa_id == id for m in p.membros))) if sim],
+    } for p in projetos]
+    return jsonify(d), 200
+
+
 from database import db, PDTIAction
 
 # Listar
+FILTROS_PDTI = {
+    'tipo': PDTIAction.tipo,
+    'situacao': PDTIAction.situacao,
+}
+ORDENS_PDTI = {
+    'id': PDTIAction.id,
+    'data_conclusao': PDTIAction.data_conclusao,
+    'situacao': PDTIAction.situacao,
+}
+
+
 @app.route("/api/pdti", methods=["GET"])
+@_com_etag('pdti_acoes')
 def listar_pdti():
-    itens = PDTIAction.query.order_by(PDTIAction.id).all()
-    return jsonify([a.to_dict() for a in itens])
+    # lista curta: sempre inteira (sem cursor), mas filtrável/ordenável
+    try:
+        q = _aplicar_filtros(PDTIAction.query, FILTROS_PDTI)
+        _, col, desc = _ler_ordem(ORDENS_PDTI, 'id')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    criterio = col.desc() if desc else col.asc()
+    itens = leitura.PDTI.consulta(q).order_by(criterio.nulls_last(), PDTIAction.id).all()
+    return jsonify([leitura.PDTI.montar(a) for a in itens])
 
 # Criar
 @app.route("/api/pdti", methods=["POST"])
@@ -382,9 +1225,254 @@ def deletar_pdti(acao_id):
     db.session.commit()
     return jsonify({"mensagem": "Ação excluída com sucesso"})
 
+# ====== BOOTSTRAP (carga inicial do front) ======
+# Ao abrir, o front pedia /api/projetos, /api/sustentacao, /api/pdti e — no
+# sustentacao.js — /api/projetos?all=1 de novo só pelos nomes. GET
+# /api/bootstrap devolve numa resposta o que as telas usam na primeira
+# pintura; cada seção tem o mesmo JSON da rota equivalente:
+#   projetos, sustentacao              primeira página (?limit=, padrão 50);
+#                                      o proximo_cursor continua na rota da lista
+#   projetos_stats, sustentacao_stats  /api/projetos/stats, /api/sustentacao/stats
+#   pdti                               /api/pdti
+#   pessoas                            /api/pessoas
+#   projetos_nomes                     {id: nome} de todos os projetos
+# ?secoes=a,b pede só algumas. As seções rodam ao mesmo tempo, cada uma numa
+# thread com app context e sessão (conexão) próprios; o pool de threads é do
+# processo (BOOTSTRAP_THREADS, padrão 4), então bootstraps simultâneos somam
+# no máximo essas conexões às do pool das requisições. ETag/304 e cache de
+# respostas valem para a resposta inteira.
+from concurrent.futures import ThreadPoolExecutor
+
+_pool_bootstrap = ThreadPoolExecutor(max_workers=int(os.getenv('BOOTSTRAP_THREADS', '4')),
+                                     thread_name_prefix='bootstrap')
+
+
+def _primeira_pagina(q, id_col, ordens, padrao, serializar, limit):
+    q, limit, chave = _plano_listagem(q, id_col, ordens, padrao, {'limit': limit})
+    return _corpo_pagina(q.limit(limit + 1).all(), limit, chave, serializar)
+
+
+def _projetos_nomes():
+    return {i: n for i, n in db.session.execute(db.select(Projeto.id, Projeto.nome))}
+
+
+def _lista_pdti():
+    q = leitura.PDTI.consulta(PDTIAction.query).order_by(PDTIAction.id.asc().nulls_last(), PDTIAction.id)
+    return [leitura.PDTI.montar(a) for a in q.all()]
+
+
+SECOES_BOOTSTRAP = {
+    'projetos': lambda limit: _primeira_pagina(leitura.PROJETOS.consulta(Projeto.query), Projeto.id,
+                                               ORDENS_PROJETOS, '-id', leitura.PROJETOS.montar, limit),
+    'projetos_stats': lambda limit: _corpo_stats_projetos(),
+    'sustentacao': lambda limit: _primeira_pagina(leitura.CHAMADOS.consulta(SustentacaoChamado.query),
+                                                  SustentacaoChamado.id, ORDENS_SUSTENTACAO, '-data_chamado',
+                                                  leitura.CHAMADOS.montar, limit),
+    'sustentacao_stats': lambda limit: _corpo_stats_sustentacao(
+        db.session.execute(CONSULTA_STATS_SUSTENTACAO).all()),
+    'pdti': lambda limit: _lista_pdti(),
+    'pessoas': lambda limit: _lista_pessoas(),
+    'projetos_nomes': lambda limit: _projetos_nomes(),
+}
+
+
+def _secao_bootstrap(nome, limit):
+    with app.app_context():   # sessão própria; o teardown devolve a conexão
+        return SECOES_BOOTSTRAP[nome](limit)
+
+
+@app.route('/api/bootstrap', methods=['GET'])
+@_com_etag('projetos', 'pessoas', 'sustentacao_chamados', 'pdti_acoes')
+def bootstrap():
+    desconhecidos = [p for p in request.args if p not in ('secoes', 'limit') and not _anti_cache(p)]
+    secoes = [s.strip() for s in (request.args.get('secoes') or ','.join(SECOES_BOOTSTRAP)).split(',') if s.strip()]
+    invalidas = [s for s in secoes if s not in SECOES_BOOTSTRAP]
+    if desconhecidos or invalidas or not secoes:
+        return jsonify({'erro': f'parâmetro ou seção inválida: {", ".join(desconhecidos + invalidas)}',
+                        'secoes': list(SECOES_BOOTSTRAP)}), 400
+    try:
+        limit, _ = _ler_paginacao(3, {'limit': request.args.get('limit', PAGINA_PADRAO)})
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+    # a leitura das versões (ETag) deixou uma conexão presa nesta sessão:
+    # devolve ao pool antes de as seções pegarem as delas
+    db.session.close()
+    futuros = {s: _pool_bootstrap.submit(_secao_bootstrap, s, limit) for s in secoes}
+    return jsonify({s: f.result() for s, f in futuros.items()}), 200
+
+
+# ====== DELTA (sincronização incremental) ======
+# GET /api/<entidade>/changes?since=<token>: as linhas criadas/alteradas desde
+# o token, no formato da listagem, e as chaves excluídas desde então
+# (tombstones em remocoes, ver database.py). O cliente aplica "removidos",
+# depois "alterados" (upsert pela chave: id, ou numero_chamado) e guarda o
+# "token" para a próxima chamada. Sem since vem tudo; com "mais": true há
+# outra página — chame de novo já com o token novo.
+#
+# atualizado_em é o now() da transação que escreveu, não o instante do
+# commit: uma transação que começou antes da leitura e commitou depois fica
+# com atualizado_em "atrás" do token. Por isso o token final recua
+# DELTA_JANELA_S segundos, e o de uma página intermediária ("mais") também
+# não passa de agora - DELTA_JANELA_S quando a página cruza esse ponto:
+# alguns itens se repetem na chamada seguinte (o upsert do cliente é
+# idempotente), nenhum se perde. Só mais de uma página inteira de alterações
+# dentro da própria janela avança pela última linha (senão a paginação não
+# sairia do lugar). Tokens mais velhos que
+# DELTA_RETENCAO_DIAS recebem 410 (os tombstones já podem ter sido apagados
+# por flask limpar-remocoes): o cliente recarrega a lista completa.
+from database import Remocao, CHAVES_REMOCAO
+
+DELTA_JANELA = timedelta(seconds=int(os.getenv('DELTA_JANELA_S', '30')))
+DELTA_RETENCAO = timedelta(days=int(os.getenv('DELTA_RETENCAO_DIAS', '30')))
+DELTA = {
+    'sustentacao': (SustentacaoChamado, leitura.CHAMADOS),
+    'projetos': (Projeto, leitura.PROJETOS),
+    'andamentos': (Andamento, leitura.ANDAMENTOS),
+    'pdti': (PDTIAction, leitura.PDTI),
+}
+
+
+def _ler_token(entidade, tipo_id):
+    """?since= -> (atualizado_em, id) ou None. Levanta ValueError se inválido."""
+    token = request.args.get('since')
+    if not token:
+        return None
+    valores = _decode_cursor(token)
+    if len(valores) != 3 or valores[0] != entidade or not isinstance(valores[2], tipo_id):
+        raise ValueError('token inválido')
+    marca = _parse_datetime(valores[1]) if isinstance(valores[1], str) else None
+    if marca is None:
+        raise ValueError('token inválido')
+    return marca, valores[2]
+
+
+def _delta(entidade):
+    modelo, leit = DELTA[entidade]
+    tabela = modelo.__tablename__
+    tipo_id = modelo.__table__.c.id.type.python_type
+    try:
+        desde = _ler_token(entidade, tipo_id)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', PAGINA_MAX)), PAGINA_MAX))
+    except ValueError:
+        return jsonify({'erro': 'limit inválido'}), 400
+
+    agora = db.session.scalar(db.select(db.func.localtimestamp()))
+    if desde and desde[0] < agora - DELTA_RETENCAO:
+        return jsonify({'erro': 'token expirado: recarregue a lista completa (sem since)'}), 410
+
+    q = leit.consulta(modelo.query)
+    if desde:
+        q = q.filter(db.tuple_(modelo.atualizado_em, modelo.id) > db.tuple_(*desde))
+    linhas = q.order_by(modelo.atualizado_em, modelo.id).limit(limit + 1).all()
+    mais = len(linhas) > limit
+    linhas = linhas[:limit]
+    if mais:
+        ultima = (linhas[-1].atualizado_em, linhas[-1].id)
+        janela = (agora - DELTA_JANELA, tipo_id())
+        if (linhas[0].atualizado_em, linhas[0].id) <= janela:
+            ultima = min(ultima, janela)
+        token = _encode_cursor(entidade, *ultima)
+    else:
+        token = _encode_cursor(entidade, agora - DELTA_JANELA, tipo_id())   # 0 ou ''
+
+    removidos = []
+    if desde:
+        conv = modelo.__table__.c[CHAVES_REMOCAO[tabela]].type.python_type
+        chaves = db.session.execute(
+            db.select(Remocao.chave).distinct()
+            .where(Remocao.tabela == tabela, Remocao.removido_em >= desde[0])).scalars()
+        removidos = sorted(conv(c) for c in chaves)
+
+    return jsonify({
+        'alterados': [leit.montar(r) for r in linhas],
+        'removidos': removidos,
+        'token': token,
+        'mais': mais,
+    })
+
+
+@app.route('/api/<any(sustentacao, projetos, andamentos, pdti):entidade>/changes', methods=['GET'])
+def delta(entidade):
+    # a ETag depende da tabela da entidade: toda exclusão também muda a versão dela
+    return _com_etag(DELTA[entidade][0].__tablename__)(_delta)(entidade)
+
+
+@app.cli.command('limpar-remocoes')
+def limpar_remocoes_cli():
+    """Apaga tombstones mais velhos que DELTA_RETENCAO_DIAS."""
+    res = db.session.execute(db.delete(Remocao).where(
+        Remocao.removido_em < db.func.localtimestamp() - DELTA_RETENCAO))
+    db.session.commit()
+    click.echo(f'{res.rowcount} remoções apagadas')
+
+
+# ====== EVENTOS (Server-Sent Events) ======
+# Alterações feitas por qualquer pessoa chegam aos painéis abertos sem
+# recarregar tudo: ver eventos.py (LISTEN/NOTIFY, uma conexão por worker).
+import eventos
+eventos.init_app(app)
+
+
+@app.route('/api/events', methods=['GET'])
+def stream_eventos():
+    """text/event-stream; ?entidades=projetos,sustentacao limita as entidades."""
+    try:
+        entidades = eventos.ler_entidades(request.args.get('entidades'))
+    except ValueError as e:
+        return jsonify({'erro': str(e), 'entidades': eventos.ENTIDADES}), 400
+    fila = eventos.assinar()
+    if fila is None:
+        return jsonify({'erro': 'limite de streams de eventos neste processo; tente de novo'}), \
+            503, {'Retry-After': '5'}
+    resp = Response(eventos.stream(fila, entidades or None), mimetype='text/event-stream')
+    # cliente que fecha antes do primeiro byte: o finally do gerador não roda
+    resp.call_on_close(partial(eventos.cancelar, fila))
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'   # nginx: não segurar o stream no buffer
+    return resp
+
+
+@app.route('/internal/eventos', methods=['GET'])
+def eventos_stats():
+    return jsonify(eventos.estatisticas()), 200
+
+
+# ========= INTERNO: cache de respostas =========
+# Contadores deste processo (pid); no /metrics, cache_respostas_total soma os workers.
+@app.route('/internal/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(cache.estatisticas()), 200
+
+
+# ========= INTERNO: telemetria do pool =========
+# Cada worker do gunicorn tem o seu pool; os números são deste processo (pid).
+@app.route('/internal/pool', methods=['GET'])
+def pool_stats():
+    pool = db.engine.pool
+    stats = pool.estatisticas() if hasattr(pool, 'estatisticas') else {'pid': os.getpid()}
+    workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+    stats['workers'] = workers
+    stats['conexoes_max_estimadas'] = workers * (stats.get('tamanho', 0) + stats.get('max_overflow', 0))
+    return jsonify(stats), 200
+
+
+def create_app():
+    """Devolve o app configurado (usado pelo wsgi.py / gunicorn).
+
+    O schema não é criado aqui: as migrações rodam uma vez antes de subir os
+    workers (wait-for-db.sh com DB_MIGRATE=1, ou flask --app app db upgrade).
+    """
+    return app
+
+
 if __name__ == '__main__':
+    # modo dev: servidor do Werkzeug com debugger/reloader (produção: wsgi.py + gunicorn)
     with app.app_context():
         print("DB URI:", app.config['SQLALCHEMY_DATABASE_URI'])
-        db.create_all()
+        upgrade()   # aplica as migrações pendentes (migrations/)
     app.run(host='0.0.0.0', port=5001, debug=True)  # <- troquei para 5001
 
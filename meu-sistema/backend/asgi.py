@@ -0,0 +1,309 @@
+# Entrada ASGI, alternativa ao wsgi.py:
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 4
+#   GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+#
+# No deploy síncrono cada requisição segura uma thread do worker durante
+# toda a ida e volta ao banco: a concorrência para no nº de threads. Aqui as
+# leituras mais pedidas (listagens, observações, andamentos, stats dos
+# chamados) são handlers async — asyncpg + AsyncSession do SQLAlchemy sobre
+# os mesmos modelos de database.py e as mesmas colunas de leitura.py —, e o
+# worker atende outras requisições enquanto a query está no banco.
+#
+# /api/events (SSE) também é nativo: cada stream é uma corrotina esperando a
+# fila de eventos, sem segurar thread; dá para deixar painéis abertos o dia
+# todo (limite: EVENTOS_MAX_ASSINANTES, padrão 1000 por processo).
+#
+# Todo o resto (escritas, import/export, busca, /metrics...)
+# cai no app Flask inteiro, montado via WSGI numa thread pool: a API é a
+# mesma, rota por rota. As rotas async seguem o contrato das do Flask:
+# mesmos parâmetros e erros 400 (os helpers de filtro/ordem/cursor são os de
+# app.py), mesmo JSON byte a byte (serializacao.corpo_json), ETag/304 pela
+# TabelaVersao, gzip/brotli pelo Accept-Encoding e CORS. Diferença: não
+# passam pelo cache de respostas (cache.py é síncrono); o 304 continua.
+#
+#   ASGI_WSGI_THREADS  threads das rotas Flask por processo (padrão:
+#                      GUNICORN_THREADS ou 4)
+#   ASGI_ROTAS         0 manda tudo para o Flask (para comparar no bench)
+#
+# O engine async tem pool próprio (config.engine_options_async).
+# Comparação com o deploy síncrono: python -m bench.asgi.
+import contextlib
+import logging
+import os
+import time
+
+from a2wsgi import WSGIMiddleware
+from flask_compress.flask_compress import _choose_algorithm, _compress_data, _format
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Match, Route
+
+import app as sincrono
+import config
+import database
+import eventos
+import leitura
+import metricas
+import serializacao
+from database import Andamento, PDTIAction, Projeto, SustentacaoChamado, SustentacaoObservacao, TabelaVersao
+from utils import _parse_bool
+
+log = logging.getLogger(__name__)
+
+flask_app = sincrono.app
+engine = create_async_engine(config.database_uri_async(), **config.engine_options_async())
+Sessao = async_sessionmaker(engine, expire_on_commit=False)
+
+_ALGORITMOS = _format(flask_app.config['COMPRESS_ALGORITHM'])
+_ROTAS_ASYNC = _parse_bool(os.getenv('ASGI_ROTAS', '1'))
+_flask = WSGIMiddleware(flask_app, workers=int(os.getenv('ASGI_WSGI_THREADS')
+                                               or os.getenv('GUNICORN_THREADS', '4')))
+
+if _ROTAS_ASYNC:
+    eventos.servir_nativo()
+
+ROTAS = []   # (Route, regra do Flask para as métricas, tabelas da ETag, incluir)
+
+
+def _rota(caminho, regra, *tabelas, incluir=None):
+    """Registra um GET async. O handler recebe (request, sessao) e devolve o
+    corpo (dict/list), ou None para deixar a requisição com o Flask.
+    tabelas/incluir: como no _com_etag da rota Flask."""
+    def deco(fn):
+        ROTAS.append((Route(caminho, fn), regra, tabelas, incluir))
+        return fn
+    return deco
+
+
+async def _linhas(sessao, stmt):
+    return (await sessao.execute(stmt)).all()
+
+
+async def _versoes(sessao, tabelas):
+    """database.versoes_atuais, pela sessão async."""
+    t = TabelaVersao.__table__
+    versoes = dict.fromkeys(tabelas, 0)
+    versoes.update(await _linhas(sessao, database.db.select(t.c.tabela, t.c.versao).where(t.c.tabela.in_(tabelas))))
+    return versoes
+
+
+async def _listagem(sessao, q, id_col, ordens, padrao, serializar, args):
+    q, limit, chave = sincrono._plano_listagem(q, id_col, ordens, padrao, args)
+    if limit is None:
+        return [serializar(r) for r in await _linhas(sessao, q)]
+    return sincrono._corpo_pagina(await _linhas(sessao, q.limit(limit + 1)), limit, chave, serializar)
+
+
+# ====== ROTAS ASYNC ======
+@_rota('/api/sustentacao', '/api/sustentacao', 'sustentacao_chamados', incluir=sincrono.INCLUIR_SUSTENTACAO)
+async def listar_sustentacao(request, sessao):
+    args = request.query_params
+    q = sincrono._aplicar_filtros(database.db.select(SustentacaoChamado), sincrono.FILTROS_SUSTENTACAO,
+                                  sincrono.INTERVALOS_SUSTENTACAO, args=args, incluir=sincrono.INCLUIR_SUSTENTACAO)
+    q, montar = sincrono._consulta_chamados(q, sincrono._ler_incluir(sincrono.INCLUIR_SUSTENTACAO, args))
+    return await _listagem(sessao, q, SustentacaoChamado.id, sincrono.ORDENS_SUSTENTACAO,
+                           '-data_chamado', montar, args)
+
+
+@_rota('/api/sustentacao/stats', '/api/sustentacao/stats', 'sustentacao_chamados')
+async def stats_sustentacao(request, sessao):
+    return sincrono._corpo_stats_sustentacao(await _linhas(sessao, sincrono.CONSULTA_STATS_SUSTENTACAO))
+
+
+@_rota('/api/sustentacao/observacoes', '/api/sustentacao/observacoes', 'sustentacao_observacoes')
+async def observacoes_em_lote(request, sessao):
+    numeros = sincrono._numeros_lote(request.query_params)
+    q = sincrono._consulta_observacoes_lote(leitura.OBSERVACOES.select(), numeros)
+    return sincrono._agrupar_observacoes(numeros, await _linhas(sessao, q))
+
+
+@_rota('/api/sustentacao/{numero}/observacoes', '/api/sustentacao/<string:numero>/observacoes',
+       'sustentacao_chamados', 'sustentacao_observacoes')
+async def listar_observacoes(request, sessao):
+    numero = request.path_params['numero']
+    existe = await sessao.scalar(database.db.select(SustentacaoChamado.id)
+                                 .where(SustentacaoChamado.numero_chamado == numero).limit(1))
+    if existe is None:
+        return None   # o 404 é o do Flask
+    q = leitura.OBSERVACOES.select().where(SustentacaoObservacao.numero_chamado == numero)\
+        .order_by(SustentacaoObservacao.criado_em.desc())
+    return [leitura.OBSERVACOES.montar(r) for r in await _linhas(sessao, q)]
+
+
+@_rota('/api/projetos', '/api/projetos', 'projetos', incluir=sincrono.INCLUIR_PROJETOS)
+async def listar_projetos(request, sessao):
+    args = request.query_params
+    q = sincrono._aplicar_filtros(database.db.select(Projeto), sincrono.FILTROS_PROJETOS, args=args,
+                                  incluir=sincrono.INCLUIR_PROJETOS)
+    q, montar = sincrono._consulta_projetos(q, sincrono._ler_incluir(sincrono.INCLUIR_PROJETOS, args))
+    return await _listagem(sessao, q, Projeto.id, sincrono.ORDENS_PROJETOS, '-id', montar, args)
+
+
+@_rota('/api/andamentos', '/api/andamentos', 'andamentos')
+async def listar_historico_andamentos(request, sessao):
+    args = request.query_params
+    q = sincrono._aplicar_filtros(leitura.ANDAMENTOS.select(), sincrono.FILTROS_ANDAMENTOS,
+                                  sincrono.INTERVALOS_ANDAMENTOS, args=args)
+    return await _listagem(sessao, q, Andamento.id, sincrono.ORDENS_ANDAMENTOS, '-data',
+                           leitura.ANDAMENTOS.montar, args)
+
+
+@_rota('/api/projetos/{id:int}/andamentos', '/api/projetos/<int:id>/andamentos', 'andamentos')
+async def listar_andamentos(request, sessao):
+    args, montar = request.query_params, leitura.ANDAMENTOS.montar
+    q = leitura.ANDAMENTOS.select().where(Andamento.projeto_id == request.path_params['id'])
+    if sincrono._quer_lista_completa(args):
+        return [montar(a) for a in await _linhas(sessao, q.order_by(Andamento.data.desc()))]
+
+    limit, cursor = sincrono._ler_paginacao(2, args)
+    if cursor:
+        q = q.where(sincrono._apos_cursor(Andamento.data, Andamento.id, *sincrono._cursor_data_id(cursor)))
+    q = q.order_by(Andamento.data.desc().nulls_last(), Andamento.id.desc())
+    return sincrono._corpo_pagina(await _linhas(sessao, q.limit(limit + 1)), limit,
+                                  lambda a: (a.data, a.id), montar)
+
+
+@_rota('/api/pdti', '/api/pdti', 'pdti_acoes')
+async def listar_pdti(request, sessao):
+    args = request.query_params
+    q = sincrono._aplicar_filtros(leitura.PDTI.select(), sincrono.FILTROS_PDTI, args=args)
+    _, col, desc = sincrono._ler_ordem(sincrono.ORDENS_PDTI, 'id', args)
+    criterio = col.desc() if desc else col.asc()
+    return [leitura.PDTI.montar(a)
+            for a in await _linhas(sessao, q.order_by(criterio.nulls_last(), PDTIAction.id))]
+
+
+# ====== RESPOSTA: ETag, compressão, métricas ======
+def _etag_recebida(request, etag):
+    """A tag do If-None-Match que corresponde à etag (com ou sem ":br"/":gzip")."""
+    for t in request.headers.get('if-none-match', '').split(','):
+        t = t.strip().removeprefix('W/').strip('"')
+        if t == etag or t.partition(':')[0] == etag:
+            return t
+    return None
+
+
+def _comprimir(request, corpo):
+    """(corpo, algoritmo ou None). A negociação do Accept-Encoding (q-values,
+    *, identity) e a compressão são as do próprio Flask-Compress, com a
+    config do app Flask (COMPRESS_*): mesmos bytes que a rota Flask."""
+    cfg = flask_app.config
+    if not cfg['COMPRESS_REGISTER'] or len(corpo) < cfg['COMPRESS_MIN_SIZE']:
+        return corpo, None
+    algoritmo = _choose_algorithm(_ALGORITMOS, request.headers.get('accept-encoding', ''))
+    if algoritmo is None:
+        return corpo, None
+    return _compress_data(flask_app, corpo, algoritmo), algoritmo
+
+
+def _corpo(request, obj):
+    return _comprimir(request, serializacao.corpo_json(obj))
+
+
+async def _responder(request, handler, tabelas, incluir):
+    """Response, ou None se o handler devolveu a requisição para o Flask."""
+    tabelas = sincrono._tabelas_lidas(tabelas, incluir, request.query_params)
+    async with Sessao() as sessao:
+        etag = sincrono._etag(request.url.path, request.query_params.multi_items(), tabelas,
+                              await _versoes(sessao, tabelas))
+        recebida = _etag_recebida(request, etag)
+        if recebida:
+            return Response(status_code=304, headers={'ETag': f'"{recebida}"', 'Cache-Control': 'no-cache',
+                                                      'Access-Control-Allow-Origin': '*'})
+        # nome_dominio/id_dominio podem recarregar o cache de domínios (db.engine)
+        with flask_app.app_context():
+            try:
+                obj, status = await handler(request, sessao), 200
+            except ValueError as e:
+                obj, status = {'erro': str(e)}, 400
+    if obj is None:
+        return None
+
+    # JSON + gzip/brotli de uma listagem grande (?all=1) é CPU: fora do event loop
+    corpo, algoritmo = await run_in_threadpool(_corpo, request, obj)
+    headers = {'Vary': 'Accept-Encoding', 'Access-Control-Allow-Origin': '*'}
+    if algoritmo:
+        headers['Content-Encoding'] = algoritmo
+    if status == 200:
+        headers['ETag'] = f'"{etag}:{algoritmo}"' if algoritmo else f'"{etag}"'
+        headers['Cache-Control'] = 'no-cache'
+    return Response(corpo, status_code=status, headers=headers, media_type='application/json')
+
+
+# ====== EVENTOS (Server-Sent Events) ======
+_CABECALHOS_EVENTOS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', 'Access-Control-Allow-Origin': '*'}
+
+
+def _erro_json(obj, status, headers=None):
+    return Response(serializacao.corpo_json(obj), status_code=status, media_type='application/json',
+                    headers={'Access-Control-Allow-Origin': '*', **(headers or {})})
+
+
+async def _eventos(scope, receive, send):
+    """GET /api/events, o mesmo contrato da rota Flask (stream_eventos)."""
+    request = Request(scope, receive)
+    try:
+        entidades = eventos.ler_entidades(request.query_params.get('entidades'))
+    except ValueError as e:
+        resp = _erro_json({'erro': str(e), 'entidades': eventos.ENTIDADES}, 400)
+    else:
+        fila = eventos.assinar_async()
+        if fila is None:
+            resp = _erro_json({'erro': 'limite de streams de eventos neste processo; tente de novo'}, 503,
+                              {'Retry-After': '5'})
+        else:
+            corpo = eventos.stream_async(fila, entidades or None)
+            resp = StreamingResponse(corpo, media_type='text/event-stream', headers=_CABECALHOS_EVENTOS)
+            try:
+                metricas.REQUISICOES.labels('/api/events', 'GET', '200').inc()
+                await resp(scope, receive, send)
+            finally:
+                # cliente que caiu no meio de um send: o gerador fica parado
+                # num await e o finally dele não roda sozinho
+                await corpo.aclose()
+                eventos.cancelar(fila)
+            return
+    metricas.REQUISICOES.labels('/api/events', 'GET', str(resp.status_code)).inc()
+    await resp(scope, receive, send)
+
+
+async def _despachar(scope, receive, send):
+    if _ROTAS_ASYNC and scope['type'] == 'http' and scope['method'] == 'GET':
+        if scope['path'] == '/api/events':
+            return await _eventos(scope, receive, send)
+        for rota, regra, tabelas, incluir in ROTAS:
+            casou, filho = rota.matches(scope)
+            if casou != Match.FULL:
+                continue
+            t0 = time.perf_counter()
+            resp = await _responder(Request({**scope, **filho}, receive), rota.endpoint, tabelas, incluir)
+            if resp is None:
+                break
+            await resp(scope, receive, send)
+            metricas.REQUISICOES.labels(regra, 'GET', str(resp.status_code)).inc()
+            metricas.LATENCIA.labels(regra, 'GET').observe(time.perf_counter() - t0)
+            metricas.TAMANHO.labels(regra, 'GET').observe(len(resp.body))
+            return
+    await _flask(scope, receive, send)
+
+
+@contextlib.asynccontextmanager
+async def _ciclo(_):
+    # cache de domínios quente antes da primeira requisição: uma recarga
+    # dentro de um handler async é síncrona (rara, mas trava o loop)
+    try:
+        with flask_app.app_context():
+            for dominio in database.DOMINIOS:
+                database._cache(dominio)
+    except Exception:
+        log.exception('asgi: não consegui carregar os domínios; ficam para a primeira requisição')
+    yield
+    await engine.dispose()
+
+
+app = Starlette(lifespan=_ciclo)
+app.router.default = _despachar   # Starlette só pelo lifespan: o roteamento é o _despachar
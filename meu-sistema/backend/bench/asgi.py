@@ -0,0 +1,142 @@
+"""Deploy síncrono (gunicorn gthread, wsgi:app) x ASGI (uvicorn, asgi:app).
+
+Uso (a partir de backend/, com o banco semeado por bench.seed e as portas
+livres):
+
+    python -m bench.asgi --concorrencias 8,32,128 --duracao 20 \\
+        --sync-workers 4 --threads 4 --asgi-workers 4
+
+Sobe um servidor de cada vez (gunicorn -c gunicorn.conf.py, trocando só o
+worker: gthread ou uvicorn.workers.UvicornWorker), mede o RSS ocioso do
+master + workers e roda o bench.carga (cenário leitura) em cada nível de
+concorrência. Cache de respostas desligado nos dois (as rotas async não
+usam o cache.py; com ele ligado a comparação mediria o cache).
+
+"Mesma memória": o relatório mostra o RSS ocioso e o pico de cada deploy e
+rps por 100 MB de pico; ajuste --sync-workers/--asgi-workers até os RSS
+ficarem próximos (avisa se diferirem mais de 15%). No sync a concorrência
+máxima é workers x threads; no ASGI as rotas async não têm esse teto (o
+limite passa a ser o pool de conexões, DB_POOL_SIZE + DB_MAX_OVERFLOW).
+
+O resultado vai para bench/resultados/<data>-<commit>-asgi.json.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+from bench import carga
+
+DEPLOYS = {
+    'sync': ('wsgi:app', 'gthread'),
+    'asgi': ('asgi:app', 'uvicorn.workers.UvicornWorker'),
+}
+
+
+def _subir(nome, args, porta):
+    modulo, worker = DEPLOYS[nome]
+    env = dict(os.environ,
+               PORT=str(porta),
+               GUNICORN_WORKER_CLASS=worker,
+               WEB_CONCURRENCY=str(args.sync_workers if nome == 'sync' else args.asgi_workers),
+               GUNICORN_THREADS=str(args.threads),
+               GUNICORN_MAX_REQUESTS='0',   # reciclar workers no meio mediria o boot
+               GUNICORN_LOGLEVEL='warning',
+               CACHE_BACKEND='off')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile',
+                             '/dev/null', modulo], env=env)
+    url = f'http://127.0.0.1:{porta}'
+    limite = time.time() + 60
+    while time.time() < limite:
+        if proc.poll() is not None:
+            sys.exit(f'{nome}: o servidor saiu com código {proc.returncode}')
+        try:
+            urllib.request.urlopen(url + '/api/sustentacao/stats', timeout=2).read()
+            return proc, url
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    sys.exit(f'{nome}: o servidor não respondeu em 60 s')
+
+
+def _parar(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def _medir_deploy(nome, args):
+    proc, url = _subir(nome, args, args.porta)
+    try:
+        # uma volta em cada rota aquece pools, statement cache e domínios
+        carga.executar(_args_carga(args, url, proc.pid, 4, duracao=2, aquecimento=0))
+        ocioso_mb = round(carga._rss_kb(proc.pid) / 1024, 1)
+        niveis = {}
+        for n in args.concorrencias:
+            res = carga.executar(_args_carga(args, url, proc.pid, n))
+            niveis[str(n)] = {'total': res['total'], 'rss_pico_mb': res['rss_pico_mb'],
+                              'operacoes': res['operacoes']}
+            t = res['total']
+            print(f"{nome:<5} {n:>5} {t['rps']:>9} {t['p50_ms']:>8} {t['p99_ms']:>9} {t['erros']:>6} "
+                  f"{res['rss_pico_mb']:>9}", flush=True)
+        return {'rss_ocioso_mb': ocioso_mb, 'niveis': niveis}
+    finally:
+        _parar(proc)
+
+
+def _args_carga(args, url, pid, concorrencia, duracao=None, aquecimento=None):
+    return argparse.Namespace(
+        url=url, concorrencia=concorrencia, cenario='leitura', completas=False, encoding=args.encoding,
+        duracao=args.duracao if duracao is None else duracao,
+        aquecimento=args.aquecimento if aquecimento is None else aquecimento,
+        pid=pid, semente=42, rotulo='')
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--concorrencias', default='8,32,128',
+                    type=lambda s: [int(x) for x in s.split(',')], help='níveis de concorrência (lista)')
+    ap.add_argument('--duracao', type=float, default=20, help='segundos medidos por nível')
+    ap.add_argument('--aquecimento', type=float, default=3)
+    ap.add_argument('--sync-workers', type=int, default=4)
+    ap.add_argument('--threads', type=int, default=4, help='threads por worker no sync (e do WSGI no asgi)')
+    ap.add_argument('--asgi-workers', type=int, default=4)
+    ap.add_argument('--encoding', choices=['identity', 'gzip', 'br'], default='identity')
+    ap.add_argument('--porta', type=int, default=5098)
+    ap.add_argument('--deploy', action='append', choices=list(DEPLOYS), help='só este deploy (pode repetir)')
+    ap.add_argument('--saida', default=carga.PASTA_RESULTADOS)
+    args = ap.parse_args(argv)
+
+    print(f"{'deploy':<5} {'conc':>5} {'rps':>9} {'p50 ms':>8} {'p99 ms':>9} {'erros':>6} {'RSS MB':>9}")
+    res = {nome: _medir_deploy(nome, args) for nome in args.deploy or DEPLOYS}
+
+    print()
+    for nome, r in res.items():
+        pico = max(n['rss_pico_mb'] or 0 for n in r['niveis'].values())
+        melhor = max(n['total']['rps'] for n in r['niveis'].values())
+        por_100mb = f" = {melhor / pico * 100:.0f} rps por 100 MB" if pico else ''
+        print(f"{nome}: RSS ocioso {r['rss_ocioso_mb']} MB, pico {pico} MB, melhor {melhor} rps{por_100mb}")
+    if len(res) == 2:
+        a, b = (r['rss_ocioso_mb'] for r in res.values())
+        if abs(a - b) / max(a, b) > 0.15:
+            print(f"aviso: RSS ocioso diferente ({a} x {b} MB); ajuste --sync-workers/--asgi-workers "
+                  f"para comparar com a mesma memória")
+
+    os.makedirs(args.saida, exist_ok=True)
+    caminho = os.path.join(args.saida, datetime.now().strftime('%Y%m%d-%H%M%S')
+                           + f'-{carga._commit()}-asgi.json')
+    with open(caminho, 'w') as f:
+        json.dump({'data': datetime.now().isoformat(timespec='seconds'), 'commit': carga._commit(),
+                   'parametros': {k: v for k, v in vars(args).items() if k != 'saida'},
+                   'deploys': res}, f, ensure_ascii=False, indent=2)
+    print(f"\nresultado: {caminho}")
+
+
+if __name__ == '__main__':
+    main()
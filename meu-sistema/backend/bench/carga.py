@@ -0,0 +1,403 @@
+"""Gerador de carga concorrente contra a API.
+
+Uso (a partir de backend/, com o backend rodando e o banco semeado por
+bench.seed):
+
+    python -m bench.carga --url http://localhost:5001 --concorrencia 16 --duracao 30 \
+        --cenario misto --pid <pid do master do gunicorn>
+
+Cenários:
+    leitura  só GETs (listas paginadas, stats, andamentos, observações, pdti)
+    misto    leitura + ciclos de escrita (cria, edita e apaga os próprios
+             registros em todas as rotas POST/PUT/DELETE; a importação
+             reescreve sempre os mesmos 50 chamados BENCH-IMP-*)
+--completas inclui as listas inteiras (?all=1) e o export, que em escala
+1m dominam o tempo — use para medir essas rotas isoladamente.
+
+--encoding (identity, gzip ou br) é o Accept-Encoding enviado; os bytes
+do relatório são os que passaram na rede (comprimidos).
+
+Relatório por operação: nº de requisições, erros, p50/p95/p99/máx (ms),
+requisições/s e bytes médios. Com --pid, o RSS do processo e dos filhos
+(workers do gunicorn) é amostrado e o pico entra no resultado.
+
+O resultado vai para bench/resultados/<data>-<commit>[-rotulo].json;
+compare execuções com python -m bench.comparar A.json B.json.
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urlsplit
+
+PASTA_RESULTADOS = os.path.join(os.path.dirname(__file__), 'resultados')
+
+
+# ====== HTTP ======
+class Cliente:
+    """Uma conexão keep-alive por thread. req() devolve o corpo já
+    descomprimido; bytes_rede guarda o tamanho que veio pela rede."""
+
+    def __init__(self, base, encoding='identity'):
+        u = urlsplit(base)
+        self.host, self.porta = u.hostname, u.port or (443 if u.scheme == 'https' else 80)
+        self.https = u.scheme == 'https'
+        self.encoding = encoding
+        self.conn = None
+        self.bytes_rede = 0
+
+    def _conectar(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.conn = cls(self.host, self.porta, timeout=60)
+
+    def req(self, metodo, caminho, corpo=None):
+        if self.conn is None:
+            self._conectar()
+        headers = {'Accept-Encoding': self.encoding}
+        dados = None
+        if isinstance(corpo, bytes):
+            dados = corpo
+            headers['Content-Type'] = 'text/csv'
+        elif corpo is not None:
+            dados = json.dumps(corpo).encode()
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.conn.request(metodo, caminho, body=dados, headers=headers)
+            resp = self.conn.getresponse()
+            conteudo = resp.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = None
+            raise
+        self.bytes_rede = len(conteudo)
+        return resp.status, _descomprimir(conteudo, resp.getheader('Content-Encoding'))
+
+
+def _descomprimir(conteudo, encoding):
+    if encoding == 'gzip':
+        return gzip.decompress(conteudo)
+    if encoding == 'br':
+        import brotli
+        return brotli.decompress(conteudo)
+    return conteudo
+
+
+# ====== Operações ======
+def _amostrar_ids(cli):
+    _, b = cli.req('GET', '/api/projetos?limit=200')
+    projetos = [p['id'] for p in json.loads(b)['itens']] or [1]
+    _, b = cli.req('GET', '/api/sustentacao?limit=200')
+    numeros = [c['numero_chamado'] for c in json.loads(b)['itens']] or ['CH00000001']
+    return projetos, numeros
+
+
+def _leituras(projetos, numeros, completas):
+    ops = [
+        # (nome, peso, fn(rng) -> (metodo, caminho, corpo))
+        ('GET /api/projetos', 10, lambda r: ('GET', '/api/projetos?limit=50', None)),
+        ('GET /api/projetos (filtrado)', 5,
+         lambda r: ('GET', f"/api/projetos?limit=50&coordenacao={r.choice(['CODES', 'COSET', 'CGOD'])}"
+                           f"&status={r.choice(['Planejado', 'Em%20Andamento', 'Conclu%C3%ADdo'])}", None)),
+        ('GET /api/projetos/stats', 5, lambda r: ('GET', '/api/projetos/stats', None)),
+        ('GET /api/projetos/<id>/andamentos', 8,
+         lambda r: ('GET', f'/api/projetos/{r.choice(projetos)}/andamentos?limit=50', None)),
+        ('GET /api/sustentacao', 10, lambda r: ('GET', '/api/sustentacao?limit=50', None)),
+        ('GET /api/sustentacao (filtrado)', 5,
+         lambda r: ('GET', '/api/sustentacao?limit=50&status_bucket='
+                           + r.choice(['pendente', 'em_dev', 'em_testes', 'concluido']), None)),
+        ('GET /api/sustentacao/stats', 5, lambda r: ('GET', '/api/sustentacao/stats', None)),
+        ('GET /api/sustentacao/<n>/observacoes', 8,
+         lambda r: ('GET', f'/api/sustentacao/{r.choice(numeros)}/observacoes', None)),
+        ('GET /api/pdti', 4, lambda r: ('GET', '/api/pdti', None)),
+        ('GET /api/search', 4,
+         lambda r: ('GET', '/api/search?q=' + r.choice(['fiscalizacao', 'certidao', 'esocial', 'painel']), None)),
+        ('GET /api/pessoas/carga', 2, lambda r: ('GET', '/api/pessoas/carga', None)),
+        ('GET /internal/pool', 1, lambda r: ('GET', '/internal/pool', None)),
+        ('GET /metrics', 1, lambda r: ('GET', '/metrics', None)),
+    ]
+    if completas:
+        ops += [
+            ('GET /api/projetos?all=1', 1, lambda r: ('GET', '/api/projetos?all=1', None)),
+            ('GET /api/sustentacao?all=1', 1, lambda r: ('GET', '/api/sustentacao?all=1', None)),
+            ('GET /api/export/sustentacao', 1, lambda r: ('GET', '/api/export/sustentacao', None)),
+        ]
+    return ops
+
+
+def _ciclo_projeto(cli, rng, medir):
+    st, b = medir('POST /api/projetos', cli, 'POST', '/api/projetos', {
+        'nome': f'bench {uuid.uuid4().hex[:8]}', 'tipo': 'Dashboard', 'coordenacao': 'CGOD',
+        'status': 'Planejado', 'progresso': rng.randint(0, 100)})
+    if st != 201:
+        return
+    pid = json.loads(b)['id']
+    medir('PUT /api/projetos/<id>', cli, 'PUT', f'/api/projetos/{pid}', {'status': 'Em Andamento'})
+    st, b = medir('POST /api/projetos/<id>/andamentos', cli, 'POST', f'/api/projetos/{pid}/andamentos',
+                  {'descricao': 'andamento do bench'})
+    if st == 201:
+        aid = json.loads(b)['id']
+        medir('PUT /api/andamentos/<id>', cli, 'PUT', f'/api/andamentos/{aid}', {'descricao': 'editado'})
+        medir('DELETE /api/andamentos/<id>', cli, 'DELETE', f'/api/andamentos/{aid}', None)
+    medir('DELETE /api/projetos/<id>', cli, 'DELETE', f'/api/projetos/{pid}', None)
+
+
+def _ciclo_chamado(cli, rng, medir):
+    numero = f'BENCH-{uuid.uuid4().hex[:12]}'
+    st, _ = medir('POST /api/sustentacao', cli, 'POST', '/api/sustentacao', {
+        'numero_chamado': numero, 'projeto': 'bench', 'status': 'Pendente',
+        'data_chamado': datetime.now().isoformat(timespec='seconds')})
+    if st != 201:
+        return
+    medir('PUT /api/sustentacao/<n>', cli, 'PUT', f'/api/sustentacao/{numero}', {'status': 'Em desenvolvimento'})
+    st, b = medir('POST /api/sustentacao/<n>/observacoes', cli, 'POST',
+                  f'/api/sustentacao/{numero}/observacoes', {'texto': 'observação do bench'})
+    if st == 201:
+        oid = json.loads(b)['id']
+        medir('PUT /api/sustentacao/observacoes/<id>', cli, 'PUT', f'/api/sustentacao/observacoes/{oid}',
+              {'texto': 'editada'})
+        medir('DELETE /api/sustentacao/observacoes/<id>', cli, 'DELETE', f'/api/sustentacao/observacoes/{oid}', None)
+    medir('DELETE /api/sustentacao/<n>', cli, 'DELETE', f'/api/sustentacao/{numero}', None)
+
+
+def _ciclo_pdti(cli, rng, medir):
+    aid = f'BN.{uuid.uuid4().hex[:12]}'
+    st, _ = medir('POST /api/pdti', cli, 'POST', '/api/pdti',
+                  {'id': aid, 'descricao': 'ação do bench', 'tipo': 'SDF'})
+    if st != 201:
+        return
+    medir('PUT /api/pdti/<id>', cli, 'PUT', f'/api/pdti/{aid}', {'situacao': 'Concluída'})
+    medir('DELETE /api/pdti/<id>', cli, 'DELETE', f'/api/pdti/{aid}', None)
+
+
+def _importacao(cli, rng, medir):
+    # sempre os mesmos 50 números: a importação é um upsert, então repetir
+    # exercita o caminho de atualização sem crescer a tabela
+    linhas = ['numero_chamado;projeto;status;data_chamado;descricao']
+    linhas += [f'BENCH-IMP-{i:04d};bench;{rng.choice(["Pendente", "Em testes", "Concluído"])};'
+               f'2025-01-01;importado pelo bench' for i in range(50)]
+    medir('POST /api/sustentacao/import', cli, 'POST', '/api/sustentacao/import',
+          ('\n'.join(linhas) + '\n').encode())
+
+
+CICLOS = [('ciclo projeto', 2, _ciclo_projeto), ('ciclo chamado', 2, _ciclo_chamado),
+          ('ciclo pdti', 1, _ciclo_pdti), ('importação', 1, _importacao)]
+
+
+# ====== Execução ======
+class Coleta:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lat = defaultdict(list)
+        self.erros = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self.ativo = False   # False durante o aquecimento
+
+    def registrar(self, nome, dt, status, n_bytes):
+        if not self.ativo:
+            return
+        with self.lock:
+            self.lat[nome].append(dt)
+            self.bytes[nome] += n_bytes
+            if status is None or status >= 400:
+                self.erros[nome] += 1
+
+
+def _worker(base, encoding, ops_leitura, ciclos, coleta, fim, semente):
+    rng = random.Random(semente)
+    cli = Cliente(base, encoding)
+    tarefas = [(op[1], ('leitura', op)) for op in ops_leitura]
+    tarefas += [(peso, ('ciclo', fn)) for (_, peso, fn) in ciclos]
+    pesos = [p for p, _ in tarefas]
+
+    def medir(nome, cli, metodo, caminho, corpo):
+        t0 = time.perf_counter()
+        try:
+            st, b = cli.req(metodo, caminho, corpo)
+        except Exception:
+            coleta.registrar(nome, time.perf_counter() - t0, None, 0)
+            return None, b''
+        coleta.registrar(nome, time.perf_counter() - t0, st, cli.bytes_rede)
+        return st, b
+
+    while time.time() < fim:
+        tipo, alvo = rng.choices(tarefas, weights=pesos)[0][1]
+        if tipo == 'leitura':
+            nome, _, fn = alvo
+            medir(nome, cli, *fn(rng))
+        else:
+            alvo(cli, rng, medir)
+
+
+def _rss_kb(pid):
+    """RSS de pid + descendentes (kB), via /proc."""
+    total, pilha = 0, [pid]
+    while pilha:
+        p = pilha.pop()
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for linha in f:
+                    if linha.startswith('VmRSS:'):
+                        total += int(linha.split()[1])
+            for tid in os.listdir(f'/proc/{p}/task'):
+                with open(f'/proc/{p}/task/{tid}/children') as f:
+                    pilha += [int(x) for x in f.read().split()]
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return total
+
+
+class AmostradorRSS(threading.Thread):
+    def __init__(self, pid, intervalo=0.5):
+        super().__init__(daemon=True)
+        self.pid, self.intervalo = pid, intervalo
+        self.pico_kb = 0
+        self.parar = threading.Event()
+
+    def run(self):
+        while not self.parar.is_set():
+            self.pico_kb = max(self.pico_kb, _rss_kb(self.pid))
+            self.parar.wait(self.intervalo)
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return None
+    k = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[k]
+
+
+def _commit():
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                      stderr=subprocess.DEVNULL).strip()
+        sujo = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                            text=True, stderr=subprocess.DEVNULL).strip())
+        return sha + ('-sujo' if sujo else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'sem-git'
+
+
+def _total(cli, caminho):
+    st, b = cli.req('GET', caminho)
+    return json.loads(b).get('total') if st == 200 else None
+
+
+def executar(args):
+    cli = Cliente(args.url, args.encoding)
+    projetos, numeros = _amostrar_ids(cli)
+    n_chamados = _total(cli, '/api/sustentacao/stats')
+    n_projetos = _total(cli, '/api/projetos/stats')
+
+    ops = _leituras(projetos, numeros, args.completas)
+    ciclos = CICLOS if args.cenario == 'misto' else []
+    coleta = Coleta()
+    amostrador = AmostradorRSS(args.pid) if args.pid else None
+    if amostrador:
+        amostrador.start()
+
+    inicio = time.time()
+    fim = inicio + args.aquecimento + args.duracao
+    threads = [threading.Thread(target=_worker,
+                                args=(args.url, args.encoding, ops, ciclos, coleta, fim, args.semente + i),
+                                daemon=True) for i in range(args.concorrencia)]
+    for t in threads:
+        t.start()
+    time.sleep(args.aquecimento)
+    coleta.ativo = True
+    t_medicao = time.time()
+    for t in threads:
+        t.join()
+    duracao = time.time() - t_medicao
+    if amostrador:
+        amostrador.parar.set()
+        amostrador.join()
+
+    por_op = {}
+    for nome, lat in sorted(coleta.lat.items()):
+        lat.sort()
+        ms = [x * 1000 for x in lat]
+        por_op[nome] = {
+            'n': len(ms),
+            'erros': coleta.erros[nome],
+            'rps': round(len(ms) / duracao, 2),
+            'p50_ms': round(_percentil(ms, 50), 2),
+            'p95_ms': round(_percentil(ms, 95), 2),
+            'p99_ms': round(_percentil(ms, 99), 2),
+            'max_ms': round(ms[-1], 2),
+            'bytes_medio': coleta.bytes[nome] // len(ms),
+        }
+    todas = sorted(x * 1000 for lat in coleta.lat.values() for x in lat)
+    total = len(todas)
+    return {
+        'commit': _commit(),
+        'rotulo': args.rotulo,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'url': args.url,
+        'cenario': args.cenario,
+        'encoding': args.encoding,
+        'concorrencia': args.concorrencia,
+        'duracao_s': round(duracao, 2),
+        'dados': {'projetos': n_projetos, 'sustentacao_chamados': n_chamados},
+        'total': {
+            'n': total,
+            'erros': sum(coleta.erros.values()),
+            'rps': round(total / duracao, 2),
+            'p50_ms': round(_percentil(todas, 50) or 0, 2),
+            'p95_ms': round(_percentil(todas, 95) or 0, 2),
+            'p99_ms': round(_percentil(todas, 99) or 0, 2),
+        },
+        'rss_pico_mb': round(amostrador.pico_kb / 1024, 1) if amostrador else None,
+        'operacoes': por_op,
+    }
+
+
+def imprimir(res):
+    print(f"\ncommit {res['commit']}  cenário {res['cenario']}  concorrência {res['concorrencia']}  "
+          f"{res['duracao_s']}s  encoding {res.get('encoding', 'identity')}  dados {res['dados']}")
+    print(f"{'operação':<44} {'n':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'bytes':>9}")
+    for nome, s in res['operacoes'].items():
+        print(f"{nome:<44} {s['n']:>7} {s['erros']:>5} {s['rps']:>8} {s['p50_ms']:>8} "
+              f"{s['p95_ms']:>8} {s['p99_ms']:>8} {s['bytes_medio']:>9}")
+    t = res['total']
+    print(f"{'TOTAL':<44} {t['n']:>7} {t['erros']:>5} {t['rps']:>8} {t['p50_ms']:>8} {t['p95_ms']:>8} {t['p99_ms']:>8}")
+    if res['rss_pico_mb'] is not None:
+        print(f"RSS pico (servidor): {res['rss_pico_mb']} MB")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--url', default='http://localhost:5001')
+    ap.add_argument('--concorrencia', type=int, default=16)
+    ap.add_argument('--duracao', type=float, default=30, help='segundos medidos')
+    ap.add_argument('--aquecimento', type=float, default=5, help='segundos descartados no início')
+    ap.add_argument('--cenario', choices=['leitura', 'misto'], default='leitura')
+    ap.add_argument('--completas', action='store_true', help='inclui ?all=1 e export')
+    ap.add_argument('--encoding', choices=['identity', 'gzip', 'br'], default='identity',
+                    help='Accept-Encoding das requisições')
+    ap.add_argument('--pid', type=int, help='pid do servidor (master do gunicorn) para medir RSS')
+    ap.add_argument('--semente', type=int, default=42)
+    ap.add_argument('--rotulo', default='')
+    ap.add_argument('--saida', default=PASTA_RESULTADOS)
+    args = ap.parse_args(argv)
+
+    res = executar(args)
+    imprimir(res)
+
+    os.makedirs(args.saida, exist_ok=True)
+    nome = datetime.now().strftime('%Y%m%d-%H%M%S') + f"-{res['commit']}" + (f'-{args.rotulo}' if args.rotulo else '')
+    caminho = os.path.join(args.saida, nome + '.json')
+    with open(caminho, 'w') as f:
+        json.dump(res, f, ensure_ascii=False, indent=2)
+    print(f"\nresultado: {caminho}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Compara dois resultados do bench.carga (base -> novo).
+
+    python -m bench.comparar bench/resultados/A.json bench/resultados/B.json
+"""
+import json
+import sys
+
+
+def _delta(a, b):
+    if not a or b is None:
+        return ''
+    return f"{(b - a) / a * 100:+.0f}%"
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        sys.exit(__doc__)
+    with open(argv[0]) as f:
+        base = json.load(f)
+    with open(argv[1]) as f:
+        novo = json.load(f)
+
+    print(f"base: {base['commit']} {base.get('rotulo', '')} ({base['data']})")
+    print(f"novo: {novo['commit']} {novo.get('rotulo', '')} ({novo['data']})\n")
+    print(f"{'operação':<44} {'p50':>16} {'p95':>16} {'p99':>16} {'rps':>16}")
+
+    linhas = list(base['operacoes'].keys() | novo['operacoes'].keys())
+    for nome in sorted(linhas) + ['TOTAL']:
+        a = base['total'] if nome == 'TOTAL' else base['operacoes'].get(nome, {})
+        b = novo['total'] if nome == 'TOTAL' else novo['operacoes'].get(nome, {})
+        cols = []
+        for k in ('p50_ms', 'p95_ms', 'p99_ms', 'rps'):
+            va, vb = a.get(k), b.get(k)
+            cols.append(f"{vb if vb is not None else '-'} {_delta(va, vb)}".rjust(16))
+        print(f"{nome:<44} " + ' '.join(cols))
+
+    if base.get('rss_pico_mb') and novo.get('rss_pico_mb'):
+        print(f"\nRSS pico: {base['rss_pico_mb']} MB -> {novo['rss_pico_mb']} MB "
+              f"{_delta(base['rss_pico_mb'], novo['rss_pico_mb'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Custo por linha das listagens: ORM (instância + to_dict) x leitura.py.
+
+Uso (a partir de backend/, com o banco semeado por bench.seed):
+
+    python -m bench.leitura --linhas 20000 --repeticoes 5
+
+Para cada entidade lê as mesmas N linhas pelos dois caminhos, serializa com
+o provider de JSON da aplicação e mostra a mediana em ms e em µs por linha,
+separando consulta+montagem dos dicts e serialização. Também confere que os
+dois JSONs são idênticos byte a byte (sai com erro se não forem).
+"""
+import argparse
+import statistics
+import sys
+import time
+
+
+def _caminhos(leitura, n):
+    from database import Projeto, SustentacaoChamado, Andamento, SustentacaoObservacao
+    modelos = {
+        'projetos': (Projeto, leitura.PROJETOS),
+        'sustentacao': (SustentacaoChamado, leitura.CHAMADOS),
+        'andamentos': (Andamento, leitura.ANDAMENTOS),
+        'observacoes': (SustentacaoObservacao, leitura.OBSERVACOES),
+    }
+    for nome, (modelo, leit) in modelos.items():
+        base = modelo.query.order_by(modelo.id.desc()).limit(n)
+        yield nome, {
+            'orm': lambda base=base: [o.to_dict() for o in base.all()],
+            'colunas': lambda base=base, leit=leit: [leit.montar(r) for r in leit.consulta(base).all()],
+        }
+
+
+def _medir(fn, dumps, repeticoes):
+    from database import db
+    t_dicts, t_json, corpo = [], [], None
+    for _ in range(repeticoes):
+        db.session.remove()   # identity map vazio a cada rodada, como numa requisição
+        t0 = time.perf_counter()
+        dicts = fn()
+        t1 = time.perf_counter()
+        corpo = dumps(dicts)
+        t2 = time.perf_counter()
+        t_dicts.append((t1 - t0) * 1000)
+        t_json.append((t2 - t1) * 1000)
+    return len(dicts), statistics.median(t_dicts), statistics.median(t_json), corpo
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--linhas', type=int, default=20000, help='linhas lidas por entidade')
+    ap.add_argument('--repeticoes', type=int, default=5)
+    args = ap.parse_args(argv)
+
+    from app import app
+    import leitura
+
+    diferentes = []
+    print(f"{'entidade':<12} {'caminho':<8} {'linhas':>7} {'dicts ms':>9} {'json ms':>8} {'µs/linha':>9}")
+    with app.app_context():
+        for nome, caminhos in _caminhos(leitura, args.linhas):
+            corpos = {}
+            for caminho, fn in caminhos.items():
+                fn()   # aquece cache de nomes e statement cache
+                n, ms_dicts, ms_json, corpos[caminho] = _medir(fn, app.json.dumps, args.repeticoes)
+                por_linha = (ms_dicts + ms_json) * 1000 / n if n else 0
+                print(f"{nome:<12} {caminho:<8} {n:>7} {ms_dicts:>9.1f} {ms_json:>8.1f} {por_linha:>9.1f}")
+            if corpos['orm'] != corpos['colunas']:
+                diferentes.append(nome)
+    if diferentes:
+        sys.exit(f"JSON diferente entre ORM e leitura.py: {', '.join(diferentes)}")
+    print('\nJSON idêntico nos dois caminhos.')
+
+
+if __name__ == '__main__':
+    main()
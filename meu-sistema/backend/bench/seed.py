@@ -0,0 +1,190 @@
+"""Popula o banco com dados sintéticos para benchmark.
+
+Uso (a partir de backend/, com DATABASE_URL ou DB_* apontando para um
+Postgres local — NUNCA o de produção, as tabelas são truncadas):
+
+    python -m bench.seed --escala 100k --sim
+
+Escalas (N = nº de chamados):
+    1k   -> N = 1.000
+    100k -> N = 100.000
+    1m   -> N = 1.000.000
+ou --linhas N para um valor qualquer.
+
+Linhas geradas por tabela: projetos N/10 (mín. 10), andamentos N,
+sustentacao_chamados N, sustentacao_observacoes 2N, pdti_acoes N/100
+(mín. 30, máx. 3000), projeto_membros 2 por projeto. Tudo é gerado dentro
+do Postgres com generate_series, então 1M de linhas leva segundos, não horas.
+
+As pessoas são recriadas: reinicie a API depois de semear (o cache de nomes
+de database.py é por processo).
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+import config
+from flask_migrate import upgrade
+
+from database import bucket_status, bump_versoes, chave_dominio
+
+ESCALAS = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+TIPOS = ['Infraestrutura', 'Sistema Integrado', 'Integração', 'BI Dashboard', 'Dashboard',
+         'Sistema de Dados', 'Modernização', 'Qualidade de Dados', 'Governança']
+STATUS_PROJETO = ['Planejado', 'Em Andamento', 'Em Risco', 'Concluído', 'Sustentação', 'Pausado']
+COORDENACOES = ['CODES', 'COSET', 'CGOD']
+STATUS_CHAMADO = ['Pendente', 'A desenvolver', 'Em desenvolvimento', 'Em testes', 'Homologação',
+                  'Suspenso', 'Concluído', 'Fechado', 'Aguardando solicitante']
+PESSOAS = ['Ana Souza', 'Bruno Lima', 'Carla Dias', 'Diego Alves', 'Elisa Rocha', 'Fábio Nunes',
+           'Gabriela Reis', 'Henrique Melo', 'Isabela Costa', 'João Pereira', 'Larissa Gomes',
+           'Marcos Vieira', 'Natália Freitas', 'Otávio Ramos', 'Paula Mendes', 'Rafael Duarte']
+TEXTOS = ['ajuste no relatório de fiscalização', 'erro ao gerar certidão', 'lentidão na consulta de empregadores',
+          'integração com o eSocial', 'atualização do painel de indicadores', 'falha no login gov.br',
+          'migração da base de dados trabalhistas', 'correção de cálculo do seguro-desemprego']
+
+
+def _arr(valores):
+    """Literal ARRAY[...] do Postgres (valores fixos do próprio script)."""
+    return 'ARRAY[' + ', '.join("'" + v.replace("'", "''") + "'" for v in valores) + ']'
+
+
+def _ids(conn, tabela, nomes):
+    """Literal ARRAY[...] com os ids (tabela de domínio) dos nomes dados."""
+    ids = dict(conn.execute(text(f"SELECT nome, id FROM {tabela}")).all())
+    return 'ARRAY[' + ', '.join(str(ids[n]) for n in nomes) + ']::smallint[]'
+
+
+def _contagens(n):
+    return {
+        'projetos': max(n // 10, 10),
+        'andamentos': n,
+        'sustentacao_chamados': n,
+        'sustentacao_observacoes': 2 * n,
+        'pdti_acoes': min(max(n // 100, 30), 3000),
+        'projeto_membros': 2 * max(n // 10, 10),
+    }
+
+
+def semear(conn, n):
+    c = _contagens(n)
+    buckets = [bucket_status(s) for s in STATUS_CHAMADO]
+
+    conn.execute(text("""
+        TRUNCATE projetos, andamentos, sustentacao_chamados, sustentacao_observacoes, pdti_acoes, pessoas
+        RESTART IDENTITY CASCADE
+    """))
+    conn.execute(text("INSERT INTO pessoas (nome, chave) VALUES (:nome, :chave)"),
+                 [{'nome': p, 'chave': chave_dominio(p)} for p in PESSOAS])
+    pessoas = _ids(conn, 'pessoas', PESSOAS)
+
+    etapas = [
+        ('projetos', f"""
+            INSERT INTO projetos (nome, tipo_id, coordenacao_id, status_id, descricao, inicio, fim, prioridade,
+                                  progresso, "totalSprints", "sprintsConcluidas", responsavel_id, orcamento,
+                                  rag, riscos, qualidade, internalizacao)
+            SELECT 'Projeto ' || i,
+                   ({_ids(conn, 'projeto_tipos', TIPOS)})[1 + i % {len(TIPOS)}],
+                   ({_ids(conn, 'coordenacoes', COORDENACOES)})[1 + i % {len(COORDENACOES)}],
+                   ({_ids(conn, 'projeto_status', STATUS_PROJETO)})[1 + i % {len(STATUS_PROJETO)}],
+                   repeat(({_arr(TEXTOS)})[1 + i % {len(TEXTOS)}] || '. ', 1 + i % 8),
+                   date '2024-01-01' + (i % 700),
+                   date '2024-01-01' + (i % 700) + 30 + (i % 400),
+                   (ARRAY['Alta','Média','Baixa'])[1 + i % 3],
+                   i % 101, 10, i % 11,
+                   ({pessoas})[1 + i % {len(PESSOAS)}],
+                   (i % 1000) * 1500.0,
+                   (ARRAY['Verde','Amarelo','Vermelho'])[1 + i % 3],
+                   'risco: ' || ({_arr(TEXTOS)})[1 + (i + 2) % {len(TEXTOS)}],
+                   i % 6,
+                   i % 4 = 0
+              FROM generate_series(1, {c['projetos']}) AS i
+        """),
+        ('projeto_membros', f"""
+            INSERT INTO projeto_membros (projeto_id, pessoa_id, ordem)
+            SELECT i, ({pessoas})[1 + (i + 3 + 4 * o) % {len(PESSOAS)}], o
+              FROM generate_series(1, {c['projetos']}) AS i, generate_series(0, 1) AS o
+        """),
+        ('andamentos', f"""
+            INSERT INTO andamentos (projeto_id, data, descricao)
+            SELECT 1 + i % {c['projetos']},
+                   timestamp '2024-01-01' + (i * interval '7 minutes'),
+                   'andamento ' || i || ': ' || ({_arr(TEXTOS)})[1 + i % {len(TEXTOS)}]
+              FROM generate_series(1, {c['andamentos']}) AS i
+        """),
+        ('sustentacao_chamados', f"""
+            INSERT INTO sustentacao_chamados (numero_chamado, projeto, desenvolvedor_id, data_chamado, descricao,
+                                              solicitante, status, observacao, status_bucket,
+                                              criado_em, atualizado_em)
+            SELECT 'CH' || lpad(i::text, 8, '0'),
+                   'Projeto ' || (1 + i % {c['projetos']}),
+                   ({pessoas})[1 + i % {len(PESSOAS)}],
+                   timestamp '2024-01-01' + (i * interval '3 minutes'),
+                   ({_arr(TEXTOS)})[1 + i % {len(TEXTOS)}] || ' (chamado ' || i || ')',
+                   ({_arr(PESSOAS)})[1 + (i + 5) % {len(PESSOAS)}],
+                   ({_arr(STATUS_CHAMADO)})[1 + i % {len(STATUS_CHAMADO)}],
+                   CASE WHEN i % 3 = 0 THEN 'aguardando retorno da área' END,
+                   ({_arr(buckets)})[1 + i % {len(STATUS_CHAMADO)}],
+                   now(), now()
+              FROM generate_series(1, {c['sustentacao_chamados']}) AS i
+        """),
+        ('sustentacao_observacoes', f"""
+            INSERT INTO sustentacao_observacoes (numero_chamado, texto, criado_em)
+            SELECT 'CH' || lpad((1 + i % {c['sustentacao_chamados']})::text, 8, '0'),
+                   'observação ' || i || ': ' || ({_arr(TEXTOS)})[1 + (i + 1) % {len(TEXTOS)}],
+                   timestamp '2024-01-01' + (i * interval '90 seconds')
+              FROM generate_series(1, {c['sustentacao_observacoes']}) AS i
+        """),
+        ('pdti_acoes', f"""
+            INSERT INTO pdti_acoes (id, descricao, situacao, tipo, data_conclusao)
+            SELECT 'AC.' || t || '.' || lpad(i::text, 4, '0'),
+                   'Ação ' || i || ' do PDTI',
+                   s,
+                   t,
+                   CASE WHEN s = 'Concluída' THEN date '2025-01-01' + (i % 300) END
+              FROM generate_series(1, {c['pdti_acoes']}) AS i,
+                   LATERAL (SELECT (ARRAY['SDF','SDD','SDS'])[1 + i % 3] AS t,
+                                   (ARRAY['Não iniciada','Em andamento','Concluída'])[1 + i % 3] AS s) x
+        """),
+    ]
+
+    for tabela, sql in etapas:
+        t0 = time.perf_counter()
+        conn.execute(text(sql))
+        print(f"  {tabela:<26} {c[tabela]:>10,} linhas  {time.perf_counter() - t0:6.1f}s", flush=True)
+
+    bump_versoes(conn, [*c, 'pessoas'])
+    return c
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    g = ap.add_mutually_exclusive_group(required=True)
+    g.add_argument('--escala', choices=sorted(ESCALAS))
+    g.add_argument('--linhas', type=int)
+    ap.add_argument('--sim', action='store_true', help='confirma o TRUNCATE das tabelas')
+    args = ap.parse_args(argv)
+
+    n = ESCALAS[args.escala] if args.escala else args.linhas
+    uri = config.database_uri()
+    if not args.sim:
+        sys.exit(f"Isto apaga TODOS os dados de {uri.rsplit('@', 1)[-1]}. Rode de novo com --sim.")
+
+    from app import app
+    with app.app_context():
+        upgrade()   # schema via migrações, como em produção
+    engine = create_engine(uri)
+    print(f"Semeando N={n:,} em {uri.rsplit('@', 1)[-1]}")
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        semear(conn, n)
+    # ANALYZE fora da transação: planner com estatísticas atualizadas
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text('ANALYZE'))
+    print(f"Pronto em {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
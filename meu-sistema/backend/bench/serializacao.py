@@ -0,0 +1,65 @@
+"""Custo de serialização e compressão nas maiores respostas, em processo.
+
+Uso (a partir de backend/, com o banco semeado por bench.seed):
+
+    python -m bench.serializacao --repeticoes 5
+
+Cada rota é chamada pelo test client do Flask (sem rede, cache de respostas
+desligado) para cada provider de JSON (padrao = json da stdlib, orjson) e
+cada Accept-Encoding (identity, gzip, br). Relatório: mediana em ms e bytes
+do corpo. A diferença entre as linhas mostra quanto do tempo da rota é
+serialização e quanto a compressão custa/economiza por requisição.
+"""
+import argparse
+import os
+import statistics
+import time
+
+ROTAS = [
+    '/api/projetos?all=1',
+    '/api/sustentacao?all=1',
+    '/api/sustentacao?limit=500',
+    '/api/export/sustentacao',
+]
+ENCODINGS = ['identity', 'gzip', 'br']
+
+
+def _medir(cli, rota, encoding, repeticoes):
+    tempos, tam = [], 0
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        r = cli.get(rota, headers={'Accept-Encoding': encoding})
+        corpo = r.get_data()   # export é streaming: consome o gerador
+        tempos.append((time.perf_counter() - t0) * 1000)
+        tam = len(corpo)
+    return statistics.median(tempos), tam
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--repeticoes', type=int, default=5)
+    ap.add_argument('--rota', action='append', help='rota a medir (pode repetir); padrão: as maiores')
+    args = ap.parse_args(argv)
+
+    os.environ['CACHE_BACKEND'] = 'off'
+    from app import app
+    import serializacao
+
+    cli = app.test_client()
+    providers = {'padrao': serializacao.ProviderPadrao}
+    if serializacao.orjson is not None:
+        providers['orjson'] = serializacao.ProviderOrjson
+
+    print(f"{'rota':<32} {'provider':<8} {'encoding':<9} {'ms':>10} {'bytes':>12}")
+    for rota in args.rota or ROTAS:
+        cli.get(rota).get_data()   # aquece conexões e caches de nomes
+        for nome, cls in providers.items():
+            app.json = cls(app)
+            serializacao._usar_orjson = cls is serializacao.ProviderOrjson
+            for encoding in ENCODINGS:
+                ms, tam = _medir(cli, rota, encoding, args.repeticoes)
+                print(f"{rota:<32} {nome:<8} {encoding:<9} {ms:>10.1f} {tam:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# Busca textual em projetos, chamados e observações (GET /api/search).
+#
+# Usa as colunas tsvector geradas "busca" (ver database.py) com índice GIN.
+# Em duas etapas:
+#   1. UNION ALL das tabelas pedidas devolvendo só (tipo, id, rank), já
+#      ordenado e cortado na página — barato, sai do índice;
+#   2. para as linhas da página, busca os campos de exibição e o trecho com
+#      ts_headline (caro: relê o texto), uma query por tipo.
+# A ordem é rank DESC, tipo, id — estável para o cursor keyset.
+import html
+
+from database import db, CONFIG_BUSCA, Projeto, SustentacaoChamado, SustentacaoObservacao, nome_dominio
+
+# marcadores que não aparecem em texto digitado; trocados por <mark> depois
+# de escapar o HTML do trecho
+_INI, _FIM = '\x02', '\x03'
+_OPCOES_HEADLINE = (f'StartSel={_INI}, StopSel={_FIM}, MaxFragments=2, '
+                    'MaxWords=25, MinWords=8, FragmentDelimiter=" … "')
+
+# tipo -> (ordem no desempate, tabela)
+TIPOS = {
+    'projeto': (1, Projeto.__table__),
+    'chamado': (2, SustentacaoChamado.__table__),
+    'observacao': (3, SustentacaoObservacao.__table__),
+}
+
+
+def _tsquery(q):
+    return db.func.websearch_to_tsquery(db.literal_column(f"'{CONFIG_BUSCA}'"), q)
+
+
+def _headline(texto, consulta):
+    return db.func.ts_headline(db.literal_column(f"'{CONFIG_BUSCA}'"), texto, consulta, _OPCOES_HEADLINE)
+
+
+def _trecho(s):
+    if not s:
+        return None
+    return html.escape(s).replace(_INI, '<mark>').replace(_FIM, '</mark>')
+
+
+def _pagina_ids(q, tipos, limit, apos):
+    """[(tipo, id, rank, ordem)] da página (limit+1 linhas)."""
+    consulta = _tsquery(q)
+    partes = []
+    for tipo in tipos:
+        ordem, t = TIPOS[tipo]
+        partes.append(
+            db.select(
+                db.literal(tipo).label('tipo'),
+                db.literal(ordem).label('ordem'),
+                t.c.id.label('id'),
+                db.cast(db.func.ts_rank(t.c.busca, consulta), db.Double).label('rank'),
+            ).where(t.c.busca.op('@@')(consulta))
+        )
+    u = db.union_all(*partes).subquery()
+    stmt = db.select(u.c.tipo, u.c.id, u.c.rank, u.c.ordem)
+    if apos:
+        rank, ordem, id_ = apos
+        stmt = stmt.where(db.or_(
+            u.c.rank < rank,
+            db.and_(u.c.rank == rank, db.tuple_(u.c.ordem, u.c.id) > db.tuple_(ordem, id_)),
+        ))
+    stmt = stmt.order_by(u.c.rank.desc(), u.c.ordem, u.c.id).limit(limit + 1)
+    return db.session.execute(stmt).all()
+
+
+def _detalhes(q, tipo, ids):
+    """{id: dict com os campos de exibição} para um tipo."""
+    consulta = _tsquery(q)
+    if tipo == 'projeto':
+        t = Projeto.__table__
+        texto = db.func.concat_ws(' … ', t.c.nome, t.c.descricao, t.c.riscos)
+        stmt = db.select(t.c.id, t.c.nome.label('titulo'), t.c.coordenacao_id, t.c.status_id,
+                         _headline(texto, consulta).label('trecho'))
+    elif tipo == 'chamado':
+        t = SustentacaoChamado.__table__
+        stmt = db.select(t.c.id, t.c.numero_chamado, t.c.projeto.label('titulo'), t.c.status,
+                         _headline(db.func.concat_ws(' … ', t.c.descricao, t.c.observacao), consulta).label('trecho'))
+    else:
+        t = SustentacaoObservacao.__table__
+        stmt = db.select(t.c.id, t.c.numero_chamado, t.c.numero_chamado.label('titulo'), t.c.criado_em,
+                         _headline(t.c.texto, consulta).label('trecho'))
+    linhas = db.session.execute(stmt.where(t.c.id.in_(ids))).mappings()
+    out = {}
+    for r in linhas:
+        d = dict(r)
+        d['trecho'] = _trecho(d['trecho'])
+        if 'status_id' in d:
+            d['coordenacao'] = nome_dominio('coordenacao', d.pop('coordenacao_id'))
+            d['status'] = nome_dominio('status', d.pop('status_id'))
+        out[d['id']] = d
+    return out
+
+
+def buscar(q, tipos, limit, apos=None):
+    """Devolve (itens, chave_da_ultima | None se não há mais)."""
+    linhas = _pagina_ids(q, tipos, limit, apos)
+    tem_mais = len(linhas) > limit
+    linhas = linhas[:limit]
+
+    por_tipo = {}
+    for tipo, id_, _rank, _ordem in linhas:
+        por_tipo.setdefault(tipo, []).append(id_)
+    detalhes = {tipo: _detalhes(q, tipo, ids) for tipo, ids in por_tipo.items()}
+
+    itens = []
+    for tipo, id_, rank, _ordem in linhas:
+        d = detalhes[tipo].get(id_)
+        if d is None:   # apagada entre as duas etapas
+            continue
+        itens.append({'tipo': tipo, 'rank': round(rank, 6), **d})
+    ultima = linhas[-1] if tem_mais else None
+    return itens, ((ultima.rank, ultima.ordem, ultima.id) if ultima else None)
@@ -0,0 +1,249 @@
+# Cache de respostas GET já serializadas (corpo JSON em bytes).
+#
+# A chave é a mesma ETag de _com_etag (app.py): rota + query string
+# normalizada + versão de cada tabela lida (TabelaVersao). Toda escrita pelo
+# ORM incrementa a versão das tabelas que tocou, então a chave antiga nunca
+# mais é consultada: não há como servir dado velho, nem entre workers.
+# Além disso, depois do commit, as entradas das tabelas alteradas são
+# descartadas do cache local (libera memória na hora, sem esperar o LRU).
+#
+# Backends (CACHE_BACKEND):
+#   memoria  LRU por processo, limitado em entradas, bytes e TTL (padrão)
+#   redis    compartilhado entre os workers (Redis ou compatível, ex. KeyDB,
+#            Valkey); precisa do pacote redis e de CACHE_REDIS_URL
+#   off      desligado
+#
+#   CACHE_MAX_ENTRADAS   entradas no LRU local (padrão 512)
+#   CACHE_MAX_MB         bytes somados no LRU local (padrão 64)
+#   CACHE_TTL            segundos de vida de uma entrada (padrão 300)
+#   CACHE_MAX_RESPOSTA_MB respostas maiores não entram no cache (padrão 8)
+#   CACHE_REDIS_URL      ex. redis://localhost:6379/0
+#
+# Acertos/erros vão para o /metrics (cache_respostas_total) e, com os
+# números do processo, para GET /internal/cache.
+#
+# O Flask-Compress usa o mesmo backend (Comprimidos) para o corpo já
+# comprimido, com chave "<algoritmo>;<etag>": uma resposta repetida não é
+# nem serializada nem comprimida de novo.
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g
+from prometheus_client import Counter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+CONSULTAS = Counter(
+    'cache_respostas_total', 'Consultas ao cache de respostas', ['endpoint', 'resultado'])
+
+
+class CacheMemoria:
+    """LRU com TTL e teto de bytes; cada entrada lembra as tabelas que leu."""
+    nome = 'memoria'
+
+    def __init__(self, max_entradas, max_bytes, ttl):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._dados = OrderedDict()   # chave -> (expira_em, tabelas, mimetype, corpo)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.descartes = 0
+
+    def ler(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                self._remover(chave)
+                return None
+            self._dados.move_to_end(chave)
+            return item[2], item[3]
+
+    def gravar(self, chave, tabelas, mimetype, corpo):
+        with self._lock:
+            if chave in self._dados:
+                self._remover(chave)
+            self._dados[chave] = (time.monotonic() + self.ttl, frozenset(tabelas), mimetype, corpo)
+            self._bytes += len(corpo)
+            while self._dados and (len(self._dados) > self.max_entradas or self._bytes > self.max_bytes):
+                self._remover(next(iter(self._dados)))
+                self.descartes += 1
+
+    def invalidar(self, tabelas):
+        with self._lock:
+            for chave in [k for k, v in self._dados.items() if v[1] & tabelas]:
+                self._remover(chave)
+
+    def _remover(self, chave):
+        self._bytes -= len(self._dados.pop(chave)[3])
+
+    def estatisticas(self):
+        with self._lock:
+            return {'entradas': len(self._dados), 'bytes': self._bytes, 'descartes_lru': self.descartes,
+                    'max_entradas': self.max_entradas, 'max_bytes': self.max_bytes, 'ttl': self.ttl}
+
+
+class CacheRedis:
+    """Entradas com SETEX no Redis. Sem invalidação explícita: a versão das
+    tabelas na chave já isola escritas, e o TTL recolhe o que sobrou."""
+    nome = 'redis'
+    PREFIXO = 'cgsol:resp:'
+
+    def __init__(self, url, ttl):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_BACKEND=redis precisa do pacote redis (pip install redis)')
+        self.ttl = ttl
+        self._r = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+
+    def ler(self, chave):
+        valor = self._r.get(self.PREFIXO + chave)
+        if valor is None:
+            return None
+        mimetype, _, corpo = valor.partition(b'\n')
+        return mimetype.decode(), corpo
+
+    def gravar(self, chave, tabelas, mimetype, corpo):
+        self._r.setex(self.PREFIXO + chave, self.ttl, mimetype.encode() + b'\n' + corpo)
+
+    def invalidar(self, tabelas):
+        pass
+
+    def estatisticas(self):
+        return {'ttl': self.ttl}
+
+
+class _Estado:
+    backend = None
+    max_resposta = 0
+    # contadores do /internal/cache; as threads do gthread somam juntas: só com o lock
+    lock = threading.Lock()
+    acertos = 0
+    erros = 0
+    falhas = 0   # backend fora do ar: a requisição segue sem cache
+
+
+def _contar(campo):
+    with _Estado.lock:
+        setattr(_Estado, campo, getattr(_Estado, campo) + 1)
+
+
+def _criar_backend():
+    tipo = os.getenv('CACHE_BACKEND', 'memoria').lower()
+    ttl = int(os.getenv('CACHE_TTL', '300'))
+    if tipo == 'off':
+        return None
+    if tipo == 'redis':
+        return CacheRedis(os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'), ttl)
+    if tipo == 'memoria':
+        return CacheMemoria(int(os.getenv('CACHE_MAX_ENTRADAS', '512')),
+                            int(float(os.getenv('CACHE_MAX_MB', '64')) * 1024 * 1024), ttl)
+    raise RuntimeError(f'CACHE_BACKEND inválido: {tipo} (memoria, redis ou off)')
+
+
+def ler(endpoint, chave):
+    """(mimetype, corpo) ou None."""
+    if _Estado.backend is None:
+        return None
+    try:
+        item = _Estado.backend.ler(chave)
+    except Exception:
+        _contar('falhas')
+        return None
+    if item is None:
+        _contar('erros')
+        CONSULTAS.labels(endpoint, 'erro').inc()
+    else:
+        _contar('acertos')
+        CONSULTAS.labels(endpoint, 'acerto').inc()
+    return item
+
+
+def gravar(chave, tabelas, resp):
+    """Guarda uma resposta 200 já pronta (não guarda streaming nem respostas grandes)."""
+    if _Estado.backend is None or resp.is_streamed:
+        return
+    corpo = resp.get_data()
+    if len(corpo) > _Estado.max_resposta:
+        return
+    try:
+        _Estado.backend.gravar(chave, tabelas, resp.mimetype, corpo)
+    except Exception:
+        _contar('falhas')
+
+
+def estatisticas():
+    b = _Estado.backend
+    with _Estado.lock:
+        acertos, erros, falhas = _Estado.acertos, _Estado.erros, _Estado.falhas
+    total = acertos + erros
+    return {
+        'pid': os.getpid(),
+        'backend': b.nome if b else 'off',
+        'acertos': acertos,
+        'erros': erros,
+        'taxa_acerto': round(acertos / total, 4) if total else None,
+        'falhas_backend': falhas,
+        **(b.estatisticas() if b else {}),
+    }
+
+
+class Comprimidos:
+    """COMPRESS_CACHE_BACKEND do Flask-Compress (chave via chave_compressao).
+
+    Só respostas de _com_etag têm chave; nas outras ela termina em ";None" e
+    o corpo é comprimido sem passar pelo cache."""
+    PREFIXO = 'z:'
+
+    def get(self, chave):
+        if _Estado.backend is None or chave.endswith(';None'):
+            return None
+        try:
+            item = _Estado.backend.ler(self.PREFIXO + chave)
+        except Exception:
+            _contar('falhas')
+            return None
+        if item is None:
+            return None
+        g.comprimido_do_cache = True
+        return item[1]
+
+    def set(self, chave, valor):
+        # o Flask-Compress chama set também depois de um acerto: ignora
+        if (_Estado.backend is None or chave.endswith(';None')
+                or g.pop('comprimido_do_cache', False) or len(valor) > _Estado.max_resposta):
+            return
+        try:
+            _Estado.backend.gravar(self.PREFIXO + chave, g.get('tabelas_resposta', ()), '', valor)
+        except Exception:
+            _contar('falhas')
+
+
+def chave_compressao(request):
+    """COMPRESS_CACHE_KEY: a ETag da resposta (anotada em g por _com_etag)."""
+    return g.get('etag_resposta')
+
+
+# Tabelas alteradas na transação (anotadas em database._bump_versoes_no_flush):
+# só viram invalidação depois do commit; rollback descarta.
+@event.listens_for(Session, 'after_commit')
+def _invalidar_no_commit(session):
+    tabelas = session.info.pop('tabelas_alteradas', None)
+    if tabelas and _Estado.backend is not None:
+        _Estado.backend.invalidar(tabelas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_no_rollback(session):
+    session.info.pop('tabelas_alteradas', None)
+
+
+def init_app(app):
+    _Estado.backend = _criar_backend()
+    _Estado.max_resposta = int(float(os.getenv('CACHE_MAX_RESPOSTA_MB', '8')) * 1024 * 1024)
+    app.logger.info('cache de respostas: %s', _Estado.backend.nome if _Estado.backend else 'off')
@@ -0,0 +1,113 @@
+# Configuração do banco vinda do ambiente (docker-compose / gunicorn).
+import os
+
+from utils import _parse_bool
+
+
+def _env_int(nome, padrao):
+    return int(os.getenv(nome, padrao))
+
+
+def database_uri():
+    """DATABASE_URL, ou montada a partir de DB_HOST/DB_PORT/DB_USER/DB_PASSWORD/DB_NAME."""
+    if os.getenv('DATABASE_URL'):
+        return os.environ['DATABASE_URL']
+    return 'postgresql://{u}:{p}@{h}:{port}/{db}'.format(
+        u=os.getenv('DB_USER', 'postgres'),
+        p=os.getenv('DB_PASSWORD', 'postgres'),
+        h=os.getenv('DB_HOST', 'db'),
+        port=os.getenv('DB_PORT', '5432'),
+        db=os.getenv('DB_NAME', 'projetos_db'),
+    )
+
+
+def engine_options(uri):
+    """Opções do pool/engine do SQLAlchemy.
+
+    Conexões no Postgres por instância ~= WEB_CONCURRENCY x (DB_POOL_SIZE +
+    DB_MAX_OVERFLOW); isso tem que caber em max_connections com folga.
+
+      DB_POOL_SIZE            conexões mantidas abertas por processo (padrão 5)
+      DB_MAX_OVERFLOW         conexões extras em pico, fechadas depois (padrão 5)
+      DB_POOL_TIMEOUT         segundos esperando uma conexão livre (padrão 10)
+      DB_POOL_RECYCLE         recicla conexões com mais de N segundos (padrão 1800)
+      DB_POOL_PRE_PING        testa a conexão antes de usar (padrão 1)
+      DB_STATEMENT_TIMEOUT_MS statement_timeout por sessão, 0 = sem limite (padrão 0)
+    """
+    from pool_metricas import PoolInstrumentado
+
+    connect_args = {}
+    if uri.startswith('postgresql'):
+        # aparece em pg_stat_activity: facilita ver quem ocupa as conexões
+        connect_args['application_name'] = os.getenv('DB_APPLICATION_NAME', 'cgsol-backend')
+        timeout_ms = _env_int('DB_STATEMENT_TIMEOUT_MS', 0)
+        if timeout_ms > 0:
+            connect_args['options'] = f'-c statement_timeout={timeout_ms}'
+
+    return {
+        'poolclass': PoolInstrumentado,
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 5),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _parse_bool(os.getenv('DB_POOL_PRE_PING', '1')),
+        'connect_args': connect_args,
+    }
+
+
+def database_uri_async():
+    """database_uri() com o driver asyncpg, para o engine async do asgi.py."""
+    esquema, sep, resto = database_uri().partition('://')
+    if not sep or not esquema.startswith('postgresql'):
+        raise RuntimeError(f'asgi.py precisa de PostgreSQL (DATABASE_URL com {esquema!r})')
+    return 'postgresql+asyncpg://' + resto
+
+
+def engine_options_async():
+    """Opções do create_async_engine: mesmas variáveis DB_* do engine_options().
+
+    O engine async tem pool próprio, separado do pool do Flask (que continua
+    servindo as rotas montadas via WSGI): no asgi.py as conexões por processo
+    chegam a 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) — dimensione com isso.
+    """
+    # asyncpg não aceita options=-c ...: os parâmetros vão em server_settings
+    settings = {'application_name': os.getenv('DB_APPLICATION_NAME', 'cgsol-backend') + '-asgi'}
+    timeout_ms = _env_int('DB_STATEMENT_TIMEOUT_MS', 0)
+    if timeout_ms > 0:
+        settings['statement_timeout'] = str(timeout_ms)
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 5),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _parse_bool(os.getenv('DB_POOL_PRE_PING', '1')),
+        'connect_args': {'server_settings': settings},
+    }
+
+
+def compressao():
+    """Configuração do Flask-Compress (gzip/brotli negociado pelo Accept-Encoding).
+
+      COMPRESSAO           1 liga, 0 desliga (padrão 1; atrás de um proxy que
+                           já comprime, desligue aqui)
+      COMPRESS_MIN_SIZE    respostas menores que N bytes vão sem compressão
+                           (padrão 1024: abaixo disso o ganho não paga a CPU)
+      COMPRESS_LEVEL       nível do gzip (padrão 6)
+      COMPRESS_BR_LEVEL    qualidade do brotli (padrão 4; 11 é lento demais
+                           para compressão por requisição)
+
+    Respostas em streaming (export) não são comprimidas: o gzip por pedaço
+    seguraria os bytes no buffer do compressor em vez de mandá-los.
+    """
+    from cache import Comprimidos, chave_compressao
+
+    return {
+        'COMPRESS_REGISTER': _parse_bool(os.getenv('COMPRESSAO', '1')),
+        'COMPRESS_ALGORITHM': ['br', 'gzip'],
+        'COMPRESS_MIN_SIZE': _env_int('COMPRESS_MIN_SIZE', 1024),
+        'COMPRESS_LEVEL': _env_int('COMPRESS_LEVEL', 6),
+        'COMPRESS_BR_LEVEL': _env_int('COMPRESS_BR_LEVEL', 4),
+        'COMPRESS_STREAMS': False,
+        'COMPRESS_CACHE_BACKEND': Comprimidos,
+        'COMPRESS_CACHE_KEY': chave_compressao,
+    }
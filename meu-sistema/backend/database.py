@@ -1,14 +1,289 @@
+import re
+import threading
+import unicodedata
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event, inspect
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert as pg_insert
+from sqlalchemy.orm import Session
 db = SQLAlchemy()
 
+
+# --- Busca textual (GET /api/search) ---
+# Cada tabela pesquisável tem uma coluna "busca" tsvector GERADA pelo banco
+# (sempre em dia, sem trigger) com índice GIN. A coluna fica fora do
+# mapeamento ORM: as consultas normais não a carregam; busca.py a usa via
+# Model.__table__.c.busca.
+# pt_unaccent = dicionário português + unaccent ("acao" acha "ação").
+CONFIG_BUSCA = 'pt_unaccent'
+
+event.listen(db.metadata, 'before_create', DDL(f"""
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIG_BUSCA}') THEN
+    CREATE EXTENSION IF NOT EXISTS unaccent;
+    CREATE TEXT SEARCH CONFIGURATION {CONFIG_BUSCA} (COPY = pg_catalog.portuguese);
+    ALTER TEXT SEARCH CONFIGURATION {CONFIG_BUSCA}
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+  END IF;
+END $$
+""").execute_if(dialect='postgresql'))
+
+
+def _coluna_busca(*campos):
+    """Coluna tsvector gerada a partir de (coluna, peso A-D)."""
+    expr = ' || '.join(
+        f"setweight(to_tsvector('{CONFIG_BUSCA}', coalesce({col}, '')), '{peso}')" for col, peso in campos)
+    return db.Column(TSVECTOR, db.Computed(expr, persisted=True))
+
+
+def _indice_busca(tabela):
+    return db.Index(f'ix_{tabela}_busca', 'busca', postgresql_using='gin')
+
+
+# --- Domínios dos projetos: status, tipo e coordenação ---
+# Tabelas de lookup referenciadas em projetos por chaves smallint: filtros e
+# agrupamentos comparam inteiros. O texto que chega da API/importação é
+# canonizado na escrita ("em_andamento", "EM ANDAMENTO" -> "Em Andamento"),
+# com as mesmas regras que o antigo fix-db-values.sql aplicava em lote.
+class StatusProjeto(db.Model):
+    __tablename__ = 'projeto_status'
+    id = db.Column(db.SmallInteger, primary_key=True)
+    nome = db.Column(db.String(50), nullable=False, unique=True)
+    chave = db.Column(db.String(50), nullable=False, unique=True)   # chave_dominio(nome)
+
+
+class TipoProjeto(db.Model):
+    __tablename__ = 'projeto_tipos'
+    id = db.Column(db.SmallInteger, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False, unique=True)
+    chave = db.Column(db.String(100), nullable=False, unique=True)
+
+
+class Coordenacao(db.Model):
+    __tablename__ = 'coordenacoes'
+    id = db.Column(db.SmallInteger, primary_key=True)
+    nome = db.Column(db.String(50), nullable=False, unique=True)
+    chave = db.Column(db.String(50), nullable=False, unique=True)
+
+
+# Pessoas (responsável, equipe, desenvolvedor) usam o mesmo mecanismo: nome
+# preservado como veio, identidade pela chave normalizada ("ana souza" e
+# "Ana  Souza" são a mesma pessoa; vale a grafia do primeiro cadastro).
+class Pessoa(db.Model):
+    __tablename__ = 'pessoas'
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), nullable=False, unique=True)
+    chave = db.Column(db.String(100), nullable=False, unique=True)
+
+
+DOMINIOS = {'status': StatusProjeto, 'tipo': TipoProjeto, 'coordenacao': Coordenacao, 'pessoa': Pessoa}
+
+# Valores canônicos, na ordem dos ids semeados (1, 2, ...): os mesmos do front.
+CANONICOS = {
+    'status': ['Planejado', 'Em Andamento', 'Em Risco', 'Concluído', 'Sustentação', 'Pausado'],
+    'tipo': ['Infraestrutura', 'Sistema Integrado', 'Integração', 'BI Dashboard', 'Dashboard',
+             'Sistema de Dados', 'Modernização', 'Qualidade de Dados', 'Governança',
+             'Sistema Web', 'Chatbot IA'],
+    'coordenacao': ['CODES', 'COSET', 'CGOD'],
+    'pessoa': [],
+}
+# chave (sem acento, minúscula) -> nome canônico
+SINONIMOS = {
+    'status': {
+        'planejada': 'Planejado', 'planned': 'Planejado',
+        'andamento': 'Em Andamento', 'emandamento': 'Em Andamento', 'em_andamento': 'Em Andamento',
+        'risco': 'Em Risco', 'atrasado': 'Em Risco', 'fora de prazo': 'Em Risco',
+        'fora-prazo': 'Em Risco', 'fora prazo': 'Em Risco',
+        'finalizado': 'Concluído', 'entregue': 'Concluído', 'done': 'Concluído',
+        'suporte': 'Sustentação', 'producao': 'Sustentação', 'sustentacao/producao': 'Sustentação',
+        'pausada': 'Pausado', 'suspenso': 'Pausado', 'suspensa': 'Pausado',
+    },
+    'tipo': {
+        'sistema-integrado': 'Sistema Integrado',
+        'integration': 'Integração',
+        'bi': 'BI Dashboard', 'business intelligence': 'BI Dashboard',
+        'powerbi': 'BI Dashboard', 'power bi': 'BI Dashboard',
+        'painel': 'Dashboard',
+        'dados': 'Sistema de Dados', 'data lake': 'Sistema de Dados',
+        'datalake': 'Sistema de Dados', 'data-lake': 'Sistema de Dados',
+    },
+    'coordenacao': {},
+    'pessoa': {},
+}
+PREFIXOS = {
+    'tipo': [('infra', 'Infraestrutura'), ('modern', 'Modernização'),
+             ('qualidade', 'Qualidade de Dados'), ('governan', 'Governança')],
+}
+# tipo aceita valores novos (viram linha nova); status e coordenação só os cadastrados
+DOMINIOS_ABERTOS = {'tipo', 'pessoa'}
+
+
+def chave_dominio(valor):
+    """trim, espaços colapsados, sem acento, minúsculo (o norm() do main.js)."""
+    s = unicodedata.normalize('NFD', ' '.join(str(valor or '').split()))
+    return ''.join(ch for ch in s if not unicodedata.combining(ch)).lower()
+
+
+def canonico_dominio(dominio, valor):
+    """Nome canônico do valor, ou None se não é um valor conhecido (sem banco)."""
+    k = chave_dominio(valor)
+    for nome in CANONICOS[dominio]:
+        if chave_dominio(nome) == k:
+            return nome
+    if k in SINONIMOS[dominio]:
+        return SINONIMOS[dominio][k]
+    for prefixo, nome in PREFIXOS.get(dominio, ()):
+        if k.startswith(prefixo):
+            return nome
+    return None
+
+
+# Cache por processo {dominio: ({chave: id}, {id: nome})}. As tabelas são
+# minúsculas e só ganham linhas (nunca renomeiam/apagam), então basta reler
+# quando aparece um id ou chave desconhecido.
+_cache_dominios = {}
+_lock_dominios = threading.Lock()
+
+
+def _recarregar_dominio(dominio):
+    t = DOMINIOS[dominio].__table__
+    # conexão própria: não participa (nem depende) da transação da requisição
+    with db.engine.connect() as conn:
+        linhas = conn.execute(db.select(t.c.id, t.c.nome, t.c.chave)).all()
+    cache = ({k: i for i, _, k in linhas}, {i: n for i, n, _ in linhas})
+    with _lock_dominios:
+        _cache_dominios[dominio] = cache
+    return cache
+
+
+def _cache(dominio):
+    return _cache_dominios.get(dominio) or _recarregar_dominio(dominio)
+
+
+def nome_dominio(dominio, id_):
+    if id_ is None:
+        return None
+    nome = _cache(dominio)[1].get(id_)
+    if nome is None:
+        nome = _recarregar_dominio(dominio)[1].get(id_)
+    return nome
+
+
+def normalizar_dominio(dominio, valor):
+    """(nome canonizado, chave) do valor; ValueError se vazio."""
+    if valor is None or not str(valor).strip():
+        raise ValueError(f'{dominio} é obrigatório')
+    nome = canonico_dominio(dominio, valor) or ' '.join(str(valor).split())
+    return nome, chave_dominio(nome)
+
+
+def validar_nome_novo(dominio, valor, nome):
+    """ValueError se o nome não pode virar linha nova do domínio."""
+    if dominio not in DOMINIOS_ABERTOS:
+        raise ValueError(f'{dominio} inválido: {valor!r} (aceitos: {", ".join(CANONICOS[dominio])})')
+    limite = DOMINIOS[dominio].__table__.c.nome.type.length
+    if len(nome) > limite:
+        raise ValueError(f'{dominio} excede {limite} caracteres')
+
+
+def id_dominio(dominio, valor, criar=False):
+    """Id do valor (canonizado). ValueError se vazio ou não cadastrado; com
+    criar=True, num domínio aberto, cadastra o valor novo (ValueError se o
+    nome é longo demais para a coluna)."""
+    nome, k = normalizar_dominio(dominio, valor)
+    id_ = _cache(dominio)[0].get(k)
+    if id_ is None:
+        id_ = _recarregar_dominio(dominio)[0].get(k)
+    if id_ is None and criar and dominio in DOMINIOS_ABERTOS:
+        validar_nome_novo(dominio, valor, nome)
+        t = DOMINIOS[dominio].__table__
+        # commit próprio: se a requisição falhar depois, a linha nova fica (inofensiva)
+        # e o cache nunca aponta para um id que não existe
+        with db.engine.begin() as conn:
+            res = conn.execute(pg_insert(t).values(nome=nome, chave=k).on_conflict_do_nothing())
+            if res.rowcount:
+                bump_versoes(conn, [t.name])
+        id_ = _recarregar_dominio(dominio)[0].get(k)
+    if id_ is None:
+        validar_nome_novo(dominio, valor, nome)   # domínio fechado: levanta
+        raise ValueError(f'{dominio} não cadastrado: {valor!r}')
+    return id_
+
+
+def cadastrar_dominio(conn, dominio, nomes):
+    """Cadastra de uma vez, na transação de conn, os nomes {chave: nome} de
+    um domínio aberto. Devolve {chave: id} de todos, inclusive os que outra
+    transação cadastrou antes. Não mexe na versão da tabela (o chamador a
+    inclui no seu bump_versoes, na mesma ordem fixa) nem no cache de
+    domínios (recarregue com _recarregar_dominio depois do commit)."""
+    t = DOMINIOS[dominio].__table__
+    ids = dict(conn.execute(pg_insert(t).values([{'nome': n, 'chave': k} for k, n in nomes.items()])
+                            .on_conflict_do_nothing().returning(t.c.chave, t.c.id)).all())
+    faltam = {k: n for k, n in nomes.items() if k not in ids}
+    if faltam:
+        # já existiam (corrida com outro cadastro): pela chave ou, grafia
+        # diferente com a mesma chave de outro nome, pelo nome
+        for id_, nome, chave in conn.execute(db.select(t.c.id, t.c.nome, t.c.chave).where(
+                db.or_(t.c.chave.in_(faltam), t.c.nome.in_(faltam.values())))):
+            for k, n in faltam.items():
+                if chave == k or nome == n:
+                    ids[k] = id_
+    return ids
+
+
+def _campo_dominio(dominio, coluna=None, obrigatorio=True):
+    """Atributo texto da API sobre a chave do domínio: lê o nome, grava canonizando."""
+    coluna = coluna or f'{dominio}_id'
+
+    def ler(self):
+        return nome_dominio(dominio, getattr(self, coluna))
+
+    def gravar(self, valor):
+        if not obrigatorio and (valor is None or not str(valor).strip()):
+            setattr(self, coluna, None)
+        else:
+            setattr(self, coluna, id_dominio(dominio, valor, criar=True))
+    return property(ler, gravar)
+
+
+def _semear_dominio(target, connection, **kw):
+    dominio = next(d for d, m in DOMINIOS.items() if m.__table__ is target)
+    if not CANONICOS[dominio]:
+        return
+    connection.execute(target.insert(), [
+        {'id': i, 'nome': nome, 'chave': chave_dominio(nome)}
+        for i, nome in enumerate(CANONICOS[dominio], start=1)])
+    if connection.dialect.name == 'postgresql':
+        # ids explícitos não avançam a sequence
+        connection.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{target.name}', 'id'), {len(CANONICOS[dominio])})"))
+
+
+for _modelo in DOMINIOS.values():
+    event.listen(_modelo.__table__, 'after_create', _semear_dominio)
+
+
+# --- Sincronização incremental (GET /api/<entidade>/changes) ---
+# Toda linha sincronizável tem atualizado_em (índice com o id, na ordem do
+# delta) e cada exclusão pelo ORM deixa uma linha em remocoes (tombstone).
+def _coluna_atualizado_em():
+    # default/onupdate: escritas pelo ORM; server_default: INSERT direto (importação)
+    return db.Column(db.DateTime, nullable=False, default=db.func.now(),
+                     server_default=db.func.now(), onupdate=db.func.now())
+
+
 class Projeto(db.Model):
     __tablename__ = 'projetos'
 
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(255), nullable=False)
-    tipo = db.Column(db.String(100), nullable=False)
-    coordenacao = db.Column(db.String(50), nullable=False)
-    status = db.Column(db.String(50), nullable=False)
+    tipo_id = db.Column(db.SmallInteger, db.ForeignKey('projeto_tipos.id'), nullable=False)
+    coordenacao_id = db.Column(db.SmallInteger, db.ForeignKey('coordenacoes.id'), nullable=False)
+    status_id = db.Column(db.SmallInteger, db.ForeignKey('projeto_status.id'), nullable=False)
+    tipo = _campo_dominio('tipo')
+    coordenacao = _campo_dominio('coordenacao')
+    status = _campo_dominio('status')
     descricao = db.Column(db.Text)
     inicio = db.Column(db.Date)
     fim = db.Column(db.Date)
@@ -18,14 +293,49 @@ class Projeto(db.Model):
     progresso = db.Column(db.Integer)             # 0–100
     totalSprints = db.Column(db.Integer)
     sprintsConcluidas = db.Column(db.Integer)
-    responsavel = db.Column(db.String(100))
+    responsavel_id = db.Column(db.Integer, db.ForeignKey('pessoas.id'))
+    responsavel = _campo_dominio('pessoa', 'responsavel_id', obrigatorio=False)
     orcamento = db.Column(db.Float)
-    equipe = db.Column(db.Text)                   # nomes separados por vírgula
     rag = db.Column(db.String(20))
     riscos = db.Column(db.Text)
     qualidade = db.Column(db.Integer)
     internalizacao = db.Column(db.Boolean, default=False)
+    atualizado_em = _coluna_atualizado_em()
+
+    busca = _coluna_busca(('nome', 'A'), ('descricao', 'B'), ('riscos', 'C'))
+    __table_args__ = (_indice_busca('projetos'),)
+    __mapper_args__ = {'exclude_properties': ['busca']}
 
+    # equipe: uma linha por pessoa em projeto_membros, na ordem digitada.
+    # selectin: uma query (IN) por lote de projetos, não uma por projeto
+    membros = db.relationship('ProjetoMembro', order_by='ProjetoMembro.ordem', lazy='selectin',
+                              cascade='all, delete-orphan', passive_deletes=True)
+
+    @property
+    def equipe(self):
+        """Nomes separados por vírgula, como o front envia e exibe."""
+        return ', '.join(nome_dominio('pessoa', m.pessoa_id) for m in self.membros) or None
+
+    @equipe.setter
+    def equipe(self, texto):
+        ids = []
+        for nome in str(texto or '').split(','):
+            if nome.strip():
+                id_ = id_dominio('pessoa', nome, criar=True)
+                if id_ not in ids:
+                    ids.append(id_)
+        if ids != [m.pessoa_id for m in self.membros]:
+            # projeto_membros não passa pelo onupdate de projetos: para o
+            # delta, mudar só a equipe também é alterar o projeto
+            self.atualizado_em = db.func.now()
+        # reaproveita as linhas de quem continua na equipe (só muda a ordem)
+        atuais = {m.pessoa_id: m for m in self.membros}
+        novos = []
+        for ordem, id_ in enumerate(ids):
+            m = atuais.get(id_) or ProjetoMembro(pessoa_id=id_)
+            m.ordem = ordem
+            novos.append(m)
+        self.membros = novos
 
     def to_dict(self):
         return {
@@ -35,8 +345,8 @@ class Projeto(db.Model):
             'coordenacao': self.coordenacao,
             'status': self.status,
             'descricao': self.descricao,
-            'inicio': self.inicio.isoformat() if self.inicio else None,
-            'fim': self.fim.isoformat() if self.fim else None,
+            'inicio': self.inicio,
+            'fim': self.fim,
             'prioridade': self.prioridade,
             'progresso': self.progresso,
             'totalSprints': self.totalSprints,
@@ -50,12 +360,34 @@ class Projeto(db.Model):
             'internalizacao': self.internalizacao,
 
         }
+
+
+# Índices dos filtros/ordenações de GET /api/projetos (ordem padrão: -id)
+db.Index('ix_projetos_coordenacao_status_id', Projeto.coordenacao_id, Projeto.status_id, Projeto.id)
+db.Index('ix_projetos_coordenacao_tipo_id', Projeto.coordenacao_id, Projeto.tipo_id, Projeto.id)
+db.Index('ix_projetos_status_id', Projeto.status_id, Projeto.id)
+db.Index('ix_projetos_responsavel_id', Projeto.responsavel_id)
+db.Index('ix_projetos_atualizado_em', Projeto.atualizado_em, Projeto.id)
+
+
+class ProjetoMembro(db.Model):
+    __tablename__ = 'projeto_membros'
+    projeto_id = db.Column(db.Integer, db.ForeignKey('projetos.id', ondelete='CASCADE'), primary_key=True)
+    pessoa_id = db.Column(db.Integer, db.ForeignKey('pessoas.id'), primary_key=True)
+    ordem = db.Column(db.SmallInteger, nullable=False, default=0)
+
+
+# "em quais projetos a pessoa X está" (a PK cobre o caminho projeto -> pessoas)
+db.Index('ix_projeto_membros_pessoa_projeto', ProjetoMembro.pessoa_id, ProjetoMembro.projeto_id)
+
+
 class Andamento(db.Model):
     __tablename__ = 'andamentos'
     id = db.Column(db.Integer, primary_key=True)
     projeto_id = db.Column(db.Integer, db.ForeignKey('projetos.id', ondelete='CASCADE'))
     data = db.Column(db.DateTime, default=db.func.now())
     descricao = db.Column(db.Text, nullable=False)
+    atualizado_em = _coluna_atualizado_em()
 
     projeto = db.relationship('Projeto', backref=db.backref('andamentos', cascade='all, delete-orphan'))
 
@@ -63,9 +395,19 @@ class Andamento(db.Model):
         return {
             'id': self.id,
             'projeto_id': self.projeto_id,
-            'data': self.data.isoformat() if self.data else None,
+            'data': self.data,
             'descricao': self.descricao
         }
+
+
+# histórico por projeto: mesma ordem de GET /api/projetos/<id>/andamentos
+db.Index('ix_andamentos_projeto_data', Andamento.projeto_id, Andamento.data.desc().nulls_last(),
+         Andamento.id.desc())
+db.Index('ix_andamentos_atualizado_em', Andamento.atualizado_em, Andamento.id)
+# histórico de todos os projetos: GET /api/andamentos (ordem padrão -data)
+db.Index('ix_andamentos_data', Andamento.data.desc().nulls_last(), Andamento.id.desc())
+
+
 class PDTIAction(db.Model):
     __tablename__ = 'pdti_acoes'
 
@@ -74,6 +416,7 @@ class PDTIAction(db.Model):
     situacao = db.Column(db.String(50), nullable=False, default="Não iniciada")
     tipo = db.Column(db.String(10), nullable=False)   # SDF, SDD, SDS
     data_conclusao = db.Column(db.Date, nullable=True)  # ✅ novo campo
+    atualizado_em = _coluna_atualizado_em()
 
     def to_dict(self):
         return {
@@ -81,32 +424,102 @@ class PDTIAction(db.Model):
             'descricao': self.descricao,
             'situacao': self.situacao,
             'tipo': self.tipo,
-            'data_conclusao': self.data_conclusao.isoformat() if self.data_conclusao else None
+            'data_conclusao': self.data_conclusao
         }
 
+
+db.Index('ix_pdti_acoes_tipo_situacao', PDTIAction.tipo, PDTIAction.situacao)
+db.Index('ix_pdti_acoes_atualizado_em', PDTIAction.atualizado_em, PDTIAction.id)
+
 class SustentacaoChamado(db.Model):
     __tablename__ = "sustentacao_chamados"
 
     id = db.Column(db.Integer, primary_key=True)
     numero_chamado = db.Column(db.String(50), unique=True, nullable=False, index=True)
     projeto = db.Column(db.String(100), nullable=False)
-    desenvolvedor = db.Column(db.String(100))
+    desenvolvedor_id = db.Column(db.Integer, db.ForeignKey('pessoas.id'))
+    desenvolvedor = _campo_dominio('pessoa', 'desenvolvedor_id', obrigatorio=False)
     data_chamado = db.Column(db.DateTime)
     descricao = db.Column(db.Text)
     solicitante = db.Column(db.String(150))
     status = db.Column(db.String(50))
     observacao = db.Column(db.Text)
     criado_em = db.Column(db.DateTime, default=db.func.now())
-    atualizado_em = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+    atualizado_em = _coluna_atualizado_em()
+    status_bucket = db.Column(db.String(20))   # derivado de status (ver bucket_status)
+
+    busca = _coluna_busca(('descricao', 'A'), ('observacao', 'B'))
+    __table_args__ = (_indice_busca('sustentacao_chamados'),)
+    __mapper_args__ = {'exclude_properties': ['busca']}
 
     # relação para as observações (cascade para deletar observações quando excluir o chamado)
+    # chamado é lazy="select": com "joined" toda consulta de observações fazia
+    # JOIN em sustentacao_chamados sem usar o chamado para nada
     observacoes = db.relationship(
         "SustentacaoObservacao",
-        backref=db.backref("chamado", lazy="joined"),
+        backref=db.backref("chamado", lazy="select"),
         cascade="all, delete-orphan",
         passive_deletes=True
     )
 
+    def to_dict(self):
+        return {
+            "numero_chamado": self.numero_chamado,
+            "projeto": self.projeto,
+            "desenvolvedor": self.desenvolvedor,
+            "data_chamado": self.data_chamado,
+            "descricao": self.descricao,
+            "solicitante": self.solicitante,
+            "status": self.status,
+            "observacao": self.observacao
+        }
+
+
+# Índices dos filtros de GET /api/sustentacao, na ordem padrão da listagem
+# (data_chamado DESC NULLS LAST, id DESC) para o LIMIT sair direto do índice.
+# O de status_bucket também atende o GROUP BY de /api/sustentacao/stats.
+def _indice_sustentacao(nome, *prefixo):
+    return db.Index(nome, *prefixo, SustentacaoChamado.data_chamado.desc().nulls_last(),
+                    SustentacaoChamado.id.desc())
+
+
+_indice_sustentacao('ix_sustentacao_chamados_data')
+_indice_sustentacao('ix_sustentacao_chamados_bucket_data', SustentacaoChamado.status_bucket)
+_indice_sustentacao('ix_sustentacao_chamados_status_data', SustentacaoChamado.status)
+_indice_sustentacao('ix_sustentacao_chamados_projeto_data', SustentacaoChamado.projeto)
+_indice_sustentacao('ix_sustentacao_chamados_desenvolvedor_data', SustentacaoChamado.desenvolvedor_id)
+# carga por pessoa (GET /api/pessoas/carga): contagem por bucket só no índice
+db.Index('ix_sustentacao_chamados_desenvolvedor_bucket', SustentacaoChamado.desenvolvedor_id,
+         SustentacaoChamado.status_bucket)
+db.Index('ix_sustentacao_chamados_atualizado_em', SustentacaoChamado.atualizado_em, SustentacaoChamado.id)
+
+# --- Buckets canônicos do status (texto livre) dos chamados ---
+# Mesmas regex dos cards "sust-*" do main.js, aplicadas sobre o status sem
+# acento e em minúsculas. O front conta cada regex separadamente (um status
+# pode cair em mais de um card); aqui cada chamado fica em UM bucket, pela
+# ordem de prioridade abaixo.
+STATUS_BUCKETS = [
+    ('concluido',      re.compile(r'conclu|fech|resolvid|done|closed')),
+    ('suspenso',       re.compile(r'suspens|suspend|bloquead')),
+    ('homologacao',    re.compile(r'homolog')),
+    ('em_testes',      re.compile(r'teste|qa|test')),
+    ('a_desenvolver',  re.compile(r'a desenvolver|adesenvolver|a-desenvolver')),
+    ('pendente',       re.compile(r'pendente|pend\W')),
+    ('em_dev',         re.compile(r'desenvolv|dev|em desenvolvimento|em dev')),
+    ('atrasado',       re.compile(r'atras|vencid')),
+]
+BUCKET_OUTRO = 'outro'
+
+
+def bucket_status(status):
+    s = unicodedata.normalize('NFD', str(status or ''))
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch)).lower()
+    for bucket, rx in STATUS_BUCKETS:
+        if rx.search(s):
+            return bucket
+    return BUCKET_OUTRO
+
+
 # --- Histórico de observações por chamado de Sustentação ---
 class SustentacaoObservacao(db.Model):
     __tablename__ = "sustentacao_observacoes"
@@ -116,15 +529,215 @@ class SustentacaoObservacao(db.Model):
         db.String(50),
         db.ForeignKey("sustentacao_chamados.numero_chamado", ondelete="CASCADE"),
         nullable=False,
-        index=True
     )
     texto = db.Column(db.Text, nullable=False)
     criado_em = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
 
+    busca = _coluna_busca(('texto', 'A'))
+    __table_args__ = (_indice_busca('sustentacao_observacoes'),)
+    __mapper_args__ = {'exclude_properties': ['busca']}
+
     def to_dict(self):
         return {
             "id": self.id,
             "numero_chamado": self.numero_chamado,
             "texto": self.texto,
-            "created_at": self.criado_em.isoformat() if self.criado_em else None,
+            "created_at": self.criado_em,
         }
+
+
+# observações de um chamado (e de vários, no lote) já na ordem da tela; o
+# prefixo numero_chamado serve à FK com ON DELETE CASCADE
+db.Index('ix_sustentacao_observacoes_chamado_criado', SustentacaoObservacao.numero_chamado,
+         SustentacaoObservacao.criado_em.desc(), SustentacaoObservacao.id.desc())
+
+
+# --- Versão por tabela (ETag / 304 nas listagens) ---
+# Cada flush que insere/altera/apaga linhas de uma tabela incrementa a versão
+# dela, na mesma transação. Ler a versão é um lookup por PK, bem mais barato
+# que consultar e serializar a listagem.
+class TabelaVersao(db.Model):
+    __tablename__ = "tabela_versoes"
+
+    tabela = db.Column(db.String(64), primary_key=True)
+    versao = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+# Tabelas apagadas pelo banco (ON DELETE CASCADE + passive_deletes), que o ORM
+# não vê no flush.
+_CASCATAS = {
+    "projetos": ("projeto_membros",),
+    "sustentacao_chamados": ("sustentacao_observacoes",),
+}
+# Tabelas cujas linhas aparecem no JSON de outra: mudar só a equipe também
+# invalida a ETag de /api/projetos.
+_EMBUTIDAS_EM = {
+    "projeto_membros": ("projetos",),
+}
+
+
+def bump_versoes(conn, tabelas):
+    """Incrementa a versão das tabelas (conn = Connection ou Session)."""
+    t = TabelaVersao.__table__
+    for nome in sorted(set(tabelas)):   # ordem fixa: evita deadlock entre transações
+        res = conn.execute(t.update().where(t.c.tabela == nome).values(versao=t.c.versao + 1))
+        if res.rowcount == 0:
+            conn.execute(t.insert().values(tabela=nome, versao=1))
+
+
+def versoes_atuais(tabelas):
+    """{tabela: versao} das tabelas pedidas (0 para as que nunca mudaram)."""
+    t = TabelaVersao.__table__
+    linhas = db.session.execute(db.select(t.c.tabela, t.c.versao).where(t.c.tabela.in_(tabelas)))
+    versoes = dict.fromkeys(tabelas, 0)
+    versoes.update({nome: v for nome, v in linhas})
+    return versoes
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_versoes_no_flush(session, flush_context):
+    tabelas = set()
+    for obj in session.new:
+        tabelas.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tabelas.add(obj.__table__.name)
+    for obj in session.deleted:
+        tabelas.add(obj.__table__.name)
+        tabelas.update(_CASCATAS.get(obj.__table__.name, ()))
+    tabelas.discard(TabelaVersao.__tablename__)
+    for nome in list(tabelas):
+        tabelas.update(_EMBUTIDAS_EM.get(nome, ()))
+    if tabelas:
+        bump_versoes(session.connection(), tabelas)
+        # lido no after_commit pelo cache de respostas (cache.py)
+        session.info.setdefault('tabelas_alteradas', set()).update(tabelas)
+
+
+# --- Tombstones: o que foi excluído, para o delta avisar os clientes ---
+class Remocao(db.Model):
+    __tablename__ = "remocoes"
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    tabela = db.Column(db.String(64), nullable=False)
+    chave = db.Column(db.String(50), nullable=False)   # a chave que o cliente conhece, em texto
+    removido_em = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+
+db.Index("ix_remocoes_tabela_removido_em", Remocao.tabela, Remocao.removido_em)
+
+# tabela -> atributo que identifica a linha no JSON (o chamado é pelo número)
+CHAVES_REMOCAO = {
+    "projetos": "id",
+    "andamentos": "id",
+    "pdti_acoes": "id",
+    "sustentacao_chamados": "numero_chamado",
+}
+
+
+@event.listens_for(Session, "before_flush")
+def _carregar_chaves_removidas(session, flush_context, instances):
+    # depois do flush a linha já não existe: um atributo expirado não carrega mais
+    for obj in session.deleted:
+        campo = CHAVES_REMOCAO.get(obj.__table__.name)
+        if campo:
+            getattr(obj, campo)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_remocoes(session, flush_context):
+    linhas = []
+    for obj in session.deleted:
+        campo = CHAVES_REMOCAO.get(obj.__table__.name)
+        chave = inspect(obj).dict.get(campo) if campo else None
+        if chave is not None:
+            linhas.append({"tabela": obj.__table__.name, "chave": str(chave)})
+    if linhas:
+        session.connection().execute(Remocao.__table__.insert(), linhas)
+
+
+@event.listens_for(TabelaVersao.__table__, "after_create")
+def _semear_versoes(target, connection, **kw):
+    nomes = [t for t in db.metadata.tables if t != TabelaVersao.__tablename__]
+    connection.execute(target.insert(), [{"tabela": n, "versao": 0} for n in nomes])
+
+
+# --- Notificações de alteração (GET /api/events, ver eventos.py) ---
+# Um trigger por comando (AFTER ... FOR EACH STATEMENT, com a tabela de
+# transição) faz pg_notify de {"entidade", "op", "id"[, pai]} por linha
+# alterada. Comandos com mais de LIMITE_EVENTOS_POR_COMANDO linhas (importação,
+# carga) mandam um só {"entidade", "op": "recarregar"}. O NOTIFY só é entregue
+# no commit. Criado pelo create_all (abaixo) e pela migração 0007.
+CANAL_EVENTOS = "cgsol_eventos"
+LIMITE_EVENTOS_POR_COMANDO = 100
+
+# tabela -> (entidade no evento, coluna da chave, coluna do pai ou None)
+TABELAS_EVENTOS = {
+    "projetos": ("projetos", "id", None),
+    "andamentos": ("andamentos", "id", "projeto_id"),
+    "sustentacao_chamados": ("sustentacao", "numero_chamado", None),
+    "sustentacao_observacoes": ("observacoes", "id", "numero_chamado"),
+    "pdti_acoes": ("pdti", "id", None),
+}
+
+_FUNCAO_EVENTOS = f"""
+CREATE OR REPLACE FUNCTION cgsol_notificar() RETURNS trigger LANGUAGE plpgsql AS $$
+-- TG_ARGV: entidade, coluna da chave, coluna do pai (opcional)
+DECLARE
+  linha jsonb;
+  n bigint;
+  pai jsonb := '{{}}';
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    SELECT count(*) INTO n FROM antigas;
+  ELSE
+    SELECT count(*) INTO n FROM novas;
+  END IF;
+  IF n > {LIMITE_EVENTOS_POR_COMANDO} THEN
+    PERFORM pg_notify('{CANAL_EVENTOS}', json_build_object('entidade', TG_ARGV[0], 'op', 'recarregar')::text);
+    RETURN NULL;
+  END IF;
+  IF TG_OP = 'DELETE' THEN
+    FOR linha IN SELECT to_jsonb(t) FROM antigas t LOOP
+      IF TG_NARGS > 2 THEN pai := jsonb_build_object(TG_ARGV[2], linha -> TG_ARGV[2]); END IF;
+      PERFORM pg_notify('{CANAL_EVENTOS}', (jsonb_build_object(
+        'entidade', TG_ARGV[0], 'op', 'delete', 'id', linha -> TG_ARGV[1]) || pai)::text);
+    END LOOP;
+  ELSE
+    FOR linha IN SELECT to_jsonb(t) FROM novas t LOOP
+      IF TG_NARGS > 2 THEN pai := jsonb_build_object(TG_ARGV[2], linha -> TG_ARGV[2]); END IF;
+      PERFORM pg_notify('{CANAL_EVENTOS}', (jsonb_build_object(
+        'entidade', TG_ARGV[0], 'op', lower(TG_OP), 'id', linha -> TG_ARGV[1]) || pai)::text);
+    END LOOP;
+  END IF;
+  RETURN NULL;
+END $$
+"""
+
+
+def ddl_eventos():
+    """Comandos que (re)criam a função e os triggers de notificação."""
+    comandos = [_FUNCAO_EVENTOS]
+    for tabela, args in TABELAS_EVENTOS.items():
+        args_sql = ", ".join(f"'{a}'" for a in args if a)
+        for op, transicao in (("insert", "NEW TABLE AS novas"), ("update", "NEW TABLE AS novas"),
+                              ("delete", "OLD TABLE AS antigas")):
+            nome = f"{tabela}_eventos_{op}"
+            comandos.append(f"DROP TRIGGER IF EXISTS {nome} ON {tabela}")
+            comandos.append(f"CREATE TRIGGER {nome} AFTER {op.upper()} ON {tabela} "
+                            f"REFERENCING {transicao} FOR EACH STATEMENT "
+                            f"EXECUTE FUNCTION cgsol_notificar({args_sql})")
+    return comandos
+
+
+def ddl_remover_eventos():
+    comandos = [f"DROP TRIGGER IF EXISTS {tabela}_eventos_{op} ON {tabela}"
+                for tabela in TABELAS_EVENTOS for op in ("insert", "update", "delete")]
+    return comandos + ["DROP FUNCTION IF EXISTS cgsol_notificar()"]
+
+
+@event.listens_for(db.metadata, "after_create")
+def _criar_triggers_eventos(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        for comando in ddl_eventos():
+            connection.exec_driver_sql(comando)
@@ -0,0 +1,309 @@
+# Notificações de alteração em tempo real: GET /api/events (Server-Sent Events).
+#
+# Os triggers de database.py (TABELAS_EVENTOS) fazem pg_notify no canal
+# CANAL_EVENTOS a cada commit que muda projetos, andamentos, chamados,
+# observações ou ações do PDTI. Cada processo (worker do gunicorn) mantém UMA
+# conexão própria em LISTEN, fora do pool, numa thread que repassa cada
+# notificação para a fila de cada stream aberto no processo — não uma
+# conexão por navegador.
+#
+# Eventos (campo data, JSON):
+#   {"entidade": "sustentacao", "op": "update", "id": "CH0001"}
+#   {"entidade": "observacoes", "op": "insert", "id": 7, "numero_chamado": "CH0001"}
+#   {"entidade": "projetos", "op": "recarregar"}   comando grande (importação)
+#   {"entidade": "*", "op": "recarregar"}          a escuta caiu: algo pode ter se perdido
+# "recarregar" = pedir /api/<entidade>/changes com o último token. O mesmo
+# vale ao (re)conectar: o evento "pronto" é o momento de sincronizar.
+#
+# Com gthread cada stream ocupa uma thread do worker enquanto está aberto,
+# então o gthread só aguenta poucos streams: para painéis abertos o dia todo,
+# sirva com asgi:app (o stream é uma corrotina, sem thread: ver asgi.py; é o
+# deploy da imagem do Dockerfile) ou com o worker gevent.
+#   EVENTOS_MAX_ASSINANTES  streams por processo; acima disso 503 (padrão:
+#                           1000 no asgi.py, 500 no gevent e, no gthread,
+#                           GUNICORN_THREADS // 4 — as outras threads ficam
+#                           para a API)
+#   EVENTOS_HEARTBEAT_S     comentário a cada N s sem evento; mantém proxies
+#                           abertos e detecta cliente que sumiu (padrão 15)
+#   EVENTOS_FILA            eventos pendentes por stream; se um cliente lento
+#                           estourar, o stream fecha e o navegador reconecta
+#                           (padrão 1000)
+import asyncio
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+
+from prometheus_client import Counter, Gauge
+
+from database import CANAL_EVENTOS, TABELAS_EVENTOS
+
+log = logging.getLogger(__name__)
+
+ENTIDADES = sorted(e for e, _, _ in TABELAS_EVENTOS.values())
+RETRY_MS = 3000   # espera do EventSource antes de reconectar
+
+ASSINANTES = Gauge('eventos_assinantes', 'Streams SSE abertos', multiprocess_mode='livesum')
+NOTIFICACOES = Counter('eventos_notificacoes_total', 'Notificações recebidas do Postgres')
+DESCARTADOS = Counter('eventos_streams_descartados_total', 'Streams fechados por fila cheia')
+
+
+def _max_assinantes(nativo=False):
+    if os.getenv('EVENTOS_MAX_ASSINANTES'):
+        return int(os.environ['EVENTOS_MAX_ASSINANTES'])
+    if nativo:
+        return 1000
+    if os.getenv('GUNICORN_WORKER_CLASS', 'gthread') == 'gevent':
+        return 500
+    return max(1, int(os.getenv('GUNICORN_THREADS', '4')) // 4)
+
+
+class _Fila(queue.Queue):
+    """Fila de um stream servido por thread (rota Flask)."""
+
+    def fechar(self):
+        with self.mutex:
+            self.queue.clear()
+        self.put_nowait(None)
+
+
+class FilaAsync:
+    """Fila de um stream servido por corrotina (asgi.py): a thread do LISTEN
+    entrega os eventos no event loop."""
+
+    def __init__(self, loop, tamanho):
+        self._loop = loop
+        self._fila = asyncio.Queue()
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._tamanho = tamanho
+        self._fechada = False
+
+    def _entregar(self, payload):
+        try:
+            self._loop.call_soon_threadsafe(self._fila.put_nowait, payload)
+        except RuntimeError:
+            pass   # loop já encerrado: o stream acabou junto
+
+    def put_nowait(self, payload):
+        with self._lock:
+            if self._pendentes >= self._tamanho:
+                raise queue.Full
+            self._pendentes += 1
+        self._entregar(payload)
+
+    def fechar(self):
+        self._fechada = True
+        self._entregar(None)
+
+    async def get(self):
+        payload = await self._fila.get()
+        if self._fechada:
+            return None
+        with self._lock:
+            self._pendentes -= 1
+        return payload
+
+
+class Ouvinte:
+    """Conexão em LISTEN + filas dos assinantes deste processo."""
+
+    def __init__(self, conectar):
+        self._conectar = conectar
+        self._lock = threading.Lock()
+        self._filas = set()
+        self._thread = None
+        self._pid = None
+        self.max_assinantes = _max_assinantes()
+        self.tam_fila = int(os.getenv('EVENTOS_FILA', '1000'))
+        self.conectado = False
+
+    def assinar(self, fila=None):
+        """Fila nova de eventos (ou a fila dada, p.ex. uma FilaAsync), ou None
+        se o processo já está no limite."""
+        with self._lock:
+            if len(self._filas) >= self.max_assinantes:
+                return None
+            # a thread nasce no worker, no primeiro assinante (não no master do preload)
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._escutar, name='eventos-listen', daemon=True)
+                self._thread.start()
+            fila = _Fila(maxsize=self.tam_fila) if fila is None else fila
+            self._filas.add(fila)
+        ASSINANTES.inc()
+        return fila
+
+    def cancelar(self, fila):
+        with self._lock:
+            if fila not in self._filas:
+                return
+            self._filas.discard(fila)
+        ASSINANTES.dec()
+
+    def _distribuir(self, payload):
+        with self._lock:
+            filas = list(self._filas)
+        for fila in filas:
+            try:
+                fila.put_nowait(payload)
+            except queue.Full:
+                # cliente lento: fecha o stream (None); ao reconectar ele sincroniza
+                self.cancelar(fila)
+                DESCARTADOS.inc()
+                fila.fechar()
+
+    def _escutar(self):
+        espera = 1
+        ja_conectou = False
+        while True:
+            conn = None
+            try:
+                conn = self._conectar()
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN {CANAL_EVENTOS}')
+                self.conectado = True
+                if ja_conectou:
+                    self._distribuir(json.dumps({'entidade': '*', 'op': 'recarregar'}))
+                ja_conectou, espera = True, 1
+                ocioso_desde = time.monotonic()
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        if time.monotonic() - ocioso_desde <= 30:
+                            continue
+                        # conexão caída sem FIN só aparece ao usar; o NOTIFY
+                        # que chegar junto fica em conn.notifies, e o select()
+                        # seguinte não acordaria por ele: distribui já
+                        with conn.cursor() as cur:
+                            cur.execute('SELECT 1')
+                    conn.poll()
+                    while conn.notifies:
+                        NOTIFICACOES.inc()
+                        self._distribuir(conn.notifies.pop(0).payload)
+                    ocioso_desde = time.monotonic()
+            except Exception:
+                self.conectado = False
+                log.exception('eventos: escuta caiu; reconectando em %ss', espera)
+                time.sleep(espera)
+                espera = min(espera * 2, 30)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def estatisticas(self):
+        with self._lock:
+            n = len(self._filas)
+        return {'pid': os.getpid(), 'assinantes': n, 'max_assinantes': self.max_assinantes,
+                'conectado': self.conectado}
+
+
+_ouvinte = None
+
+
+def assinar(fila=None):
+    return _ouvinte.assinar(fila)
+
+
+def assinar_async():
+    """FilaAsync nova no event loop corrente, ou None se no limite."""
+    return _ouvinte.assinar(FilaAsync(asyncio.get_running_loop(), _ouvinte.tam_fila))
+
+
+def cancelar(fila):
+    _ouvinte.cancelar(fila)
+
+
+def ler_entidades(bruto):
+    """?entidades=a,b -> set (vazio = todas); ValueError se alguma não existe."""
+    entidades = {e.strip() for e in (bruto or '').split(',') if e.strip()}
+    desconhecidas = entidades - set(ENTIDADES)
+    if desconhecidas:
+        raise ValueError(f'entidade desconhecida: {", ".join(sorted(desconhecidas))}')
+    return entidades
+
+
+def _heartbeat():
+    return float(os.getenv('EVENTOS_HEARTBEAT_S', '15'))
+
+
+ABERTURA = f'retry: {RETRY_MS}\nevent: pronto\ndata: {{}}\n\n'
+BATIMENTO = ': \n\n'
+
+
+def quadro(payload, entidades):
+    """O texto SSE de um evento, ou None se ele não é das entidades pedidas."""
+    if entidades and json.loads(payload).get('entidade') not in entidades | {'*'}:
+        return None
+    return f'data: {payload}\n\n'
+
+
+def stream(fila, entidades=None):
+    """Gerador text/event-stream de uma fila; entidades = set para filtrar."""
+    heartbeat = _heartbeat()
+    try:
+        yield ABERTURA
+        while True:
+            try:
+                payload = fila.get(timeout=heartbeat)
+            except queue.Empty:
+                yield BATIMENTO
+                continue
+            if payload is None:
+                return
+            texto = quadro(payload, entidades)
+            if texto:
+                yield texto
+    finally:
+        _ouvinte.cancelar(fila)
+
+
+async def stream_async(fila, entidades=None):
+    """O mesmo que stream(), para uma FilaAsync."""
+    heartbeat = _heartbeat()
+    try:
+        yield ABERTURA
+        while True:
+            try:
+                payload = await asyncio.wait_for(fila.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield BATIMENTO
+                continue
+            if payload is None:
+                return
+            texto = quadro(payload, entidades)
+            if texto:
+                yield texto
+    finally:
+        _ouvinte.cancelar(fila)
+
+
+def estatisticas():
+    return _ouvinte.estatisticas()
+
+
+def init_app(app):
+    global _ouvinte
+    from database import db
+    with app.app_context():
+        engine = db.engine
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    # aparece em pg_stat_activity separada das conexões do pool
+    cparams.setdefault('application_name', os.getenv('DB_APPLICATION_NAME', 'cgsol-backend') + '-eventos')
+
+    def conectar():
+        return engine.dialect.loaded_dbapi.connect(*cargs, **cparams)
+
+    _ouvinte = Ouvinte(conectar)
+
+
+def servir_nativo():
+    """Chamado pelo asgi.py: os streams deste processo são corrotinas, não
+    threads, e o limite padrão passa a ser o do asgi (ver _max_assinantes)."""
+    _ouvinte.max_assinantes = _max_assinantes(nativo=True)
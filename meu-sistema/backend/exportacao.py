@@ -0,0 +1,154 @@
+"""Exportação em streaming (NDJSON / CSV) de todas as entidades.
+
+As consultas usam yield_per, que no psycopg2 vira cursor do lado do servidor:
+as linhas chegam do Postgres em lotes e são escritas na resposta conforme
+chegam, então a memória do worker não cresce com o tamanho da tabela.
+
+Para embutir filhos (andamentos do projeto, observações do chamado) não há
+uma query por pai: pais e filhos são lidos em dois cursores ordenados pela
+mesma chave e casados em merge.
+"""
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy.orm import lazyload
+from sqlalchemy.orm.attributes import set_committed_value
+
+import serializacao
+from database import db, Projeto, ProjetoMembro, Andamento, PDTIAction, SustentacaoChamado, SustentacaoObservacao
+
+LOTE = 1000              # linhas por fetch do cursor
+TAM_CHUNK = 64 * 1024    # bytes acumulados antes de mandar um pedaço da resposta
+
+
+def _stream(stmt):
+    # lazyload('*'): nada de eager join (ex.: backref chamado da observação)
+    stmt = stmt.options(lazyload('*')).execution_options(yield_per=LOTE)
+    return db.session.execute(stmt).scalars()
+
+
+def _merge_filhos(pais, filhos, chave_pai, chave_filho):
+    """Gera (pai, [filhos]) para dois iteráveis ordenados pela mesma chave."""
+    filhos = iter(filhos)
+    atual = next(filhos, None)
+    for pai in pais:
+        k = chave_pai(pai)
+        # filhos sem pai (chave menor) são descartados
+        while atual is not None and chave_filho(atual) < k:
+            atual = next(filhos, None)
+        grupo = []
+        while atual is not None and chave_filho(atual) == k:
+            grupo.append(atual)
+            atual = next(filhos, None)
+        yield pai, grupo
+
+
+# Ordenação por bytes (COLLATE "C") para que a comparação de strings do Python
+# no merge bata com a ordem do banco.
+def _numero_c(col):
+    return col.collate('C')
+
+
+def _projetos(incluir_filhos):
+    # a equipe (projeto_membros) também vem casada em merge, não pelo selectin
+    projetos = _stream(db.select(Projeto).order_by(Projeto.id))
+    membros = _stream(db.select(ProjetoMembro).order_by(ProjetoMembro.projeto_id, ProjetoMembro.ordem))
+    pais = _com_equipe(projetos, membros)
+    if not incluir_filhos:
+        for p in pais:
+            yield p.to_dict()
+        return
+    filhos = _stream(db.select(Andamento)
+                     .where(Andamento.projeto_id.isnot(None))
+                     .order_by(Andamento.projeto_id, Andamento.data.desc(), Andamento.id.desc()))
+    for p, ands in _merge_filhos(pais, filhos, lambda p: p.id, lambda a: a.projeto_id):
+        d = p.to_dict()
+        d['andamentos'] = [a.to_dict() for a in ands]
+        yield d
+
+
+def _com_equipe(projetos, membros):
+    for p, grupo in _merge_filhos(projetos, membros, lambda p: p.id, lambda m: m.projeto_id):
+        set_committed_value(p, 'membros', grupo)
+        yield p
+
+
+def _sustentacao(incluir_filhos):
+    pais = _stream(db.select(SustentacaoChamado)
+                   .order_by(_numero_c(SustentacaoChamado.numero_chamado)))
+    if not incluir_filhos:
+        for c in pais:
+            yield c.to_dict()
+        return
+    filhos = _stream(db.select(SustentacaoObservacao)
+                     .order_by(_numero_c(SustentacaoObservacao.numero_chamado),
+                               SustentacaoObservacao.criado_em.desc(), SustentacaoObservacao.id.desc()))
+    for c, obs in _merge_filhos(pais, filhos, lambda c: c.numero_chamado, lambda o: o.numero_chamado):
+        d = c.to_dict()
+        d['observacoes'] = [o.to_dict() for o in obs]
+        yield d
+
+
+def _simples(modelo, *ordem):
+    def gerar(_incluir_filhos):
+        for r in _stream(db.select(modelo).order_by(*ordem)):
+            yield r.to_dict()
+    return gerar
+
+
+ENTIDADES = {
+    # entidade: (gerador, nome do filho embutido no NDJSON)
+    'projetos':    (_projetos, 'andamentos'),
+    'andamentos':  (_simples(Andamento, Andamento.projeto_id, Andamento.id), None),
+    'sustentacao': (_sustentacao, 'observacoes'),
+    'observacoes': (_simples(SustentacaoObservacao, SustentacaoObservacao.id), None),
+    'pdti':        (_simples(PDTIAction, PDTIAction.id), None),
+}
+
+# CSV é plano: mesmas colunas do to_dict() de cada modelo, sem filhos
+COLUNAS_CSV = {
+    'projetos': list(Projeto().to_dict()),
+    'andamentos': list(Andamento().to_dict()),
+    'sustentacao': list(SustentacaoChamado().to_dict()),
+    'observacoes': list(SustentacaoObservacao().to_dict()),
+    'pdti': list(PDTIAction().to_dict()),
+}
+
+
+def _em_chunks(pedacos):
+    """Junta strings pequenas em blocos de ~TAM_CHUNK antes de enviar."""
+    buf, tam = [], 0
+    for p in pedacos:
+        buf.append(p)
+        tam += len(p)
+        if tam >= TAM_CHUNK:
+            yield ''.join(buf)
+            buf, tam = [], 0
+    if buf:
+        yield ''.join(buf)
+
+
+def gerar_ndjson(entidade, incluir_filhos=False):
+    gerador = ENTIDADES[entidade][0]
+    return _em_chunks(serializacao.linha_ndjson(d) for d in gerador(incluir_filhos))
+
+
+def gerar_csv(entidade):
+    gerador = ENTIDADES[entidade][0]
+    colunas = COLUNAS_CSV[entidade]
+
+    def linhas():
+        out = io.StringIO()
+        w = csv.DictWriter(out, fieldnames=colunas, extrasaction='ignore')
+        w.writeheader()
+        for d in gerador(False):
+            # to_dict devolve datas como objetos; str(datetime) usaria espaço no lugar do 'T'
+            w.writerow({k: v.isoformat() if isinstance(v, datetime) else v for k, v in d.items()})
+            if out.tell() >= TAM_CHUNK:
+                yield out.getvalue()
+                out.seek(0)
+                out.truncate()
+        yield out.getvalue()
+
+    return linhas()
@@ -0,0 +1,70 @@
+# Configuração do gunicorn (produção). Tudo ajustável por variável de ambiente.
+#
+#   WEB_CONCURRENCY        nº de processos (padrão: 2 x CPUs + 1)
+#   GUNICORN_WORKER_CLASS  gthread (padrão) ou gevent (precisa de gevent + psycogreen)
+#                          ou uvicorn.workers.UvicornWorker com asgi:app (ver asgi.py;
+#                          é o que a imagem do Dockerfile usa)
+#   GUNICORN_APP           módulo:app (padrão: asgi:app com o worker uvicorn, senão
+#                          wsgi:app); um app na linha de comando tem precedência
+#   GUNICORN_THREADS       threads por processo no gthread (padrão: 4)
+#   GUNICORN_TIMEOUT       segundos sem resposta do worker antes de reciclar (padrão: 60)
+#   GUNICORN_KEEPALIVE     segundos de keep-alive HTTP (padrão: 5)
+#   GUNICORN_MAX_REQUESTS  recicla o worker após N requisições (padrão: 1000; 0 desliga)
+#   GUNICORN_PRELOAD       carrega o app no master antes do fork (padrão: 1)
+#   PORT                   porta (padrão: 5001, a mesma do modo dev)
+#   PROMETHEUS_MULTIPROC_DIR diretório das métricas compartilhadas entre workers
+import glob
+import multiprocessing
+import os
+
+
+def _env_int(nome, padrao):
+    return int(os.getenv(nome, padrao))
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+workers = _env_int('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = _env_int('GUNICORN_THREADS', 4)
+wsgi_app = os.getenv('GUNICORN_APP') or ('asgi:app' if 'uvicorn' in worker_class.lower() else 'wsgi:app')
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)   # só gevent
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+preload_app = os.getenv('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes', 'sim')
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def on_starting(server):
+    # arquivos de métricas de uma execução anterior somariam contadores velhos
+    pasta = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+        for f in glob.glob(os.path.join(pasta, '*.db')):
+            os.remove(f)
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # psycopg2 é C puro: sem isso cada query bloqueia o worker gevent inteiro
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+    # Com preload_app o engine foi criado no master; conexões do pool não
+    # podem ser compartilhadas entre processos. close=False: só esquece as
+    # conexões herdadas, sem fechar as do pai.
+    from app import app
+    from database import db
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,400 @@
+"""Importação em lote (CSV / NDJSON) de chamados de sustentação e projetos.
+
+Fluxo: cada registro é validado em Python com os mesmos parsers das rotas;
+as linhas válidas vão para um CSV temporário que é carregado com COPY numa
+tabela de staging (temporária, some no commit) e dali um único
+INSERT ... ON CONFLICT faz o upsert. Linhas inválidas não param a carga:
+voltam no relatório com o número da linha e o motivo.
+
+Pessoas e tipos novos não são gravados durante a validação: ganham um id
+provisório (negativo) e só os usados por linhas válidas são cadastrados,
+num INSERT só por domínio, dentro da transação da carga (ver _Dominios).
+"""
+import csv
+import io
+import json
+import tempfile
+
+from database import (db, bucket_status, bump_versoes, cadastrar_dominio, normalizar_dominio,
+                      validar_nome_novo, DOMINIOS, _cache, _recarregar_dominio)
+from utils import _parse_date, _parse_datetime, _parse_bool
+
+MAX_REJEICOES_NO_RELATORIO = 1000
+
+
+class ErroImportacao(Exception):
+    pass
+
+
+# ====== Leitura ======
+def ler_registros(texto, formato):
+    """Gera (numero_da_linha, dict) a partir de um arquivo texto aberto.
+
+    Arquivo em outra codificação ou CSV malformado vira ErroImportacao (o
+    erro aparece no meio da iteração, fora da validação de cada linha).
+    """
+    if formato not in ('csv', 'ndjson'):
+        raise ErroImportacao(f"formato não suportado: {formato}")
+    n = 0
+    try:
+        for n, reg in (_ler_ndjson(texto) if formato == 'ndjson' else _ler_csv(texto)):
+            yield n, reg
+    except UnicodeDecodeError as e:
+        raise ErroImportacao(f"arquivo não está em {getattr(texto, 'encoding', 'utf-8')} "
+                             f"(depois da linha {n}): {e}; informe a codificação, "
+                             f"ex.: ?encoding=cp1252") from e
+    except csv.Error as e:
+        raise ErroImportacao(f"CSV inválido depois da linha {n}: {e}") from e
+
+
+def _ler_ndjson(texto):
+    for n, linha in enumerate(texto, start=1):
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            reg = json.loads(linha)
+        except ValueError as e:
+            yield n, e
+            continue
+        yield n, reg if isinstance(reg, dict) else ValueError('registro não é um objeto JSON')
+
+
+def _ler_csv(texto):
+    # export do service desk costuma vir com ';' — detecta pelo cabeçalho
+    amostra = texto.read(4096)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.DictReader(_concat(amostra, texto), dialect=dialeto)
+    for n, reg in enumerate(leitor, start=2):   # linha 1 = cabeçalho
+        yield n, {k.strip(): (v if v != '' else None) for k, v in reg.items() if k}
+
+
+def _concat(amostra, resto):
+    yield from io.StringIO(amostra)
+    yield from resto
+
+
+# ====== Domínios (pessoa, tipo, coordenação, status) ======
+class _Dominios:
+    """Ids de domínio de uma importação, sem gravar nada durante a validação.
+
+    Valor desconhecido de domínio aberto vira um id provisório negativo; os
+    provisórios das linhas aceitas (confirmar) são cadastrados de uma vez em
+    cadastrar(), e os das rejeitadas (descartar) nunca chegam ao banco. O
+    cache de domínios é relido no máximo uma vez por domínio na validação.
+    """
+
+    def __init__(self):
+        self._relidos = set()
+        self._provisorios = {}   # (dominio, chave) -> (id provisório, nome)
+        self._da_linha = set()
+        self.novos = {}          # dominio -> {chave: nome}, só das linhas aceitas
+
+    def id(self, dominio, valor):
+        nome, k = normalizar_dominio(dominio, valor)
+        id_ = _cache(dominio)[0].get(k)
+        if id_ is None and dominio not in self._relidos:
+            self._relidos.add(dominio)   # cadastrado por outro processo desde a última leitura
+            id_ = _recarregar_dominio(dominio)[0].get(k)
+        if id_ is not None:
+            return id_
+        validar_nome_novo(dominio, valor, nome)
+        if (dominio, k) not in self._provisorios:
+            self._provisorios[dominio, k] = (-len(self._provisorios) - 1, nome)
+        self._da_linha.add((dominio, k))
+        return self._provisorios[dominio, k][0]
+
+    def confirmar(self):
+        for dominio, k in self._da_linha:
+            self.novos.setdefault(dominio, {})[k] = self._provisorios[dominio, k][1]
+        self._da_linha.clear()
+
+    def descartar(self):
+        self._da_linha.clear()
+
+    def cadastrar(self, conn, cur, referencias, extras):
+        """Cadastra os novos e troca os provisórios na stg_importacao pelos
+        ids definitivos. referencias = {coluna da staging: dominio}."""
+        mapa = []   # (dominio, provisório, id)
+        for dominio, nomes in self.novos.items():
+            ids = cadastrar_dominio(conn, dominio, nomes)
+            if len(ids) < len(nomes):
+                raise ErroImportacao(f"não consegui cadastrar {dominio}: "
+                                     f"{', '.join(n for k, n in nomes.items() if k not in ids)}")
+            mapa += [(dominio, self._provisorios[dominio, k][0], id_) for k, id_ in ids.items()]
+        cur.execute("CREATE TEMP TABLE stg_dominios (dominio text, provisorio int, id int) ON COMMIT DROP")
+        cur.execute("INSERT INTO stg_dominios SELECT * FROM unnest(%s::text[], %s::int[], %s::int[])",
+                    tuple(map(list, zip(*mapa))))
+        for coluna, dominio in referencias.items():
+            if extras.get(coluna, '').endswith('[]'):   # int[]: troca elemento a elemento, na ordem
+                cur.execute(f"""
+                    UPDATE stg_importacao s SET {coluna} = ARRAY(
+                        SELECT coalesce(m.id, e.v)
+                          FROM unnest(s.{coluna}) WITH ORDINALITY AS e(v, o)
+                          LEFT JOIN stg_dominios m ON m.dominio = %s AND m.provisorio = e.v
+                         ORDER BY e.o)
+                     WHERE EXISTS (SELECT 1 FROM unnest(s.{coluna}) AS v WHERE v < 0)
+                """, (dominio,))
+            else:
+                cur.execute(f"""
+                    UPDATE stg_importacao s SET {coluna} = m.id
+                      FROM stg_dominios m
+                     WHERE m.dominio = %s AND s.{coluna} = m.provisorio
+                """, (dominio,))
+        return [DOMINIOS[d].__tablename__ for d in self.novos]
+
+    def recarregar(self):
+        """Depois do commit: o cache passa a conhecer os cadastrados."""
+        for dominio in self.novos:
+            _recarregar_dominio(dominio)
+
+
+# ====== Validação ======
+def _texto(reg, campo, max_len=None, obrigatorio=False):
+    v = reg.get(campo)
+    v = None if v is None else str(v).strip()
+    if not v:
+        if obrigatorio:
+            raise ValueError(f"{campo} é obrigatório")
+        return None
+    if max_len and len(v) > max_len:
+        raise ValueError(f"{campo} excede {max_len} caracteres")
+    return v
+
+
+def _data(reg, campo, parser):
+    v = reg.get(campo)
+    if v in (None, ''):
+        return None
+    d = parser(str(v))
+    if d is None:
+        raise ValueError(f"{campo} inválido: {v!r}")
+    return d
+
+
+def _numero(reg, campo, tipo):
+    v = reg.get(campo)
+    if v in (None, ''):
+        return None
+    try:
+        return tipo(v)
+    except (TypeError, ValueError):
+        raise ValueError(f"{campo} inválido: {v!r}")
+
+
+def _pessoa(reg, campo, dominios):
+    """Id da pessoa (provisório se nova), ou None se o campo veio vazio."""
+    v = _texto(reg, campo)
+    return dominios.id('pessoa', v) if v else None
+
+
+def _equipe(reg, dominios):
+    """Literal de array do Postgres com os ids da equipe ("a, b, c"), sem repetidos."""
+    ids = []
+    for nome in str(reg.get('equipe') or '').split(','):
+        if nome.strip():
+            id_ = dominios.id('pessoa', nome)
+            if id_ not in ids:
+                ids.append(id_)
+    return '{' + ','.join(map(str, ids)) + '}'
+
+
+COLUNAS_CHAMADO = ('numero_chamado', 'projeto', 'desenvolvedor_id', 'data_chamado', 'descricao',
+                   'solicitante', 'status', 'observacao', 'status_bucket')
+REFERENCIAS_CHAMADO = {'desenvolvedor_id': 'pessoa'}
+
+
+def validar_chamado(reg, dominios):
+    status = _texto(reg, 'status', 50)
+    return (
+        _texto(reg, 'numero_chamado', 50, obrigatorio=True),
+        _texto(reg, 'projeto', 100, obrigatorio=True),
+        _pessoa(reg, 'desenvolvedor', dominios),
+        _data(reg, 'data_chamado', _parse_datetime),
+        _texto(reg, 'descricao'),
+        _texto(reg, 'solicitante', 150),
+        status,
+        _texto(reg, 'observacao'),
+        bucket_status(status),
+    )
+
+
+COLUNAS_PROJETO = ('id', 'nome', 'tipo_id', 'coordenacao_id', 'status_id', 'descricao', 'inicio', 'fim',
+                   'prioridade', 'progresso', '"totalSprints"', '"sprintsConcluidas"', 'responsavel_id',
+                   'orcamento', 'rag', 'riscos', 'qualidade', 'internalizacao')
+# só na staging: ids das pessoas da equipe, na ordem (vira projeto_membros)
+EXTRAS_PROJETO = {'equipe': 'int[]'}
+REFERENCIAS_PROJETO = {'tipo_id': 'tipo', 'responsavel_id': 'pessoa', 'equipe': 'pessoa'}
+
+
+def validar_projeto(reg, dominios):
+    return (
+        _numero(reg, 'id', int),
+        _texto(reg, 'nome', 255, obrigatorio=True),
+        # canonizados como no POST /api/projetos (tipo novo é cadastrado)
+        dominios.id('tipo', reg.get('tipo')),
+        dominios.id('coordenacao', reg.get('coordenacao')),
+        dominios.id('status', reg.get('status')),
+        _texto(reg, 'descricao'),
+        _data(reg, 'inicio', _parse_date),
+        _data(reg, 'fim', _parse_date),
+        _texto(reg, 'prioridade', 50),
+        _numero(reg, 'progresso', int),
+        _numero(reg, 'totalSprints', int),
+        _numero(reg, 'sprintsConcluidas', int),
+        _pessoa(reg, 'responsavel', dominios),
+        _numero(reg, 'orcamento', float),
+        _texto(reg, 'rag', 20),
+        _texto(reg, 'riscos'),
+        _numero(reg, 'qualidade', int),
+        _parse_bool(reg.get('internalizacao', False)),
+        _equipe(reg, dominios),
+    )
+
+
+# ====== Carga ======
+def _upsert_chamados(cur):
+    cols = ', '.join(COLUNAS_CHAMADO)
+    atualiza = ', '.join(f"{c} = EXCLUDED.{c}" for c in COLUNAS_CHAMADO if c != 'numero_chamado')
+    # DISTINCT ON: se o arquivo repete um chamado, vale a última linha
+    cur.execute(f"""
+        INSERT INTO sustentacao_chamados ({cols}, criado_em, atualizado_em)
+        SELECT DISTINCT ON (numero_chamado) {cols}, now(), now()
+          FROM stg_importacao
+         ORDER BY numero_chamado, linha DESC
+        ON CONFLICT (numero_chamado) DO UPDATE
+           SET {atualiza}, atualizado_em = now()
+        RETURNING (xmax = 0)
+    """)
+    return [r[0] for r in cur.fetchall()]
+
+
+def _upsert_projetos(cur):
+    cols = ', '.join(COLUNAS_PROJETO)
+    atualiza = ', '.join(f"{c} = EXCLUDED.{c}" for c in COLUNAS_PROJETO if c != 'id')
+    cur.execute(f"""
+        INSERT INTO projetos ({cols})
+        SELECT DISTINCT ON (id) {cols}
+          FROM stg_importacao
+         WHERE id IS NOT NULL
+         ORDER BY id, linha DESC
+        ON CONFLICT (id) DO UPDATE SET {atualiza}, atualizado_em = now()
+        RETURNING (xmax = 0)
+    """)
+    resultado = [r[0] for r in cur.fetchall()]
+    # ids explícitos não avançam a sequence; evita colisão com as linhas sem id
+    # (logo abaixo) e com os próximos POSTs
+    cur.execute("""
+        SELECT setval(pg_get_serial_sequence('projetos', 'id'),
+                      COALESCE((SELECT max(id) FROM projetos), 0) + 1, false)
+    """)
+    # linhas sem id: o id novo sai da sequence já na staging, na ordem do
+    # arquivo, para a equipe abaixo saber a que projeto pertence
+    cur.execute("""
+        UPDATE stg_importacao s SET id = n.id
+          FROM (SELECT linha, nextval(pg_get_serial_sequence('projetos', 'id')) AS id
+                  FROM stg_importacao WHERE id IS NULL ORDER BY linha) n
+         WHERE s.linha = n.linha
+        RETURNING s.linha
+    """)
+    novos = [r[0] for r in cur.fetchall()]
+    if novos:
+        cur.execute(f"""
+            INSERT INTO projetos ({cols})
+            SELECT {cols} FROM stg_importacao WHERE linha = ANY(%s) ORDER BY linha
+        """, (novos,))
+        resultado += [True] * len(novos)
+    # equipe: a da última linha de cada projeto substitui a atual
+    cur.execute("""
+        DELETE FROM projeto_membros WHERE projeto_id IN (SELECT id FROM stg_importacao)
+    """)
+    cur.execute("""
+        INSERT INTO projeto_membros (projeto_id, pessoa_id, ordem)
+        SELECT s.id, e.pessoa_id, e.ordem - 1
+          FROM (SELECT DISTINCT ON (id) id, equipe FROM stg_importacao ORDER BY id, linha DESC) s
+         CROSS JOIN LATERAL unnest(s.equipe) WITH ORDINALITY AS e(pessoa_id, ordem)
+    """)
+    return resultado
+
+
+ENTIDADES = {
+    # entidade: (tabelas alteradas, colunas, colunas extras da staging,
+    #            colunas que são ids de domínio, validar, upsert)
+    'sustentacao': (('sustentacao_chamados',), COLUNAS_CHAMADO, {}, REFERENCIAS_CHAMADO,
+                    validar_chamado, _upsert_chamados),
+    'projetos':    (('projetos', 'projeto_membros'), COLUNAS_PROJETO, EXTRAS_PROJETO, REFERENCIAS_PROJETO,
+                    validar_projeto, _upsert_projetos),
+}
+
+
+def importar(entidade, registros):
+    """Valida e carrega os registros. Devolve o relatório da importação.
+
+    registros: iterável de (numero_da_linha, dict | Exception).
+    """
+    if entidade not in ENTIDADES:
+        raise ErroImportacao(f"entidade desconhecida: {entidade}")
+    tabelas, colunas, extras, referencias, validar, upsert = ENTIDADES[entidade]
+    dominios = _Dominios()
+
+    recebidos = 0
+    rejeicoes = []
+    total_rejeitados = 0
+    # até 8 MB em memória, depois vai para disco
+    buf = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024, mode='w+', newline='')
+    w = csv.writer(buf)
+    validos = 0
+    for n, reg in registros:
+        recebidos += 1
+        try:
+            if isinstance(reg, Exception):
+                raise reg
+            valores = validar(reg, dominios)
+        except ValueError as e:
+            dominios.descartar()
+            total_rejeitados += 1
+            if len(rejeicoes) < MAX_REJEICOES_NO_RELATORIO:
+                rejeicoes.append({'linha': n, 'erro': str(e)})
+            continue
+        dominios.confirmar()
+        w.writerow([n] + ['t' if v is True else 'f' if v is False else v for v in valores])
+        validos += 1
+    buf.seek(0)
+
+    inseridos = atualizados = 0
+    if validos:
+        conn = db.session.connection()
+        cur = conn.connection.cursor()
+        try:
+            extras_sql = ''.join(f", NULL::{tipo} AS {nome}" for nome, tipo in extras.items())
+            cur.execute(f"""
+                CREATE TEMP TABLE stg_importacao ON COMMIT DROP AS
+                SELECT 0::int AS linha, {', '.join(colunas)}{extras_sql} FROM {tabelas[0]} WITH NO DATA
+            """)
+            todas = ', '.join([*colunas, *extras])
+            cur.copy_expert(f"COPY stg_importacao (linha, {todas}) FROM STDIN WITH (FORMAT csv)", buf)
+            tabelas_dominio = dominios.cadastrar(conn, cur, referencias, extras) if dominios.novos else []
+            resultado = upsert(cur)
+            inseridos = sum(1 for novo in resultado if novo)
+            atualizados = len(resultado) - inseridos
+            bump_versoes(conn, [*tabelas, *tabelas_dominio])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise ErroImportacao(f"falha na carga: {e}") from e
+        finally:
+            cur.close()
+            buf.close()
+        dominios.recarregar()
+
+    return {
+        'entidade': entidade,
+        'recebidos': recebidos,
+        'inseridos': inseridos,
+        'atualizados': atualizados,
+        'rejeitados': total_rejeitados,
+        'rejeicoes': rejeicoes,
+    }
@@ -0,0 +1,140 @@
+# Instrumentação de SQL por requisição (substitui o SQLALCHEMY_ECHO).
+#
+# Em vez de imprimir todo statement, cada requisição acumula:
+#   - quantas queries rodou e o tempo total no banco;
+#   - a query mais lenta;
+#   - quantas vezes cada statement se repetiu (N+1: o mesmo SELECT rodando
+#     uma vez por linha, típico de relationship lazy acessado num loop).
+# A resposta sai com Server-Timing (aparece no DevTools do navegador) e
+# queries acima de SQL_LENTO_MS vão para o log "cgsol.sql_lento" em JSON.
+#
+#   SQL_LENTO_MS           limiar do slow-query log em ms (padrão 200)
+#   SQL_LENTO_PARAMS       1 = inclui os parâmetros no log (padrão 0: podem ter dados pessoais)
+#   SQL_N_MAIS_1_LIMIAR    repetições do mesmo SELECT que disparam o aviso de N+1 (padrão 5)
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LENTO_MS = float(os.getenv('SQL_LENTO_MS', '200'))
+LENTO_PARAMS = os.getenv('SQL_LENTO_PARAMS', '0').lower() in ('1', 'true', 'sim')
+N_MAIS_1_LIMIAR = int(os.getenv('SQL_N_MAIS_1_LIMIAR', '5'))
+MAX_SQL_NO_LOG = 1000
+
+log_lento = logging.getLogger('cgsol.sql_lento')
+log_sql = logging.getLogger('cgsol.sql')
+
+
+class _Resumo:
+    __slots__ = ('n', 'total_s', 'mais_lenta_s', 'mais_lenta_sql', 'repeticoes')
+
+    def __init__(self):
+        self.n = 0
+        self.total_s = 0.0
+        self.mais_lenta_s = 0.0
+        self.mais_lenta_sql = None
+        self.repeticoes = Counter()
+
+
+def resumo():
+    """Resumo de SQL da requisição atual (ou None fora de requisição)."""
+    if has_request_context():
+        return g.get('_sql_resumo')
+    return None
+
+
+def _endpoint():
+    if not has_request_context():
+        return None
+    return request.url_rule.rule if request.url_rule else request.path
+
+
+# O início vai no contexto de execução, que morre com o statement: se ele
+# falhar (sem after_cursor_execute) não sobra nada na conexão do pool.
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._sql_t0 = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    t0 = getattr(context, '_sql_t0', None)
+    if t0 is None:
+        return
+    dt = time.perf_counter() - t0
+
+    r = resumo()
+    if r is not None:
+        r.n += 1
+        r.total_s += dt
+        if dt > r.mais_lenta_s:
+            r.mais_lenta_s, r.mais_lenta_sql = dt, statement
+        if statement.lstrip()[:6].upper() == 'SELECT':
+            r.repeticoes[statement] += 1
+
+    if dt * 1000 >= LENTO_MS:
+        registro = {
+            'evento': 'sql_lento',
+            'duracao_ms': round(dt * 1000, 2),
+            'endpoint': _endpoint(),
+            'metodo': request.method if has_request_context() else None,
+            'sql': statement[:MAX_SQL_NO_LOG],
+            'executemany': executemany,
+        }
+        if LENTO_PARAMS:
+            registro['parametros'] = repr(parameters)[:MAX_SQL_NO_LOG]
+        log_lento.warning(json.dumps(registro, ensure_ascii=False))
+
+
+def _inicio():
+    g._sql_resumo = _Resumo()
+    g._sql_t0 = time.perf_counter()
+
+
+def _fim(resp):
+    r = g.pop('_sql_resumo', None)
+    t0 = g.pop('_sql_t0', None)
+    if r is None:
+        return resp
+
+    total_ms = (time.perf_counter() - t0) * 1000
+    resp.headers.add(
+        'Server-Timing',
+        f'db;dur={r.total_s * 1000:.1f};desc="{r.n} queries", '
+        f'db-max;dur={r.mais_lenta_s * 1000:.1f};desc="query mais lenta", '
+        f'app;dur={total_ms:.1f}')
+
+    for sql, vezes in r.repeticoes.items():
+        if vezes >= N_MAIS_1_LIMIAR:
+            log_sql.warning(json.dumps({
+                'evento': 'n_mais_1_suspeito',
+                'endpoint': _endpoint(),
+                'metodo': request.method,
+                'repeticoes': vezes,
+                'sql': sql[:MAX_SQL_NO_LOG],
+            }, ensure_ascii=False))
+    return resp
+
+
+def _configurar_logs():
+    # saída em JSON, uma linha por evento, no stderr (o gunicorn repassa)
+    for lg in (log_lento, log_sql):
+        if not lg.handlers:
+            h = logging.StreamHandler(sys.stderr)
+            h.setFormatter(logging.Formatter('%(message)s'))
+            lg.addHandler(h)
+            lg.setLevel(logging.INFO)
+            lg.propagate = False
+
+
+def init_app(app):
+    _configurar_logs()
+    app.before_request(_inicio)
+    app.after_request(_fim)
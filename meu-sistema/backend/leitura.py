@@ -0,0 +1,167 @@
+# Leitura das listagens sem hidratar objetos do ORM.
+#
+# Query.all() numa entidade cria uma instância por linha, registra no
+# identity map e o to_dict() copia cada atributo de novo. As listagens não
+# alteram nada: basta pedir só as colunas (with_entities) e montar o dict
+# direto da tupla. O resultado é o mesmo dict do to_dict() — mesmas chaves,
+# mesma ordem, mesmos tipos —, então o JSON sai byte a byte igual.
+#
+# Ao mudar um to_dict() em database.py, mude a Leitura correspondente aqui
+# (python -m bench.leitura compara os dois caminhos e acusa diferença).
+from functools import partial
+
+from sqlalchemy import Select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import aliased
+
+from database import (db, Projeto, ProjetoMembro, Pessoa, Andamento, PDTIAction,
+                      SustentacaoChamado, SustentacaoObservacao, nome_dominio)
+
+
+class Leitura:
+    """Colunas de uma listagem e a montagem do dict de cada linha.
+
+    campos: [(chave no JSON, coluna, conversor ou None)], na ordem do to_dict.
+    extras: colunas lidas só para ordenação/cursor (não entram no JSON).
+    """
+
+    def __init__(self, campos, extras=()):
+        self.chaves = tuple(chave for chave, _, _ in campos)
+        colunas = [col for _, col, _ in campos]
+        self.colunas = colunas + [c for c in extras if not any(c is col for col in colunas)]
+        self._convertidos = tuple((chave, i, conv) for i, (chave, _, conv) in enumerate(campos) if conv)
+
+    def consulta(self, q):
+        """A query (filtrada ou não) devolvendo só as colunas desta leitura.
+        Aceita também um select() (asgi.py)."""
+        if isinstance(q, Select):
+            return q.with_only_columns(*self.colunas)
+        return q.with_entities(*self.colunas)
+
+    def select(self):
+        """O mesmo como select() do SQLAlchemy 2.0 (sessão async do asgi.py)."""
+        return db.select(*self.colunas)
+
+    def montar(self, linha):
+        d = dict(zip(self.chaves, linha))   # os extras, no fim da linha, ficam de fora
+        for chave, i, conv in self._convertidos:
+            d[chave] = conv(linha[i])
+        return d
+
+
+# equipe: nomes na ordem de projeto_membros, como Projeto.equipe (None se vazia)
+_equipe = db.select(
+    db.func.string_agg(Pessoa.nome, aggregate_order_by(db.literal_column("', '"), ProjetoMembro.ordem))
+).join_from(ProjetoMembro, Pessoa, ProjetoMembro.pessoa_id == Pessoa.id) \
+    .where(ProjetoMembro.projeto_id == Projeto.id) \
+    .scalar_subquery().label('equipe')
+
+PROJETOS = Leitura([
+    ('id', Projeto.id, None),
+    ('nome', Projeto.nome, None),
+    ('tipo', Projeto.tipo_id, partial(nome_dominio, 'tipo')),
+    ('coordenacao', Projeto.coordenacao_id, partial(nome_dominio, 'coordenacao')),
+    ('status', Projeto.status_id, partial(nome_dominio, 'status')),
+    ('descricao', Projeto.descricao, None),
+    ('inicio', Projeto.inicio, None),
+    ('fim', Projeto.fim, None),
+    ('prioridade', Projeto.prioridade, None),
+    ('progresso', Projeto.progresso, None),
+    ('totalSprints', Projeto.totalSprints, None),
+    ('sprintsConcluidas', Projeto.sprintsConcluidas, None),
+    ('responsavel', Projeto.responsavel_id, partial(nome_dominio, 'pessoa')),
+    ('orcamento', Projeto.orcamento, None),
+    ('equipe', _equipe, None),
+    ('rag', Projeto.rag, None),
+    ('riscos', Projeto.riscos, None),
+    ('qualidade', Projeto.qualidade, None),
+    ('internalizacao', Projeto.internalizacao, None),
+], extras=(Projeto.atualizado_em,))
+
+ANDAMENTOS = Leitura([
+    ('id', Andamento.id, None),
+    ('projeto_id', Andamento.projeto_id, None),
+    ('data', Andamento.data, None),
+    ('descricao', Andamento.descricao, None),
+], extras=(Andamento.atualizado_em,))
+
+PDTI = Leitura([
+    ('id', PDTIAction.id, None),
+    ('descricao', PDTIAction.descricao, None),
+    ('situacao', PDTIAction.situacao, None),
+    ('tipo', PDTIAction.tipo, None),
+    ('data_conclusao', PDTIAction.data_conclusao, None),
+], extras=(PDTIAction.atualizado_em,))
+
+CHAMADOS = Leitura([
+    ('numero_chamado', SustentacaoChamado.numero_chamado, None),
+    ('projeto', SustentacaoChamado.projeto, None),
+    ('desenvolvedor', SustentacaoChamado.desenvolvedor_id, partial(nome_dominio, 'pessoa')),
+    ('data_chamado', SustentacaoChamado.data_chamado, None),
+    ('descricao', SustentacaoChamado.descricao, None),
+    ('solicitante', SustentacaoChamado.solicitante, None),
+    ('status', SustentacaoChamado.status, None),
+    ('observacao', SustentacaoChamado.observacao, None),
+], extras=(SustentacaoChamado.id, SustentacaoChamado.atualizado_em))
+
+OBSERVACOES = Leitura([
+    ('id', SustentacaoObservacao.id, None),
+    ('numero_chamado', SustentacaoObservacao.numero_chamado, None),
+    ('texto', SustentacaoObservacao.texto, None),
+    ('created_at', SustentacaoObservacao.criado_em, None),
+])
+
+
+# ?incluir=observacoes em /api/sustentacao: total e última observação de cada
+# chamado num LEFT JOIN LATERAL, em vez de um GET .../observacoes por linha
+# da tabela. O LIMIT da página fica acima do nested loop, então o lateral só
+# roda para as linhas devolvidas; count(*) OVER () conta antes do LIMIT 1.
+_obs = aliased(SustentacaoObservacao)
+_ultima_obs = db.select(_obs.id, _obs.texto, _obs.criado_em, db.func.count().over().label('total')) \
+    .where(_obs.numero_chamado == SustentacaoChamado.numero_chamado) \
+    .order_by(_obs.criado_em.desc(), _obs.id.desc()).limit(1) \
+    .lateral('ultima_obs')
+
+
+def com_observacoes(q):
+    """A consulta de CHAMADOS (Query ou select) com as colunas do resumo."""
+    return q.outerjoin(_ultima_obs, db.true()).add_columns(
+        _ultima_obs.c.total.label('obs_total'), _ultima_obs.c.id.label('obs_id'),
+        _ultima_obs.c.texto.label('obs_texto'), _ultima_obs.c.criado_em.label('obs_criado_em'))
+
+
+def montar_com_observacoes(linha):
+    d = CHAMADOS.montar(linha)
+    d['observacoes_total'] = linha.obs_total or 0
+    d['ultima_observacao'] = None if linha.obs_id is None else {
+        'id': linha.obs_id, 'texto': linha.obs_texto, 'created_at': linha.obs_criado_em}
+    return d
+
+
+# ?incluir=atividade em /api/projetos: total de andamentos, o último (mesma
+# ordem de GET /api/projetos/<id>/andamentos, lido de ix_andamentos_projeto_data)
+# e ultima_atividade — a edição mais recente do projeto ou de um andamento
+# dele — num LEFT JOIN LATERAL, em vez de um GET .../andamentos por projeto.
+_and = aliased(Andamento)
+_ultimo_and = db.select(_and.id, _and.data, _and.descricao, db.func.count().over().label('total'),
+                        db.func.max(_and.atualizado_em).over().label('editado_em')) \
+    .where(_and.projeto_id == Projeto.id) \
+    .order_by(_and.data.desc().nulls_last(), _and.id.desc()).limit(1) \
+    .lateral('ultimo_and')
+
+
+def com_atividade(q):
+    """A consulta de PROJETOS (Query ou select) com as colunas da atividade."""
+    return q.outerjoin(_ultimo_and, db.true()).add_columns(
+        _ultimo_and.c.total.label('and_total'), _ultimo_and.c.id.label('and_id'),
+        _ultimo_and.c.data.label('and_data'), _ultimo_and.c.descricao.label('and_descricao'),
+        db.func.greatest(Projeto.atualizado_em, _ultimo_and.c.editado_em).label('ultima_atividade'))
+
+
+def montar_com_atividade(linha):
+    d = PROJETOS.montar(linha)
+    d['andamentos_total'] = linha.and_total or 0
+    d['ultimo_andamento'] = None if linha.and_id is None else {
+        'id': linha.and_id, 'data': linha.and_data, 'descricao': linha.and_descricao}
+    d['ultima_atividade'] = linha.ultima_atividade
+    return d
@@ -0,0 +1,78 @@
+# Métricas no formato Prometheus (GET /metrics).
+#
+# Por rota (a regra do Flask, ex. /api/projetos/<int:id>, não a URL crua,
+# para não explodir a cardinalidade): contagem por status, histograma de
+# latência, tamanho da resposta e tempo gasto no banco durante a requisição.
+#
+# Com vários workers do gunicorn cada processo tem os próprios contadores;
+# com PROMETHEUS_MULTIPROC_DIR definido o prometheus_client grava em arquivos
+# nesse diretório e o /metrics de qualquer worker soma todos (ver hooks em
+# gunicorn.conf.py).
+import os
+import time
+
+from flask import g, request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+import instrumentacao
+
+BUCKETS_LATENCIA = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+BUCKETS_TAMANHO = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUISICOES = Counter(
+    'http_requests_total', 'Requisições HTTP', ['endpoint', 'method', 'status'])
+LATENCIA = Histogram(
+    'http_request_duration_seconds', 'Latência das requisições HTTP', ['endpoint', 'method'],
+    buckets=BUCKETS_LATENCIA)
+TAMANHO = Histogram(
+    'http_response_size_bytes', 'Tamanho do corpo das respostas', ['endpoint', 'method'],
+    buckets=BUCKETS_TAMANHO)
+TEMPO_DB = Histogram(
+    'http_request_db_seconds', 'Tempo em queries SQL por requisição', ['endpoint', 'method'],
+    buckets=BUCKETS_LATENCIA)
+QUERIES = Counter(
+    'http_request_db_queries_total', 'Queries SQL executadas durante requisições', ['endpoint', 'method'])
+
+
+def _endpoint():
+    return request.url_rule.rule if request.url_rule else 'sem_rota'
+
+
+def _inicio():
+    g._metricas_t0 = time.perf_counter()
+
+
+def _fim(resp):
+    t0 = g.pop('_metricas_t0', None)
+    if t0 is None or request.path == '/metrics':
+        return resp
+    ep, metodo = _endpoint(), request.method
+    REQUISICOES.labels(ep, metodo, str(resp.status_code)).inc()
+    # respostas em streaming (export) só contam até o início do envio
+    LATENCIA.labels(ep, metodo).observe(time.perf_counter() - t0)
+    if resp.content_length is not None:
+        TAMANHO.labels(ep, metodo).observe(resp.content_length)
+    sql = instrumentacao.resumo()
+    if sql is not None:
+        TEMPO_DB.labels(ep, metodo).observe(sql.total_s)
+        QUERIES.labels(ep, metodo).inc(sql.n)
+    return resp
+
+
+def metrics():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    # registrar depois de instrumentacao.init_app: o after_request roda em
+    # ordem inversa, então _fim ainda encontra o resumo de SQL da requisição
+    app.before_request(_inicio)
+    app.after_request(_fim)
+    app.add_url_rule('/metrics', 'metrics', metrics, methods=['GET'])
@@ -0,0 +1,108 @@
+"""baseline: schema original (antes das migrações)
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+As tabelas como o db.create_all() as criava antes deste diretório existir.
+Bancos já em uso: as tabelas que já existem são puladas, então
+"flask db upgrade" funciona tanto num banco vazio quanto num criado pelo
+create_all.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _existe(tabela):
+    return sa.inspect(op.get_bind()).has_table(tabela)
+
+
+def upgrade():
+    if not _existe('projetos'):
+        op.create_table(
+            'projetos',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('nome', sa.String(255), nullable=False),
+            sa.Column('tipo', sa.String(100), nullable=False),
+            sa.Column('coordenacao', sa.String(50), nullable=False),
+            sa.Column('status', sa.String(50), nullable=False),
+            sa.Column('descricao', sa.Text()),
+            sa.Column('inicio', sa.Date()),
+            sa.Column('fim', sa.Date()),
+            sa.Column('prioridade', sa.String(50)),
+            sa.Column('progresso', sa.Integer()),
+            sa.Column('totalSprints', sa.Integer()),
+            sa.Column('sprintsConcluidas', sa.Integer()),
+            sa.Column('responsavel', sa.String(100)),
+            sa.Column('orcamento', sa.Float()),
+            sa.Column('equipe', sa.Text()),
+            sa.Column('rag', sa.String(20)),
+            sa.Column('riscos', sa.Text()),
+            sa.Column('qualidade', sa.Integer()),
+            sa.Column('internalizacao', sa.Boolean()),
+        )
+
+    if not _existe('andamentos'):
+        op.create_table(
+            'andamentos',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('projeto_id', sa.Integer(), sa.ForeignKey('projetos.id', ondelete='CASCADE')),
+            sa.Column('data', sa.DateTime()),
+            sa.Column('descricao', sa.Text(), nullable=False),
+        )
+
+    if not _existe('pdti_acoes'):
+        op.create_table(
+            'pdti_acoes',
+            sa.Column('id', sa.String(20), primary_key=True),
+            sa.Column('descricao', sa.Text(), nullable=False),
+            sa.Column('situacao', sa.String(50), nullable=False),
+            sa.Column('tipo', sa.String(10), nullable=False),
+            sa.Column('data_conclusao', sa.Date()),
+        )
+
+    if not _existe('sustentacao_chamados'):
+        op.create_table(
+            'sustentacao_chamados',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('numero_chamado', sa.String(50), nullable=False),
+            sa.Column('projeto', sa.String(100), nullable=False),
+            sa.Column('desenvolvedor', sa.String(100)),
+            sa.Column('data_chamado', sa.DateTime()),
+            sa.Column('descricao', sa.Text()),
+            sa.Column('solicitante', sa.String(150)),
+            sa.Column('status', sa.String(50)),
+            sa.Column('observacao', sa.Text()),
+            sa.Column('criado_em', sa.DateTime()),
+            sa.Column('atualizado_em', sa.DateTime()),
+        )
+        op.create_index('ix_sustentacao_chamados_numero_chamado', 'sustentacao_chamados',
+                        ['numero_chamado'], unique=True)
+
+    if not _existe('sustentacao_observacoes'):
+        op.create_table(
+            'sustentacao_observacoes',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('numero_chamado', sa.String(50),
+                      sa.ForeignKey('sustentacao_chamados.numero_chamado', ondelete='CASCADE'),
+                      nullable=False),
+            sa.Column('texto', sa.Text(), nullable=False),
+            sa.Column('criado_em', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index('ix_sustentacao_observacoes_numero_chamado', 'sustentacao_observacoes',
+                        ['numero_chamado'])
+
+
+def downgrade():
+    op.drop_table('sustentacao_observacoes')
+    op.drop_table('sustentacao_chamados')
+    op.drop_table('pdti_acoes')
+    op.drop_table('andamentos')
+    op.drop_table('projetos')
@@ -0,0 +1,73 @@
+"""schema atual: status_bucket, tabela_versoes e busca textual
+
+Revision ID: 0002_schema_atual
+Revises: 0001_baseline
+Create Date: 2026-10-18
+
+Substitui os scripts avulsos add-status-bucket.sql e add-busca-textual.sql.
+Tudo com IF NOT EXISTS: pode rodar em bancos onde esses scripts (ou o
+create_all) já foram aplicados.
+
+As colunas "busca" são GERADAS: o ADD COLUMN reescreve a tabela com lock
+exclusivo. Em bases grandes, aplique fora do horário de uso.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_schema_atual'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+TABELAS_VERSIONADAS = ('projetos', 'andamentos', 'pdti_acoes', 'sustentacao_chamados', 'sustentacao_observacoes')
+
+
+def _busca(*campos):
+    return ' || '.join(
+        f"setweight(to_tsvector('pt_unaccent', coalesce({col}, '')), '{peso}')" for col, peso in campos)
+
+
+def upgrade():
+    # status_bucket (preencher linhas antigas: flask --app app backfill-status-bucket)
+    op.execute("ALTER TABLE sustentacao_chamados ADD COLUMN IF NOT EXISTS status_bucket VARCHAR(20)")
+
+    # versão por tabela (ETag)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS tabela_versoes (
+            tabela VARCHAR(64) PRIMARY KEY,
+            versao BIGINT NOT NULL
+        )
+    """)
+    valores = ', '.join(f"('{t}', 0)" for t in TABELAS_VERSIONADAS)
+    op.execute(f"INSERT INTO tabela_versoes (tabela, versao) VALUES {valores} ON CONFLICT DO NOTHING")
+
+    # busca textual: português sem acento
+    op.execute("""
+        DO $$
+        BEGIN
+          IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'pt_unaccent') THEN
+            CREATE EXTENSION IF NOT EXISTS unaccent;
+            CREATE TEXT SEARCH CONFIGURATION pt_unaccent (COPY = pg_catalog.portuguese);
+            ALTER TEXT SEARCH CONFIGURATION pt_unaccent
+              ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+          END IF;
+        END $$
+    """)
+    for tabela, campos in (
+        ('projetos', (('nome', 'A'), ('descricao', 'B'), ('riscos', 'C'))),
+        ('sustentacao_chamados', (('descricao', 'A'), ('observacao', 'B'))),
+        ('sustentacao_observacoes', (('texto', 'A'),)),
+    ):
+        op.execute(f"ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS busca tsvector "
+                   f"GENERATED ALWAYS AS ({_busca(*campos)}) STORED")
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{tabela}_busca ON {tabela} USING gin (busca)")
+
+
+def downgrade():
+    for tabela in ('sustentacao_observacoes', 'sustentacao_chamados', 'projetos'):
+        op.execute(f"DROP INDEX IF EXISTS ix_{tabela}_busca")
+        op.execute(f"ALTER TABLE {tabela} DROP COLUMN IF EXISTS busca")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS pt_unaccent")
+    op.execute("DROP TABLE IF EXISTS tabela_versoes")
+    op.execute("ALTER TABLE sustentacao_chamados DROP COLUMN IF EXISTS status_bucket")
@@ -0,0 +1,61 @@
+"""índices de desempenho (CONCURRENTLY)
+
+Revision ID: 0003_indices_desempenho
+Revises: 0002_schema_atual
+Create Date: 2026-10-18
+
+Índices dos caminhos quentes: histórico por projeto, listagem/filtros de
+chamados, filtros de projetos e do PDTI. Substitui add-indices-listagens.sql.
+
+CREATE INDEX CONCURRENTLY não bloqueia escritas, mas não pode rodar dentro
+de transação: cada comando vai num autocommit_block. Se um deles for
+interrompido, o índice fica INVALID; o DROP ... IF EXISTS antes de cada
+CREATE limpa esse resto numa nova execução.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_indices_desempenho'
+down_revision = '0002_schema_atual'
+branch_labels = None
+depends_on = None
+
+# nome -> (tabela, colunas). As listagens ordenam por data DESC NULLS LAST,
+# id DESC; os índices seguem a mesma ordem para o LIMIT sair do índice.
+_DATA_DESC = 'data_chamado DESC NULLS LAST, id DESC'
+INDICES = {
+    'ix_andamentos_projeto_data': ('andamentos', 'projeto_id, data DESC NULLS LAST, id DESC'),
+    'ix_sustentacao_chamados_data': ('sustentacao_chamados', _DATA_DESC),
+    'ix_sustentacao_chamados_bucket_data': ('sustentacao_chamados', f'status_bucket, {_DATA_DESC}'),
+    'ix_sustentacao_chamados_status_data': ('sustentacao_chamados', f'status, {_DATA_DESC}'),
+    'ix_sustentacao_chamados_projeto_data': ('sustentacao_chamados', f'projeto, {_DATA_DESC}'),
+    'ix_sustentacao_chamados_desenvolvedor_data': ('sustentacao_chamados', f'desenvolvedor, {_DATA_DESC}'),
+    'ix_projetos_coordenacao_status_id': ('projetos', 'coordenacao, status, id'),
+    'ix_projetos_coordenacao_tipo_id': ('projetos', 'coordenacao, tipo, id'),
+    'ix_projetos_status_id': ('projetos', 'status, id'),
+    'ix_pdti_acoes_tipo_situacao': ('pdti_acoes', 'tipo, situacao'),
+}
+
+
+def _valido(nome):
+    return op.get_bind().exec_driver_sql(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s", (nome,)).scalar()
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for nome, (tabela, colunas) in INDICES.items():
+            if _valido(nome):
+                continue
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
+            op.execute(f"CREATE INDEX CONCURRENTLY {nome} ON {tabela} ({colunas})")
+        # coberto pelo prefixo de ix_sustentacao_chamados_bucket_data
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_sustentacao_chamados_status_bucket")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nome in INDICES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
@@ -0,0 +1,99 @@
+"""domínios dos projetos: status, tipo e coordenação em tabelas de lookup
+
+Revision ID: 0004_dominios_projetos
+Revises: 0003_indices_desempenho
+Create Date: 2026-10-18
+
+Substitui o fix-db-values.sql. projetos.status/tipo/coordenacao (texto)
+viram status_id/tipo_id/coordenacao_id (smallint, FK). O backfill canoniza
+cada valor distinto com as mesmas regras da API (canonico_dominio em
+database.py); valores fora das listas entram como linhas novas no domínio,
+então nenhum projeto perde a informação. Um UPDATE por valor distinto.
+
+Bancos já no formato novo (create_all) só recebem as tabelas/sementes que
+faltarem.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from database import CANONICOS, canonico_dominio, chave_dominio
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_dominios_projetos'
+down_revision = '0003_indices_desempenho'
+branch_labels = None
+depends_on = None
+
+# dominio -> (tabela, tamanho do nome)
+DOMINIOS = {
+    'status': ('projeto_status', 50),
+    'tipo': ('projeto_tipos', 100),
+    'coordenacao': ('coordenacoes', 50),
+}
+SEM_VALOR = 'Não informado'
+INDICES = {
+    'ix_projetos_coordenacao_status_id': 'coordenacao_id, status_id, id',
+    'ix_projetos_coordenacao_tipo_id': 'coordenacao_id, tipo_id, id',
+    'ix_projetos_status_id': 'status_id, id',
+}
+INDICES_TEXTO = {
+    'ix_projetos_coordenacao_status_id': 'coordenacao, status, id',
+    'ix_projetos_coordenacao_tipo_id': 'coordenacao, tipo, id',
+    'ix_projetos_status_id': 'status, id',
+}
+
+
+def _colunas(tabela):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabela)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    for dominio, (tabela, tam) in DOMINIOS.items():
+        if not sa.inspect(bind).has_table(tabela):
+            op.create_table(
+                tabela,
+                sa.Column('id', sa.SmallInteger(), primary_key=True),
+                sa.Column('nome', sa.String(tam), nullable=False, unique=True),
+                sa.Column('chave', sa.String(tam), nullable=False, unique=True),
+            )
+        for i, nome in enumerate(CANONICOS[dominio], start=1):
+            bind.execute(sa.text(f"INSERT INTO {tabela} (id, nome, chave) VALUES (:i, :n, :k) "
+                                 f"ON CONFLICT DO NOTHING"), {'i': i, 'n': nome, 'k': chave_dominio(nome)})
+        op.execute(f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+                   f"GREATEST((SELECT max(id) FROM {tabela}), 1))")
+
+    if 'status' in _colunas('projetos'):
+        for dominio, (tabela, tam) in DOMINIOS.items():
+            op.execute(f"ALTER TABLE projetos ADD COLUMN IF NOT EXISTS {dominio}_id SMALLINT "
+                       f"REFERENCES {tabela} (id)")
+            brutos = bind.execute(sa.text(f"SELECT DISTINCT {dominio} FROM projetos")).scalars().all()
+            for bruto in brutos:
+                nome = (canonico_dominio(dominio, bruto) or ' '.join(str(bruto or '').split())
+                        or SEM_VALOR)[:tam]
+                chave = chave_dominio(nome)
+                bind.execute(sa.text(f"INSERT INTO {tabela} (nome, chave) VALUES (:n, :k) "
+                                     f"ON CONFLICT DO NOTHING"), {'n': nome, 'k': chave})
+                bind.execute(sa.text(
+                    f"UPDATE projetos SET {dominio}_id = (SELECT id FROM {tabela} WHERE chave = :k) "
+                    f"WHERE {dominio} IS NOT DISTINCT FROM :b"), {'k': chave, 'b': bruto})
+            op.execute(f"ALTER TABLE projetos ALTER COLUMN {dominio}_id SET NOT NULL")
+        # os índices de texto da 0003 caem junto com as colunas
+        op.execute("ALTER TABLE projetos DROP COLUMN tipo, DROP COLUMN coordenacao, DROP COLUMN status")
+
+    # projetos é pequena: CREATE INDEX comum, dentro da transação
+    for nome, colunas in INDICES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON projetos ({colunas})")
+
+
+def downgrade():
+    for dominio, (tabela, tam) in DOMINIOS.items():
+        op.execute(f"ALTER TABLE projetos ADD COLUMN {dominio} VARCHAR({tam})")
+        op.execute(f"UPDATE projetos p SET {dominio} = d.nome FROM {tabela} d WHERE d.id = p.{dominio}_id")
+        op.execute(f"ALTER TABLE projetos ALTER COLUMN {dominio} SET NOT NULL")
+    op.execute("ALTER TABLE projetos DROP COLUMN tipo_id, DROP COLUMN coordenacao_id, DROP COLUMN status_id")
+    for nome, colunas in INDICES_TEXTO.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON projetos ({colunas})")
+    for tabela, _ in DOMINIOS.values():
+        op.drop_table(tabela)
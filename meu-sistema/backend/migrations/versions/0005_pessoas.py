@@ -0,0 +1,151 @@
+"""pessoas: responsável, equipe e desenvolvedor normalizados
+
+Revision ID: 0005_pessoas
+Revises: 0004_dominios_projetos
+Create Date: 2026-10-18
+
+projetos.responsavel e sustentacao_chamados.desenvolvedor (texto) viram
+responsavel_id/desenvolvedor_id (FK para pessoas); projetos.equipe (nomes
+separados por vírgula) vira projeto_membros. O backfill cadastra cada nome
+distinto uma vez (identidade pela chave normalizada de database.py, como a
+API faz) e preenche as FKs com um UPDATE ... FROM por tabela.
+
+Os índices de sustentacao_chamados (tabela grande) são criados CONCURRENTLY
+fora da transação, como na 0003.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from database import chave_dominio
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_pessoas'
+down_revision = '0004_dominios_projetos'
+branch_labels = None
+depends_on = None
+
+_DATA_DESC = 'data_chamado DESC NULLS LAST, id DESC'
+INDICES_CHAMADOS = {
+    'ix_sustentacao_chamados_desenvolvedor_data': f'desenvolvedor_id, {_DATA_DESC}',
+    'ix_sustentacao_chamados_desenvolvedor_bucket': 'desenvolvedor_id, status_bucket',
+}
+
+
+def _existe(tabela):
+    return sa.inspect(op.get_bind()).has_table(tabela)
+
+
+def _colunas(tabela):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabela)}
+
+
+def _valido(nome):
+    return op.get_bind().exec_driver_sql(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s", (nome,)).scalar()
+
+
+def _nome(bruto):
+    return ' '.join(str(bruto or '').split())[:100]
+
+
+def _backfill():
+    bind = op.get_bind()
+    responsaveis = bind.execute(sa.text("SELECT DISTINCT responsavel FROM projetos")).scalars().all()
+    desenvolvedores = bind.execute(sa.text(
+        "SELECT DISTINCT desenvolvedor FROM sustentacao_chamados")).scalars().all()
+    equipes = bind.execute(sa.text(
+        "SELECT id, equipe FROM projetos WHERE coalesce(equipe, '') <> '' ORDER BY id")).all()
+
+    # pessoas: uma por chave; vale a grafia da primeira ocorrência
+    brutos = [*responsaveis, *desenvolvedores, *(n for _, e in equipes for n in e.split(','))]
+    ids = {}
+    for bruto in brutos:
+        nome = _nome(bruto)
+        chave = chave_dominio(nome)
+        if not chave or chave in ids:
+            continue
+        bind.execute(sa.text("INSERT INTO pessoas (nome, chave) VALUES (:n, :k) ON CONFLICT DO NOTHING"),
+                     {'n': nome, 'k': chave})
+        ids[chave] = bind.execute(sa.text("SELECT id FROM pessoas WHERE chave = :k"), {'k': chave}).scalar()
+
+    op.execute("CREATE TEMP TABLE mapa_pessoas (bruto TEXT PRIMARY KEY, pessoa_id INT) ON COMMIT DROP")
+    mapa = [{'b': b, 'p': ids[chave_dominio(_nome(b))]}
+            for b in set(responsaveis) | set(desenvolvedores) if chave_dominio(_nome(b))]
+    if mapa:
+        bind.execute(sa.text("INSERT INTO mapa_pessoas VALUES (:b, :p)"), mapa)
+    op.execute("UPDATE projetos p SET responsavel_id = m.pessoa_id "
+               "FROM mapa_pessoas m WHERE p.responsavel = m.bruto")
+    op.execute("UPDATE sustentacao_chamados c SET desenvolvedor_id = m.pessoa_id "
+               "FROM mapa_pessoas m WHERE c.desenvolvedor = m.bruto")
+
+    membros = []
+    for projeto_id, equipe in equipes:
+        vistos = []
+        for bruto in equipe.split(','):
+            chave = chave_dominio(_nome(bruto))
+            if chave and ids[chave] not in vistos:
+                vistos.append(ids[chave])
+        membros += [{'pr': projeto_id, 'pe': p, 'o': i} for i, p in enumerate(vistos)]
+    if membros:
+        bind.execute(sa.text("INSERT INTO projeto_membros (projeto_id, pessoa_id, ordem) "
+                             "VALUES (:pr, :pe, :o) ON CONFLICT DO NOTHING"), membros)
+
+
+def upgrade():
+    if not _existe('pessoas'):
+        op.create_table(
+            'pessoas',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('nome', sa.String(100), nullable=False, unique=True),
+            sa.Column('chave', sa.String(100), nullable=False, unique=True),
+        )
+    if not _existe('projeto_membros'):
+        op.create_table(
+            'projeto_membros',
+            sa.Column('projeto_id', sa.Integer(), sa.ForeignKey('projetos.id', ondelete='CASCADE'),
+                      primary_key=True),
+            sa.Column('pessoa_id', sa.Integer(), sa.ForeignKey('pessoas.id'), primary_key=True),
+            sa.Column('ordem', sa.SmallInteger(), nullable=False),
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_projeto_membros_pessoa_projeto "
+               "ON projeto_membros (pessoa_id, projeto_id)")
+
+    if 'equipe' in _colunas('projetos'):
+        op.execute("ALTER TABLE projetos ADD COLUMN IF NOT EXISTS responsavel_id INTEGER REFERENCES pessoas (id)")
+        op.execute("ALTER TABLE sustentacao_chamados "
+                   "ADD COLUMN IF NOT EXISTS desenvolvedor_id INTEGER REFERENCES pessoas (id)")
+        _backfill()
+        # o índice antigo de desenvolvedor (texto) cai junto com a coluna
+        op.execute("ALTER TABLE projetos DROP COLUMN responsavel, DROP COLUMN equipe")
+        op.execute("ALTER TABLE sustentacao_chamados DROP COLUMN desenvolvedor")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_projetos_responsavel_id ON projetos (responsavel_id)")
+
+    with op.get_context().autocommit_block():
+        for nome, colunas in INDICES_CHAMADOS.items():
+            if _valido(nome):
+                continue
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
+            op.execute(f"CREATE INDEX CONCURRENTLY {nome} ON sustentacao_chamados ({colunas})")
+
+
+def downgrade():
+    op.execute("ALTER TABLE projetos ADD COLUMN responsavel VARCHAR(100), ADD COLUMN equipe TEXT")
+    op.execute("ALTER TABLE sustentacao_chamados ADD COLUMN desenvolvedor VARCHAR(100)")
+    op.execute("UPDATE projetos p SET responsavel = x.nome FROM pessoas x WHERE x.id = p.responsavel_id")
+    op.execute("""
+        UPDATE projetos p SET equipe = m.nomes
+          FROM (SELECT pm.projeto_id, string_agg(x.nome, ', ' ORDER BY pm.ordem) AS nomes
+                  FROM projeto_membros pm JOIN pessoas x ON x.id = pm.pessoa_id
+                 GROUP BY pm.projeto_id) m
+         WHERE m.projeto_id = p.id
+    """)
+    op.execute("UPDATE sustentacao_chamados c SET desenvolvedor = x.nome "
+               "FROM pessoas x WHERE x.id = c.desenvolvedor_id")
+    op.execute("ALTER TABLE projetos DROP COLUMN responsavel_id")
+    op.execute("ALTER TABLE sustentacao_chamados DROP COLUMN desenvolvedor_id")
+    op.drop_table('projeto_membros')
+    op.drop_table('pessoas')
+    op.execute(f"CREATE INDEX ix_sustentacao_chamados_desenvolvedor_data "
+               f"ON sustentacao_chamados (desenvolvedor, {_DATA_DESC})")
@@ -0,0 +1,76 @@
+"""sincronização incremental: atualizado_em em todas as entidades e remocoes
+
+Revision ID: 0006_delta
+Revises: 0005_pessoas
+Create Date: 2026-10-18
+
+projetos, andamentos e pdti_acoes ganham atualizado_em (as linhas que já
+existem ficam com o instante da migração: o primeiro delta de um cliente
+traz tudo de qualquer forma). Em sustentacao_chamados a coluna já existia,
+anulável; os NULLs recebem criado_em e ela passa a NOT NULL com DEFAULT,
+como nas outras. remocoes guarda os tombstones das exclusões.
+
+Os índices (atualizado_em, id) das tabelas grandes são criados CONCURRENTLY
+fora da transação, como na 0003.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_delta'
+down_revision = '0005_pessoas'
+branch_labels = None
+depends_on = None
+
+TABELAS_NOVAS = ('projetos', 'andamentos', 'pdti_acoes')
+INDICES = {
+    'ix_projetos_atualizado_em': 'projetos',
+    'ix_andamentos_atualizado_em': 'andamentos',
+    'ix_pdti_acoes_atualizado_em': 'pdti_acoes',
+    'ix_sustentacao_chamados_atualizado_em': 'sustentacao_chamados',
+}
+
+
+def _valido(nome):
+    return op.get_bind().exec_driver_sql(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s", (nome,)).scalar()
+
+
+def upgrade():
+    for tabela in TABELAS_NOVAS:
+        # DEFAULT now() não reescreve a tabela: o valor é calculado uma vez
+        op.execute(f"ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS atualizado_em "
+                   f"TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()")
+    op.execute("UPDATE sustentacao_chamados SET atualizado_em = coalesce(criado_em, now()) "
+               "WHERE atualizado_em IS NULL")
+    op.execute("ALTER TABLE sustentacao_chamados ALTER COLUMN atualizado_em SET DEFAULT now(), "
+               "ALTER COLUMN atualizado_em SET NOT NULL")
+
+    if not sa.inspect(op.get_bind()).has_table('remocoes'):
+        op.create_table(
+            'remocoes',
+            sa.Column('id', sa.BigInteger(), primary_key=True),
+            sa.Column('tabela', sa.String(64), nullable=False),
+            sa.Column('chave', sa.String(50), nullable=False),
+            sa.Column('removido_em', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_remocoes_tabela_removido_em ON remocoes (tabela, removido_em)")
+
+    with op.get_context().autocommit_block():
+        for nome, tabela in INDICES.items():
+            if _valido(nome):
+                continue
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
+            op.execute(f"CREATE INDEX CONCURRENTLY {nome} ON {tabela} (atualizado_em, id)")
+
+
+def downgrade():
+    for nome in INDICES:
+        op.execute(f"DROP INDEX IF EXISTS {nome}")
+    op.drop_table('remocoes')
+    op.execute("ALTER TABLE sustentacao_chamados ALTER COLUMN atualizado_em DROP NOT NULL, "
+               "ALTER COLUMN atualizado_em DROP DEFAULT")
+    for tabela in TABELAS_NOVAS:
+        op.execute(f"ALTER TABLE {tabela} DROP COLUMN atualizado_em")
@@ -0,0 +1,31 @@
+"""notificações de alteração: triggers com pg_notify para GET /api/events
+
+Revision ID: 0007_eventos
+Revises: 0006_delta
+Create Date: 2026-10-18
+
+Função cgsol_notificar() e um trigger por comando (insert/update/delete)
+em cada tabela de TABELAS_EVENTOS; o SQL fica em database.py, o mesmo que o
+create_all executa. CREATE OR REPLACE / DROP TRIGGER IF EXISTS: rodar de
+novo é seguro.
+"""
+from alembic import op
+
+from database import ddl_eventos, ddl_remover_eventos
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_eventos'
+down_revision = '0006_delta'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for comando in ddl_eventos():
+        op.execute(comando)
+
+
+def downgrade():
+    for comando in ddl_remover_eventos():
+        op.execute(comando)
@@ -0,0 +1,44 @@
+"""índice (numero_chamado, criado_em DESC, id DESC) em sustentacao_observacoes
+
+Revision ID: 0008_observacoes_chamado
+Revises: 0007_eventos
+Create Date: 2026-10-18
+
+Serve a lista de observações de um chamado, o lote
+GET /api/sustentacao/observacoes e o resumo LATERAL de
+/api/sustentacao?incluir=observacoes já na ordem, sem sort. Substitui
+ix_sustentacao_observacoes_numero_chamado (prefixo do novo). CONCURRENTLY,
+fora da transação, como na 0003.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_observacoes_chamado'
+down_revision = '0007_eventos'
+branch_labels = None
+depends_on = None
+
+NOVO = 'ix_sustentacao_observacoes_chamado_criado'
+ANTIGO = 'ix_sustentacao_observacoes_numero_chamado'
+
+
+def _valido(nome):
+    return op.get_bind().exec_driver_sql(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s", (nome,)).scalar()
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        if not _valido(NOVO):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NOVO}")
+            op.execute(f"CREATE INDEX CONCURRENTLY {NOVO} ON sustentacao_observacoes "
+                       f"(numero_chamado, criado_em DESC, id DESC)")
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {ANTIGO}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {ANTIGO} ON sustentacao_observacoes (numero_chamado)")
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NOVO}")
@@ -0,0 +1,39 @@
+"""índice (data DESC NULLS LAST, id DESC) em andamentos
+
+Revision ID: 0009_andamentos_data
+Revises: 0008_observacoes_chamado
+Create Date: 2026-10-18
+
+Serve o histórico de todos os projetos, GET /api/andamentos (ordem padrão
+-data, paginado por cursor), sem ordenar a tabela inteira a cada página.
+Filtrado por ?projeto= continua em ix_andamentos_projeto_data.
+CONCURRENTLY, fora da transação, como na 0003.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_andamentos_data'
+down_revision = '0008_observacoes_chamado'
+branch_labels = None
+depends_on = None
+
+NOME = 'ix_andamentos_data'
+
+
+def _valido(nome):
+    return op.get_bind().exec_driver_sql(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s", (nome,)).scalar()
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        if not _valido(NOME):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NOME}")
+            op.execute(f"CREATE INDEX CONCURRENTLY {NOME} ON andamentos (data DESC NULLS LAST, id DESC)")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NOME}")
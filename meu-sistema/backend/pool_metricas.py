@@ -0,0 +1,64 @@
+# Telemetria do pool de conexões (por processo).
+#
+# O QueuePool já sabe quantas conexões estão em uso/livres; o que falta é
+# quanto tempo as requisições ficam esperando uma conexão livre, que é o
+# sinal de pool pequeno demais. PoolInstrumentado mede isso em _do_get.
+import os
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolInstrumentado(QueuePool):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_stats = threading.Lock()
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'espera_total_s': 0.0,
+            'espera_max_s': 0.0,
+        }
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._lock_stats:
+                self._stats['timeouts'] += 1
+            raise
+        finally:
+            espera = time.perf_counter() - t0
+            with self._lock_stats:
+                self._stats['checkouts'] += 1
+                self._stats['espera_total_s'] += espera
+                if espera > self._stats['espera_max_s']:
+                    self._stats['espera_max_s'] = espera
+
+    def recreate(self):
+        # dispose() cria um pool novo; as estatísticas continuam valendo
+        novo = super().recreate()
+        novo._stats = self._stats
+        novo._lock_stats = self._lock_stats
+        return novo
+
+    def estatisticas(self):
+        with self._lock_stats:
+            s = dict(self._stats)
+        s['espera_media_ms'] = round(1000 * s['espera_total_s'] / s['checkouts'], 3) if s['checkouts'] else 0.0
+        s['espera_max_ms'] = round(1000 * s.pop('espera_max_s'), 3)
+        s['espera_total_ms'] = round(1000 * s.pop('espera_total_s'), 3)
+        s.update({
+            'pid': os.getpid(),
+            'tamanho': self.size(),
+            'max_overflow': self._max_overflow,
+            'em_uso': self.checkedout(),
+            'livres': self.checkedin(),
+            # overflow() < 0 enquanto o pool ainda não abriu pool_size conexões
+            'overflow': max(self.overflow(), 0),
+        })
+        return s
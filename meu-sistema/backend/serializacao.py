@@ -0,0 +1,90 @@
+# Serialização JSON das respostas (app.json) e do export NDJSON.
+#
+# JSON_PROVIDER=orjson (padrão, se o pacote estiver instalado) ou padrao
+# (json da stdlib). Os dois escrevem date/datetime em ISO 8601, então os
+# to_dict() devolvem as datas como objetos e o orjson as formata em C, sem
+# um isoformat() por campo. O DefaultJSONProvider do Flask usaria data HTTP
+# ("Mon, 01 Jan 2024 00:00:00 GMT"); aqui as duas opções geram o mesmo JSON.
+#
+# Diferença de bytes entre os dois: o orjson não escapa acentos (ç) —
+# UTF-8 direto, resposta menor — e não põe espaço depois de ":" e ",".
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _padrao(o):
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return str(o)
+    raise TypeError(f'{type(o).__name__} não é serializável em JSON')
+
+
+class ProviderPadrao(DefaultJSONProvider):
+    """json da stdlib, com datas em ISO 8601."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (date, datetime)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class ProviderOrjson(JSONProvider):
+    """orjson: chaves ordenadas (como o sort_keys do Flask), datas nativas."""
+    OPCOES = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_padrao, option=self.OPCOES).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # direto para bytes: sem o str intermediário do JSONProvider.response
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(corpo_json(obj), mimetype='application/json')
+
+
+_usar_orjson = False
+
+
+def init_app(app):
+    """Instala o provider escolhido por JSON_PROVIDER em app.json."""
+    global _usar_orjson
+    nome = os.getenv('JSON_PROVIDER', 'orjson' if orjson else 'padrao').lower()
+    if nome == 'orjson':
+        if orjson is None:
+            raise RuntimeError('JSON_PROVIDER=orjson precisa do pacote orjson (pip install orjson)')
+        cls = ProviderOrjson
+    elif nome == 'padrao':
+        cls = ProviderPadrao
+    else:
+        raise RuntimeError(f'JSON_PROVIDER inválido: {nome} (orjson ou padrao)')
+    _usar_orjson = cls is ProviderOrjson
+    app.json_provider_class = cls
+    app.json = cls(app)
+
+
+def linha_ndjson(d):
+    """Um registro do export NDJSON (sem ordenar chaves: mesma ordem do to_dict)."""
+    if _usar_orjson:
+        return orjson.dumps(d, default=_padrao, option=orjson.OPT_APPEND_NEWLINE).decode()
+    return json.dumps(d, ensure_ascii=False, default=_padrao) + '\n'
+
+
+def corpo_json(obj):
+    """Bytes de uma resposta JSON, iguais aos do jsonify() com o provider ativo
+    (usado fora do Flask, nas rotas async do asgi.py)."""
+    if _usar_orjson:
+        return orjson.dumps(obj, default=_padrao, option=ProviderOrjson.OPCOES | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, default=ProviderPadrao.default, sort_keys=True) + '\n').encode()
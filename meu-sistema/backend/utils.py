@@ -0,0 +1,28 @@
+from datetime import date, datetime
+
+def _parse_date(s: str | None):
+    try:
+        return date.fromisoformat((s or '').split('T')[0]) if s else None
+    except Exception:
+        return None
+
+def _parse_datetime(s: str | None):
+    """Aceita '2025-09-23', '2025-09-23T14:30', ou '...Z'"""
+    try:
+        if not s:
+            return None
+        s = s.replace('Z', '+00:00')   # ISO com Z
+        dt = datetime.fromisoformat(s)
+        return dt.replace(tzinfo=None) # salva naive (sem tz)
+    except Exception:
+        return None
+
+def _parse_bool(v):
+    if isinstance(v, bool):
+        return v
+    if v is None:
+        return False
+    if isinstance(v, (int, float)):
+        return bool(v)
+    s = str(v).strip().lower()
+    return s in ('1', 'true', 't', 'yes', 'y', 'on', 'sim')
@@ -10,6 +10,14 @@ until nc -z "$host" "$port"; do
   sleep 1
 done
 
-echo "Banco de dados está pronto! Iniciando o backend..."
+echo "Banco de dados está pronto!"
+
+# migrações uma vez, antes dos workers (não em cada worker do gunicorn)
+if [ "${DB_MIGRATE:-0}" = "1" ]; then
+  echo "Aplicando migrações..."
+  flask --app app db upgrade
+fi
+
+echo "Iniciando o backend..."
 
 exec "$@"
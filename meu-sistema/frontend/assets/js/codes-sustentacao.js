@@ -5,7 +5,7 @@
 
     async function loadSustentacao() {
         try {
-            const res = await fetch("http://localhost:5001/api/sustentacao");
+            const res = await fetch("http://localhost:5001/api/sustentacao?all=1");
             if (!res.ok) throw new Error(`Erro ao buscar sustentação (${res.status})`);
             const dados = await res.json();
 
@@ -216,7 +216,7 @@
   // ========= funções =========
   async function loadProjetos() {
     try {
-      const resp = await fetch(API);
+      const resp = await fetch(`${API}?all=1`);
       if (!resp.ok) throw new Error("Erro ao buscar projetos");
       cacheProjetos = await resp.json();
       renderProjects(cacheProjetos);
@@ -927,7 +927,7 @@
   // ========= Carregar projetos =========
   async function loadProjetos() {
     try {
-      const res = await fetch(API);
+      const res = await fetch(`${API}?all=1`);
       if (!res.ok) throw new Error(`Falha ao carregar (${res.status})`);
       const projetos = await res.json();
       cacheProjetos = Array.isArray(projetos) ? projetos : [];
@@ -1114,7 +1114,7 @@
   // Carregar lista de andamentos
   async function loadAndamentos(projetoId) {
     try {
-      const res = await fetch(`${API_ROOT}/projetos/${projetoId}/andamentos`);
+      const res = await fetch(`${API_ROOT}/projetos/${projetoId}/andamentos?all=1`);
       if (!res.ok) throw new Error("Erro ao buscar andamentos");
 
       const data = await res.json();
@@ -2763,7 +2763,7 @@
   }
   async function loadSustKPI() {
     try {
-      const res = await fetch(`${API_ROOT}/sustentacao`);
+      const res = await fetch(`${API_ROOT}/sustentacao?all=1`);
       if (!res.ok) throw new Error(`Falha ao carregar Sustentação (${res.status})`);
       const itens = await res.json();
 
@@ -2857,7 +2857,7 @@
 
   async function loadSustentacaoView() {
     try {
-      const res = await fetch(`${API_ROOT}/sustentacao`);
+      const res = await fetch(`${API_ROOT}/sustentacao?all=1`);
       if (!res.ok) throw new Error(`Falha ao carregar sustentação (${res.status})`);
       const itens = await res.json();
       normalizeSustCardsSelectors();   // <— idem na tela de Sustentação
@@ -392,11 +392,12 @@
 
     async function fetchProjetosById() {
         try {
-            const resp = await fetch(`${API_ROOT}/projetos`);
+            // só {id: nome}: sem baixar a lista inteira de projetos
+            const resp = await fetch(`${API_ROOT}/bootstrap?secoes=projetos_nomes`);
             if (!resp.ok) return {};
-            const arr = await resp.json();
+            const nomes = (await resp.json()).projetos_nomes || {};
             const map = {};
-            (arr || []).forEach(p => { if (p?.id != null) map[String(p.id)] = p.nome || `Projeto ${p.id}`; });
+            Object.entries(nomes).forEach(([id, nome]) => { map[id] = nome || `Projeto ${id}`; });
             return map;
         } catch { return {}; }
     }
@@ -940,7 +941,7 @@
     async function loadSustentacao() {
         try {
             const projetosById = await fetchProjetosById();
-            const resp = await fetch(`${API_ROOT}/sustentacao`);
+            const resp = await fetch(`${API_ROOT}/sustentacao?all=1`);
             if (!resp.ok) throw new Error(`Erro ao buscar sustentação (${resp.status})`);
 
             const raw = await resp.json();
@@ -1264,8 +1265,9 @@
         if (!box) return;
         box.innerHTML = '<div class="text-sm text-gray-500">Carregando…</div>';
         try {
-            const url = `${API_ROOT}/sustentacao/${encodeURIComponent(numero)}/observacoes?t=${Date.now()}`;
-            const r = await fetch(url, { cache: 'no-store', headers: { 'Cache-Control': 'no-cache' } });
+            // revalida com If-None-Match a cada abertura: 304 se nada mudou
+            const url = `${API_ROOT}/sustentacao/${encodeURIComponent(numero)}/observacoes`;
+            const r = await fetch(url, { cache: 'no-cache' });
             if (!r.ok) throw new Error(await r.text());
 
             let itens = await r.json();